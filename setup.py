@@ -19,6 +19,7 @@ from setuptools import find_packages, setup
 
 requirements = [
     "comet_ml",
+    "contextvars; python_version<'3.7.0'",
     "dataclasses; python_version<'3.7.0'",
     "flatten-dict",
     "requests",
@@ -50,6 +51,7 @@ setup(
     ],
     description="Comet logger for LLM",
     install_requires=requirements,
+    extras_require={"aio": ["httpx"]},
     long_description=long_description,
     long_description_content_type="text/markdown",
     include_package_data=True,
@@ -12,16 +12,26 @@
 #  LICENSE file in the root directory of this package.
 # *******************************************************
 
-from . import app, autologgers, config, logging
+from . import aio, app, autologgers, config, logging, message_processing
 from .api_objects.api import API
 from .config import init, is_ready
+from .usage import set_model_prices, usage_counters
 
 if config.comet_disabled():
-    from .dummy_api import Span, end_chain, log_prompt, start_chain  # type: ignore
+    from .dummy_api import (  # type: ignore
+        Span,
+        autolog_session,
+        end_chain,
+        log_prompt,
+        start_chain,
+        track,
+    )
 else:
     from .api import flush, log_user_feedback
     from .chains.api import end_chain, start_chain
+    from .chains.batching import autolog_session
     from .chains.span import Span
+    from .chains.track import track
     from .prompts.api import log_prompt
 
 
@@ -30,13 +40,20 @@ __all__ = [
     "start_chain",
     "end_chain",
     "Span",
+    "track",
+    "autolog_session",
     "init",
     "is_ready",
     "log_user_feedback",
     "flush",
     "API",
+    "set_model_prices",
+    "usage_counters",
 ]
 
 logging.setup()
 app.register_summary_print()
 autologgers.patch()
+
+if not config.comet_disabled():
+    message_processing.start_spool_replay()
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+# *******************************************************
+#   ____                     _               _
+#  / ___|___  _ __ ___   ___| |_   _ __ ___ | |
+# | |   / _ \| '_ ` _ \ / _ \ __| | '_ ` _ \| |
+# | |__| (_) | | | | | |  __/ |_ _| | | | | | |
+#  \____\___/|_| |_| |_|\___|\__(_)_| |_| |_|_|
+#
+#  Sign up for free at https://www.comet.com
+#  Copyright (C) 2015-2023 Comet ML INC
+#  This source code is licensed under the MIT license found in the
+#  LICENSE file in the root directory of this package.
+# *******************************************************
+
+
+from typing import Dict, List, Optional, Union
+
+from .. import (
+    app,
+    config,
+    exceptions,
+    llm_result,
+    logging_messages,
+    message_processing,
+    sampling,
+)
+from ..chains import api as chains_api, state
+from ..prompts import api as prompts_api
+from ..types import JSONEncodable
+
+
+@exceptions.filter(allow_raising=config.raising_enabled(), summary=app.SUMMARY)
+async def log_prompt(
+    prompt: str,
+    output: str,
+    workspace: Optional[str] = None,
+    project: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    api_key: Optional[str] = None,
+    prompt_template: Optional[str] = None,
+    prompt_template_variables: Optional[
+        Dict[str, Union[str, bool, float, None]]
+    ] = None,
+    metadata: Optional[Dict[str, Union[str, bool, float, None]]] = None,
+    timestamp: Optional[float] = None,
+    duration: Optional[float] = None,
+    sampled: Optional[bool] = None,
+) -> Optional[llm_result.LLMResult]:
+    """
+    Asyncio version of comet_llm.log_prompt. Logs a single prompt
+    and output to Comet platform without blocking the event loop.
+
+    Args:
+        prompt: str (required) input prompt to LLM.
+        output: str (required), output from LLM.
+        workspace: str (optional) comet workspace to use for logging.
+        project: str (optional) project name to create in comet workspace.
+        tags: List[str] (optional), user-defined tags attached to a prompt call.
+        api_key: str (optional) comet API key.
+        prompt_template: str (optional) user-defined template used for creating a prompt.
+        prompt_template_variables: Dict[str, str] (optional) dictionary with data used
+            in prompt_template to build a prompt.
+        metadata: Dict[str, Union[str, bool, float, None]] (optional) user-defined
+            dictionary with additional metadata to the call.
+        timestamp: float (optional) timestamp of prompt call in seconds
+        duration: float (optional) duration of prompt call
+        sampled: bool (optional) True logs the prompt, False skips it,
+            regardless of the sampling configuration.
+
+    Returns: LLMResult, or None if asynchronous logging is enabled
+        or the prompt was not sampled.
+    """
+    if not sampling.head_sampled(sampled):
+        sampling.sampled_out("prompt")
+        return None
+
+    message = prompts_api.build_message(
+        prompt=prompt,
+        output=output,
+        workspace=workspace,
+        project=project,
+        tags=tags,
+        api_key=api_key,
+        prompt_template=prompt_template,
+        prompt_template_variables=prompt_template_variables,
+        metadata=metadata,
+        timestamp=timestamp,
+        duration=duration,
+    )
+
+    if not sampling.tail_sampled(message.trace_data, sampled):
+        sampling.sampled_out("prompt")
+        return None
+
+    return await message_processing.process_async(message)
+
+
+async def start_chain(
+    inputs: Dict[str, JSONEncodable],
+    api_key: Optional[str] = None,
+    workspace: Optional[str] = None,
+    project: Optional[str] = None,
+    metadata: Optional[Dict[str, Dict[str, JSONEncodable]]] = None,
+    tags: Optional[List[str]] = None,
+    sampled: Optional[bool] = None,
+) -> None:
+    """
+    Asyncio version of comet_llm.start_chain.
+    Creates global Chain object that tracks created Spans.
+    Args:
+        inputs: Dict[str, JSONEncodable] (required) chain inputs.
+        workspace: str (optional) comet workspace to use for logging.
+        project: str (optional) project name to create in comet workspace.
+        api_key: str (optional) comet API key.
+        metadata: Dict[str, Dict[str, JSONEncodable]] (optional) user-defined
+            dictionary with additional metadata to the call.
+        tags: List[str] (optional) user-defined tags attached to the chain
+        sampled: bool (optional) True records and logs the chain, False skips it,
+            regardless of the sampling configuration.
+    """
+    chains_api.start_chain(
+        inputs=inputs,
+        api_key=api_key,
+        workspace=workspace,
+        project=project,
+        metadata=metadata,
+        tags=tags,
+        sampled=sampled,
+    )
+
+
+@exceptions.filter(allow_raising=config.raising_enabled(), summary=app.SUMMARY)
+async def end_chain(
+    outputs: Dict[str, JSONEncodable],
+    metadata: Optional[Dict[str, JSONEncodable]] = None,
+    sampled: Optional[bool] = None,
+) -> Optional[llm_result.LLMResult]:
+    """
+    Asyncio version of comet_llm.end_chain.
+    Commits global chain and logs the result to Comet.
+    Args:
+        outputs: Dict[str, JSONEncodable] (required) chain outputs.
+        metadata: Dict[str, Dict[str, JSONEncodable]] (optional) user-defined
+            dictionary with additional metadata to the call. This metadata
+            will be deep merged with the metadata passed to start_chain if
+            it was provided.
+        sampled: bool (optional) True logs the chain, False skips it, regardless
+            of the sampling configuration.
+
+    Returns: LLMResult, or None if asynchronous logging is enabled
+        or the chain was not sampled.
+    """
+    global_chain = state.get_global_chain()
+    if global_chain is None:
+        raise exceptions.CometLLMException(
+            logging_messages.GLOBAL_CHAIN_NOT_INITIALIZED % "`end_chain`"
+        )
+
+    global_chain.set_outputs(outputs=outputs, metadata=metadata)
+    message = chains_api.build_sampled_message(global_chain, sampled)
+    if message is None:
+        return None
+
+    return await message_processing.process_async(message)
@@ -15,7 +15,8 @@
 import logging
 from typing import Optional
 
-from . import config, exceptions, experiment_info, logging_messages
+from . import config, exceptions, experiment_info, logging_messages, message_processing
+from .chains import batching
 from .experiment_api import ExperimentAPI
 
 LOGGER = logging.getLogger(__name__)
@@ -52,6 +53,17 @@ def log_user_feedback(id: str, score: float, api_key: Optional[str] = None) -> N
     experiment_api.log_metric("user_feedback", score)
 
 
-def flush() -> None:
-    """Flush all data to Comet platform."""
-    pass
+def flush(timeout: Optional[float] = None) -> bool:
+    """
+    Flush all data to Comet platform. Blocks until every prompt and
+    chain queued by asynchronous logging is sent. The open batches of
+    autologged calls are logged first.
+
+    Args:
+        timeout: float (optional) maximum number of seconds to wait.
+            Waits until the queue is empty if not set.
+
+    Returns: True if all the data was flushed, False if timeout expired.
+    """
+    batching.close_all()
+    return message_processing.flush(timeout)
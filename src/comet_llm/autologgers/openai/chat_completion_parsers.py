@@ -47,7 +47,10 @@ def parse_create_arguments(kwargs: Dict[str, Any]) -> Tuple[Inputs, Metadata]:
     kwargs_copy = kwargs.copy()
     inputs = {}
 
-    inputs["messages"] = kwargs_copy.pop("messages")
+    messages = kwargs_copy.pop("messages")
+    # Copied, the span may be logged after the call returns, and by then the
+    # caller has usually appended the response to its list of messages.
+    inputs["messages"] = list(messages) if isinstance(messages, list) else messages
     if "function_call" in kwargs_copy:
         inputs["function_call"] = kwargs_copy.pop("function_call")
 
@@ -56,7 +59,20 @@ def parse_create_arguments(kwargs: Dict[str, Any]) -> Tuple[Inputs, Metadata]:
     return inputs, metadata
 
 
+def create_result_is_stream(result: CreateCallResult) -> bool:
+    openai_version = metadata.openai_version()
+
+    if openai_version is not None and openai_version.startswith("0."):
+        return inspect.isgenerator(result) or inspect.isasyncgen(result)
+
+    return not hasattr(result, "model_dump")
+
+
 def parse_create_result(result: CreateCallResult) -> Tuple[Outputs, Metadata]:
+    """
+    Parses the result of a create call that is not streamed, the streams
+    are parsed chunk by chunk by the stream module.
+    """
     openai_version = metadata.openai_version()
 
     if openai_version is not None and openai_version.startswith("0."):
@@ -66,15 +82,11 @@ def parse_create_result(result: CreateCallResult) -> Tuple[Outputs, Metadata]:
 
 
 def _v0_x_x__parse_create_result(
-    result: Union["OpenAIObject", Iterable["OpenAIObject"]]
+    result: "OpenAIObject",
 ) -> Tuple[Outputs, Metadata]:
-    if inspect.isgenerator(result):
-        choices = "Generation is not logged when using stream mode"
-        metadata = {}
-    else:
-        result_dict = result.to_dict()  # type: ignore
-        choices: List[Dict[str, Any]] = result_dict.pop("choices")  # type: ignore
-        metadata = result_dict
+    result_dict = result.to_dict()
+    choices: List[Dict[str, Any]] = result_dict.pop("choices")
+    metadata = result_dict
 
     outputs = {"choices": choices}
 
@@ -85,16 +97,11 @@ def _v0_x_x__parse_create_result(
 
 
 def _v1_x_x__parse_create_result(
-    result: Union["ChatCompletion", "Stream"]
+    result: "ChatCompletion",
 ) -> Tuple[Outputs, Metadata]:
-    stream_mode = not hasattr(result, "model_dump")
-    if stream_mode:
-        choices = "Generation is not logged when using stream mode"
-        metadata = {}
-    else:
-        result_dict = result.model_dump()
-        choices: List[Dict[str, Any]] = result_dict.pop("choices")  # type: ignore
-        metadata = result_dict
+    result_dict = result.model_dump()
+    choices: List[Dict[str, Any]] = result_dict.pop("choices")
+    metadata = result_dict
 
     outputs = {"choices": choices}
 
@@ -12,39 +12,80 @@
 #  LICENSE file in the root directory of this package.
 # *******************************************************
 
+import contextvars
 import functools
 from typing import TYPE_CHECKING, Any, Callable, Optional
 
-from comet_llm.chains import thread_context_registry
-
 if TYPE_CHECKING:
+    from comet_llm.chains.batching import Batch
     from comet_llm.chains.chain import Chain
     from comet_llm.chains.span import Span
 
 
 class OpenAIContext:
+    """
+    The chain and span of the OpenAI call in progress. Stored in context
+    variables, so concurrent calls from different threads or asyncio
+    tasks don't overwrite each other's span.
+    """
+
     def __init__(self) -> None:
-        self._thread_context_registry = thread_context_registry.ThreadContextRegistry()
+        self._chain: "contextvars.ContextVar[Optional[Chain]]" = contextvars.ContextVar(
+            "comet_llm_openai_chain", default=None
+        )
+        self._span: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar(
+            "comet_llm_openai_span", default=None
+        )
+        self._started_at: "contextvars.ContextVar[Optional[float]]" = (
+            contextvars.ContextVar("comet_llm_openai_started_at", default=None)
+        )
+        self._batch: "contextvars.ContextVar[Optional[Batch]]" = contextvars.ContextVar(
+            "comet_llm_openai_batch", default=None
+        )
 
     @property
     def chain(self) -> Optional["Chain"]:
-        return self._thread_context_registry.get("chain")  # type: ignore
+        return self._chain.get()
 
     @chain.setter
     def chain(self, value: "Chain") -> None:
-        self._thread_context_registry.add("chain", value)
+        self._chain.set(value)
 
     @property
     def span(self) -> Optional["Span"]:
-        return self._thread_context_registry.get("span")  # type: ignore
+        return self._span.get()
 
     @span.setter
     def span(self, value: "Span") -> None:
-        self._thread_context_registry.add("span", value)
+        self._span.set(value)
+
+    @property
+    def started_at(self) -> Optional[float]:
+        """
+        time.perf_counter() when the call started.
+        """
+        return self._started_at.get()
+
+    @started_at.setter
+    def started_at(self, value: float) -> None:
+        self._started_at.set(value)
+
+    @property
+    def batch(self) -> Optional["Batch"]:
+        """
+        The batch the span of the call belongs to, if calls are batched.
+        """
+        return self._batch.get()
+
+    @batch.setter
+    def batch(self, value: "Batch") -> None:
+        self._batch.set(value)
 
     def clear(self) -> None:
-        self._thread_context_registry.add("span", None)
-        self._thread_context_registry.add("chain", None)
+        self._span.set(None)
+        self._chain.set(None)
+        self._started_at.set(None)
+        self._batch.set(None)
 
 
 def clear_on_end(function: Callable) -> Callable:
@@ -12,14 +12,22 @@
 #  LICENSE file in the root directory of this package.
 # *******************************************************
 
+import functools
 import logging
-from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, Tuple
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, Optional, Tuple
 
 import comet_llm.logging
-from comet_llm import config, experiment_info
-from comet_llm.chains import api as chains_api, chain, span, state as chains_state
+from comet_llm import config, experiment_info, message_processing, sampling
+from comet_llm.chains import (
+    api as chains_api,
+    batching,
+    chain,
+    span,
+    state as chains_state,
+)
 
-from . import chat_completion_parsers, context
+from . import chat_completion_parsers, context, stream
 
 if TYPE_CHECKING:  # pragma: no cover
     import comet_ml
@@ -44,43 +52,158 @@ def before_chat_completion_create(original: Callable, *args, **kwargs) -> None:
 
     inputs, metadata = chat_completion_parsers.parse_create_arguments(kwargs)
 
+    batch_ = None
     if chains_state.global_chain_exists():
         chain_ = chains_state.get_global_chain()
+        if not chain_.sampled:
+            return
     else:
-        chain_ = chain.Chain(
-            inputs=inputs,
-            metadata=metadata,
-            experiment_info=experiment_info.get(),
-            others={"Created from": "openai-llm"},
-        )
-        context.CONTEXT.chain = chain_
-
-    span_ = span.Span(inputs=inputs, metadata=metadata, category="llm")
-
-    span_.__api__start__(chain=chain_)
-
+        if not sampling.head_sampled():
+            sampling.sampled_out("chain")
+            return
+
+        if batching.enabled():
+            batch_ = batching.start_call(others={"Created from": "openai-llm"})
+            chain_ = batch_.chain
+        else:
+            chain_ = chain.Chain(
+                inputs=inputs,
+                metadata=metadata,
+                experiment_info=experiment_info.get(),
+                others={"Created from": "openai-llm"},
+            )
+            context.CONTEXT.chain = chain_
+
+    try:
+        span_ = span.Span(inputs=inputs, metadata=metadata, category="llm")
+        span_.__api__start__(chain=chain_)
+    except Exception:
+        # The batch waits for every call it started to end
+        if batch_ is not None:
+            batch_.end_call()
+        raise
+
+    # Set once the span is started, so the after hooks end the call in
+    # the batch only together with its span.
+    if batch_ is not None:
+        context.CONTEXT.batch = batch_
     context.CONTEXT.span = span_
+    context.CONTEXT.started_at = time.perf_counter()
 
 
 @_chat_completion_error_logger
 @context.clear_on_end
-def after_chat_completion_create(original, return_value, *args, **kwargs) -> None:  # type: ignore
-    if not config.is_ready():
-        return
+def after_chat_completion_create(original, return_value, *args, **kwargs) -> Any:  # type: ignore
+    span_ = context.CONTEXT.span
+    chain_ = context.CONTEXT.chain
+    batch_ = context.CONTEXT.batch
+
+    if not config.is_ready() or span_ is None:
+        if batch_ is not None:
+            batch_.end_call()
+        return None
+
+    if chat_completion_parsers.create_result_is_stream(return_value):
+        # The span ends when the caller has consumed the stream, until then
+        # it's not the parent of the spans the caller starts.
+        span_.__api__detach__()
+        return stream.wrap(
+            return_value,
+            on_end=functools.partial(_end_stream, span_, chain_, batch_),
+            started_at=context.CONTEXT.started_at,
+            on_abandoned=functools.partial(_abandon_stream, span_, chain_, batch_),
+        )
 
-    if context.CONTEXT.span is None:
-        return
+    _end_call(
+        span_,
+        chain_,
+        batch_,
+        functools.partial(chat_completion_parsers.parse_create_result, return_value),
+    )
 
-    outputs, metadata = chat_completion_parsers.parse_create_result(return_value)
+    return None
 
-    span_ = context.CONTEXT.span
+
+def _end_stream(
+    span_: span.Span,
+    chain_: Optional[chain.Chain],
+    batch_: Optional[batching.Batch],
+    outputs: Dict[str, Any],
+    metadata: Dict[str, Any],
+) -> None:
+    _end_call(span_, chain_, batch_, lambda: (outputs, metadata), detached=True)
+
+
+def _abandon_stream(
+    span_: span.Span,
+    chain_: Optional[chain.Chain],
+    batch_: Optional[batching.Batch],
+    parse_result: Callable[[], Tuple[Dict[str, Any], Dict[str, Any]]],
+) -> None:
+    """
+    Called from the finalizer of a stream the caller stopped reading, so on
+    any thread, the event loop's one too. Only the timers are stopped here,
+    the result is parsed and logged by an uploader thread.
+    """
+    _end_call(span_, chain_, None, parse_result, detached=True, background=True)
+    if batch_ is not None:
+        message_processing.process_deferred(functools.partial(_end_batch_call, batch_))
+
+
+def _end_batch_call(batch_: batching.Batch) -> None:
+    batch_.end_call()
+
+
+def _end_call(
+    span_: span.Span,
+    chain_: Optional[chain.Chain],
+    batch_: Optional[batching.Batch],
+    parse_result: Callable[[], Tuple[Dict[str, Any], Dict[str, Any]]],
+    detached: bool = False,
+    background: Optional[bool] = None,
+) -> None:
+    """
+    The span and the session chain are stopped right away. With background
+    processing enabled, the result is parsed and the session chain is
+    logged by an uploader thread, so the caller only pays for the timers.
+    """
+    if background is None:
+        background = config.autologging_background_enabled()
+
+    try:
+        if not background:
+            outputs, metadata = parse_result()
+            span_.set_outputs(outputs=outputs, metadata=metadata)
+            span_.__api__end__(detached=detached)
+            if chain_ is not None:
+                chain_.set_outputs(outputs=outputs, metadata=metadata)
+                chains_api.log_chain(chain_)
+        elif chain_ is None:
+            # The span belongs to the user's chain or to a batch, its outputs
+            # are parsed when the chain is serialized.
+            span_.__api__defer_outputs__(parse_result)
+            span_.__api__end__(detached=detached)
+        else:
+            span_.__api__end__(detached=detached)
+            chain_.__api__end__()
+            message_processing.process_deferred(
+                functools.partial(_session_chain_message, span_, chain_, parse_result)
+            )
+    finally:
+        if batch_ is not None:
+            batch_.end_call()
+
+
+def _session_chain_message(
+    span_: span.Span,
+    chain_: chain.Chain,
+    parse_result: Callable[[], Tuple[Dict[str, Any], Dict[str, Any]]],
+) -> Optional[message_processing.TraceMessage]:
+    outputs, metadata = parse_result()
     span_.set_outputs(outputs=outputs, metadata=metadata)
-    span_.__api__end__()
+    chain_.__api__set_outputs__(outputs=outputs, metadata=metadata)
 
-    if context.CONTEXT.chain is not None:
-        chain_ = context.CONTEXT.chain
-        chain_.set_outputs(outputs=outputs, metadata=metadata)
-        chains_api.log_chain(chain_)
+    return chains_api.build_sampled_message(chain_)
 
 
 @_chat_completion_error_logger
@@ -88,5 +211,15 @@ def after_chat_completion_create(original, return_value, *args, **kwargs) -> Non
 def after_exception_chat_completion_create(  # type: ignore
     original: Callable, exception: Exception, *args, **kwargs
 ) -> None:
-    # the required logic is inside clear_on_end decorator
-    pass
+    # The session chain is dropped by clear_on_end decorator, but the span
+    # of a batched call is already in the batch, which waits for it to end.
+    batch_ = context.CONTEXT.batch
+    if batch_ is None:
+        return
+
+    span_ = context.CONTEXT.span
+    try:
+        if span_ is not None:
+            span_.__api__end__()
+    finally:
+        batch_.end_call()
@@ -31,6 +31,18 @@ def patch(registry: "registry.Registry") -> None:
         "openai", "ChatCompletion.create", hooks.after_exception_chat_completion_create
     )
 
+    registry.register_before(
+        "openai", "ChatCompletion.acreate", hooks.before_chat_completion_create
+    )
+    registry.register_after(
+        "openai", "ChatCompletion.acreate", hooks.after_chat_completion_create
+    )
+    registry.register_after_exception(
+        "openai",
+        "ChatCompletion.acreate",
+        hooks.after_exception_chat_completion_create,
+    )
+
     registry.register_before(
         "openai.resources.chat.completions",
         "Completions.create",
@@ -46,3 +58,21 @@ def patch(registry: "registry.Registry") -> None:
         "Completions.create",
         hooks.after_exception_chat_completion_create,
     )
+
+    # The hooks of the async methods are run in the task awaiting them,
+    # once the call is awaited, see import_hooks.wrapper.
+    registry.register_before(
+        "openai.resources.chat.completions",
+        "AsyncCompletions.create",
+        hooks.before_chat_completion_create,
+    )
+    registry.register_after(
+        "openai.resources.chat.completions",
+        "AsyncCompletions.create",
+        hooks.after_chat_completion_create,
+    )
+    registry.register_after_exception(
+        "openai.resources.chat.completions",
+        "AsyncCompletions.create",
+        hooks.after_exception_chat_completion_create,
+    )
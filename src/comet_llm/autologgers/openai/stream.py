@@ -0,0 +1,467 @@
+# -*- coding: utf-8 -*-
+# *******************************************************
+#   ____                     _               _
+#  / ___|___  _ __ ___   ___| |_   _ __ ___ | |
+# | |   / _ \| '_ ` _ \ / _ \ __| | '_ ` _ \| |
+# | |__| (_) | | | | | |  __/ |_ _| | | | | | |
+#  \____\___/|_| |_| |_|\___|\__(_)_| |_| |_|_|
+#
+#  Sign up for free at https://www.comet.com
+#  Copyright (C) 2015-2023 Comet ML INC
+#  This source code is licensed under the MIT license found in the
+#  LICENSE file in the root directory of this package.
+# *******************************************************
+
+
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+LOGGER = logging.getLogger(__name__)
+
+Outputs = Dict[str, Any]
+Metadata = Dict[str, Any]
+OnEnd = Callable[[Outputs, Metadata], None]
+ParseResult = Callable[[], Tuple[Outputs, Metadata]]
+OnAbandoned = Callable[[ParseResult], None]
+
+_COMPLETION_FIELDS = ("id", "object", "created", "model", "system_fingerprint")
+
+
+def wrap(
+    stream: Any,
+    on_end: OnEnd,
+    started_at: Optional[float] = None,
+    on_abandoned: Optional[OnAbandoned] = None,
+) -> Union["ChatCompletionStream", "AsyncChatCompletionStream"]:
+    if hasattr(stream, "__aiter__"):
+        return AsyncChatCompletionStream(stream, on_end, started_at, on_abandoned)
+
+    return ChatCompletionStream(stream, on_end, started_at, on_abandoned)
+
+
+class _StreamRecorder:
+    """
+    Base of the stream wrappers, the chunks are passed to the caller
+    unchanged and parsed on the way. When the stream is exhausted, closed
+    or fails, on_end is called once with the outputs and metadata of the
+    whole completion. The "stream_metrics" key of the metadata contains the
+    number of chunks, whether the stream was completed, and the timings:
+        time_to_first_token_ms: from the start of the call to the first
+            chunk with generated content.
+        inter_token_latency_ms: mean time between the content chunks.
+        tokens_per_second: generated tokens per second after the first one.
+    The tokens are counted from the usage if the stream contains it, one
+    per content chunk otherwise.
+
+    If the stream is garbage collected before any of these, on_abandoned is
+    called instead with a function returning the outputs and metadata. It
+    runs from the finalizer, on any thread and possibly during interpreter
+    shutdown, so it must not parse or log anything itself.
+
+    Other attributes are read from the original stream.
+    """
+
+    def __init__(
+        self,
+        stream: Any,
+        on_end: OnEnd,
+        started_at: Optional[float] = None,
+        on_abandoned: Optional[OnAbandoned] = None,
+    ) -> None:
+        self._stream = stream
+        self._on_end: Optional[OnEnd] = on_end
+        self._on_abandoned = on_abandoned
+        self._accumulator = ChunksAccumulator()
+        self._started_at = started_at if started_at is not None else time.perf_counter()
+        self._first_token_at: Optional[float] = None
+        self._last_token_at: Optional[float] = None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream, name)
+
+    def __del__(self) -> None:
+        # Read from __dict__ since __getattr__ recurses if __init__ has failed
+        on_abandoned = self.__dict__.get("_on_abandoned")
+        if self.__dict__.get("_on_end") is None or on_abandoned is None:
+            return
+
+        self._on_end = None
+        try:
+            on_abandoned(self._result(completed=False))
+        except Exception:
+            LOGGER.debug("Failed to end the abandoned stream", exc_info=True)
+
+    def _add(self, chunk: Any) -> None:
+        if self._on_end is not None and self._accumulator.add(chunk):
+            now = time.perf_counter()
+            if self._first_token_at is None:
+                self._first_token_at = now
+            self._last_token_at = now
+
+    def _end(self, completed: bool, error: Optional[Exception] = None) -> None:
+        if self._on_end is None:
+            return
+
+        on_end, self._on_end = self._on_end, None
+        try:
+            outputs, metadata = self._result(completed, error)()
+            on_end(outputs, metadata)
+        except Exception:
+            LOGGER.debug("Failed to log the streamed ChatCompletion", exc_info=True)
+
+    def _result(
+        self, completed: bool, error: Optional[Exception] = None
+    ) -> "_StreamResult":
+        return _StreamResult(
+            self._accumulator,
+            completed=completed,
+            error=error,
+            started_at=self._started_at,
+            first_token_at=self._first_token_at,
+            last_token_at=self._last_token_at,
+        )
+
+
+class _StreamResult:
+    """
+    Builds the outputs and metadata of the stream when called. Doesn't
+    reference the stream itself, so it can be called after the stream
+    is garbage collected.
+    """
+
+    def __init__(
+        self,
+        accumulator: "ChunksAccumulator",
+        completed: bool,
+        error: Optional[Exception],
+        started_at: float,
+        first_token_at: Optional[float],
+        last_token_at: Optional[float],
+    ) -> None:
+        self._accumulator = accumulator
+        self._completed = completed
+        self._error = error
+        self._started_at = started_at
+        self._first_token_at = first_token_at
+        self._last_token_at = last_token_at
+
+    def __call__(self) -> Tuple[Outputs, Metadata]:
+        outputs, metadata = self._accumulator.result()
+        metadata["stream_metrics"] = self._stream_metrics(metadata)
+        if self._error is not None:
+            metadata["error"] = repr(self._error)
+
+        return outputs, metadata
+
+    def _stream_metrics(self, metadata: Metadata) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "completed": self._completed,
+            "chunks": self._accumulator.chunks,
+        }
+        if self._first_token_at is None or self._last_token_at is None:
+            return result
+
+        result["time_to_first_token_ms"] = (
+            self._first_token_at - self._started_at
+        ) * 1000
+
+        tokens = self._accumulator.content_chunks
+        usage = metadata.get("usage")
+        if isinstance(usage, dict) and usage.get("completion_tokens"):
+            tokens = usage["completion_tokens"]
+
+        generation_time = self._last_token_at - self._first_token_at
+        if tokens > 1 and generation_time > 0:
+            result["inter_token_latency_ms"] = generation_time / (tokens - 1) * 1000
+            result["tokens_per_second"] = (tokens - 1) / generation_time
+
+        return result
+
+
+class ChatCompletionStream(_StreamRecorder):
+    """
+    Wraps the stream returned by ChatCompletion.create(stream=True).
+    """
+
+    def __init__(
+        self,
+        stream: Any,
+        on_end: OnEnd,
+        started_at: Optional[float] = None,
+        on_abandoned: Optional[OnAbandoned] = None,
+    ) -> None:
+        super().__init__(stream, on_end, started_at, on_abandoned)
+        self._iterator = iter(stream)
+
+    def __iter__(self) -> "ChatCompletionStream":
+        return self
+
+    def __next__(self) -> Any:
+        try:
+            chunk = next(self._iterator)
+        except StopIteration:
+            self._end(completed=True)
+            raise
+        except Exception as exception:
+            self._end(completed=False, error=exception)
+            raise
+
+        self._add(chunk)
+        return chunk
+
+    def close(self) -> None:
+        try:
+            close = getattr(self._stream, "close", None)
+            if close is not None:
+                close()
+        finally:
+            self._end(completed=False)
+
+    def __enter__(self) -> "ChatCompletionStream":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:  # type: ignore
+        self.close()
+
+
+class AsyncChatCompletionStream(_StreamRecorder):
+    """
+    Wraps the stream returned by AsyncCompletions.create(stream=True) or
+    ChatCompletion.acreate(stream=True).
+    """
+
+    def __init__(
+        self,
+        stream: Any,
+        on_end: OnEnd,
+        started_at: Optional[float] = None,
+        on_abandoned: Optional[OnAbandoned] = None,
+    ) -> None:
+        super().__init__(stream, on_end, started_at, on_abandoned)
+        self._iterator = stream.__aiter__()
+
+    def __aiter__(self) -> "AsyncChatCompletionStream":
+        return self
+
+    async def __anext__(self) -> Any:
+        try:
+            chunk = await self._iterator.__anext__()
+        except StopAsyncIteration:
+            self._end(completed=True)
+            raise
+        except Exception as exception:
+            self._end(completed=False, error=exception)
+            raise
+
+        self._add(chunk)
+        return chunk
+
+    async def close(self) -> None:
+        try:
+            # openai>=1.0 AsyncStream has close(), async generators aclose()
+            close = getattr(self._stream, "close", None)
+            if close is None:
+                close = getattr(self._stream, "aclose", None)
+            if close is not None:
+                await close()
+        finally:
+            self._end(completed=False)
+
+    async def aclose(self) -> None:
+        await self.close()
+
+    async def __aenter__(self) -> "AsyncChatCompletionStream":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:  # type: ignore
+        await self.close()
+
+
+class ChunksAccumulator:
+    """
+    Builds the choices of a streamed completion from the deltas of its
+    chunks. Only the generated pieces are kept, not the chunk objects, and
+    the pieces are joined once, by result(). Works with the chunk objects of
+    openai>=1.0 and the dictionaries of openai<1.0.
+    """
+
+    def __init__(self) -> None:
+        self._choices: Dict[int, _Choice] = {}
+        self._metadata: Metadata = {}
+        self.chunks = 0
+        self.content_chunks = 0
+
+    def add(self, chunk: Any) -> bool:
+        """
+        Returns True if the chunk contains generated content.
+        """
+        self.chunks += 1
+        if len(self._metadata) < len(_COMPLETION_FIELDS):
+            for name in _COMPLETION_FIELDS:
+                if name not in self._metadata:
+                    value = _field(chunk, name)
+                    if value is not None:
+                        self._metadata[name] = value
+
+        usage = _field(chunk, "usage")
+        if usage is not None:
+            self._metadata["usage"] = _as_dict(usage)
+
+        has_content = False
+        for choice_chunk in _field(chunk, "choices") or ():
+            index = _field(choice_chunk, "index") or 0
+            choice = self._choices.get(index)
+            if choice is None:
+                choice = self._choices[index] = _Choice(index)
+
+            has_content = choice.add(choice_chunk) or has_content
+
+        if has_content:
+            self.content_chunks += 1
+
+        return has_content
+
+    def result(self) -> Tuple[Outputs, Metadata]:
+        choices = [self._choices[index].as_dict() for index in sorted(self._choices)]
+        metadata = dict(self._metadata)
+        metadata.pop("object", None)
+        if "model" in metadata:
+            metadata["output_model"] = metadata.pop("model")
+
+        return {"choices": choices}, metadata
+
+
+class _Choice:
+    __slots__ = (
+        "index",
+        "role",
+        "content",
+        "function_call",
+        "tool_calls",
+        "finish_reason",
+    )
+
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.role: Optional[str] = None
+        self.content: List[str] = []
+        self.function_call: Optional[_FunctionCall] = None
+        self.tool_calls: Dict[int, _ToolCall] = {}
+        self.finish_reason: Optional[str] = None
+
+    def add(self, choice_chunk: Any) -> bool:
+        finish_reason = _field(choice_chunk, "finish_reason")
+        if finish_reason is not None:
+            self.finish_reason = finish_reason
+
+        delta = _field(choice_chunk, "delta")
+        if delta is None:
+            return False
+
+        role = _field(delta, "role")
+        if role is not None:
+            self.role = role
+
+        has_content = False
+        content = _field(delta, "content")
+        if content:
+            self.content.append(content)
+            has_content = True
+
+        function_call = _field(delta, "function_call")
+        if function_call is not None:
+            if self.function_call is None:
+                self.function_call = _FunctionCall()
+            has_content = self.function_call.add(function_call) or has_content
+
+        for tool_call_chunk in _field(delta, "tool_calls") or ():
+            index = _field(tool_call_chunk, "index") or 0
+            tool_call = self.tool_calls.get(index)
+            if tool_call is None:
+                tool_call = self.tool_calls[index] = _ToolCall()
+            has_content = tool_call.add(tool_call_chunk) or has_content
+
+        return has_content
+
+    def as_dict(self) -> Dict[str, Any]:
+        message: Dict[str, Any] = {
+            "role": self.role,
+            "content": "".join(self.content) if len(self.content) > 0 else None,
+        }
+        if self.function_call is not None:
+            message["function_call"] = self.function_call.as_dict()
+        if len(self.tool_calls) > 0:
+            message["tool_calls"] = [
+                self.tool_calls[index].as_dict() for index in sorted(self.tool_calls)
+            ]
+
+        return {
+            "index": self.index,
+            "message": message,
+            "finish_reason": self.finish_reason,
+        }
+
+
+class _FunctionCall:
+    __slots__ = ("name", "arguments")
+
+    def __init__(self) -> None:
+        self.name: Optional[str] = None
+        self.arguments: List[str] = []
+
+    def add(self, function_call: Any) -> bool:
+        name = _field(function_call, "name")
+        if name is not None:
+            self.name = name
+
+        arguments = _field(function_call, "arguments")
+        if arguments:
+            self.arguments.append(arguments)
+            return True
+
+        return False
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "arguments": "".join(self.arguments)}
+
+
+class _ToolCall:
+    __slots__ = ("id", "type", "function")
+
+    def __init__(self) -> None:
+        self.id: Optional[str] = None
+        self.type: Optional[str] = None
+        self.function = _FunctionCall()
+
+    def add(self, tool_call_chunk: Any) -> bool:
+        for name in ("id", "type"):
+            value = _field(tool_call_chunk, name)
+            if value is not None:
+                setattr(self, name, value)
+
+        function_call = _field(tool_call_chunk, "function")
+        if function_call is None:
+            return False
+
+        return self.function.add(function_call)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "type": self.type, "function": self.function.as_dict()}
+
+
+def _field(item: Any, name: str) -> Any:
+    # openai<1.0 objects are dictionaries, openai>=1.0 ones have attributes
+    if isinstance(item, dict):
+        return item.get(name)
+
+    return getattr(item, name, None)
+
+
+def _as_dict(item: Any) -> Any:
+    if isinstance(item, dict):
+        return dict(item)
+    if hasattr(item, "model_dump"):
+        return item.model_dump()
+
+    return item
@@ -12,8 +12,6 @@
 #  LICENSE file in the root directory of this package.
 # *******************************************************
 
-import io
-import json
 from typing import Dict, List, Optional
 
 from .. import (
@@ -21,13 +19,14 @@ from .. import (
     config,
     convert,
     exceptions,
-    experiment_api,
     experiment_info,
     llm_result,
     logging_messages,
+    message_processing,
+    sampling,
 )
 from ..types import JSONEncodable
-from . import chain, state
+from . import chain, span, state, version
 
 
 @exceptions.filter(allow_raising=config.raising_enabled(), summary=app.SUMMARY)
@@ -38,6 +37,7 @@ def start_chain(
     project: Optional[str] = None,
     metadata: Optional[Dict[str, Dict[str, JSONEncodable]]] = None,
     tags: Optional[List[str]] = None,
+    sampled: Optional[bool] = None,
 ) -> None:
     """
     Creates global Chain object that tracks created Spans.
@@ -50,6 +50,8 @@ def start_chain(
         metadata: Dict[str, Dict[str, JSONEncodable]] (optional) user-defined
             dictionary with additional metadata to the call.
         tags: List[str] (optional) user-defined tags attached to the chain
+        sampled: bool (optional) True records and logs the chain, False skips it,
+            regardless of the sampling configuration.
     """
 
     MESSAGE = """
@@ -64,11 +66,20 @@ def start_chain(
         project,
         api_key_not_found_message=MESSAGE,
     )
+    segment_size = config.chain_export_segment_size()
+    head_sampled = sampling.head_sampled(sampled)
+    incremental = segment_size > 0 and head_sampled
+
     global_chain = chain.Chain(
         inputs=inputs,
         metadata=metadata,
         experiment_info=experiment_info_,
         tags=tags,
+        experiment_ref=message_processing.experiment_ref() if incremental else None,
+        segment_size=segment_size,
+        segment_exporter=export_segment if incremental else None,
+        sampled=head_sampled,
+        sampling_override=sampled,
     )
     state.set_global_chain(global_chain)
 
@@ -77,7 +88,8 @@ def start_chain(
 def end_chain(
     outputs: Dict[str, JSONEncodable],
     metadata: Optional[Dict[str, JSONEncodable]] = None,
-) -> llm_result.LLMResult:
+    sampled: Optional[bool] = None,
+) -> Optional[llm_result.LLMResult]:
     """
     Commits global chain and logs the result to Comet.
     Args:
@@ -87,8 +99,12 @@ def end_chain(
             will be deep merged with the metadata passed to start_chain if
             it was provided.
         tags: List[str] (optional) user-defined tags attached to the chain
+        sampled: bool (optional) True logs the chain, False skips it, regardless
+            of the sampling configuration. A chain that was not sampled in
+            start_chain has no spans recorded and is never logged.
 
-    Returns: LLMResult
+    Returns: LLMResult, or None if asynchronous logging is enabled
+        or the chain was not sampled.
     """
     global_chain = state.get_global_chain()
     if global_chain is None:
@@ -97,41 +113,86 @@ def end_chain(
         )
 
     global_chain.set_outputs(outputs=outputs, metadata=metadata)
-    return log_chain(global_chain)
+    return log_chain(global_chain, sampled=sampled)
 
 
-def log_chain(chain: chain.Chain) -> llm_result.LLMResult:
-    chain_data = chain.as_dict()
+def log_chain(
+    chain: chain.Chain, sampled: Optional[bool] = None
+) -> Optional[llm_result.LLMResult]:
+    message = build_sampled_message(chain, sampled)
+    if message is None:
+        return None
 
-    experiment_info_ = chain.experiment_info
-    experiment_api_ = experiment_api.ExperimentAPI.create_new(
-        api_key=experiment_info_.api_key,
-        workspace=experiment_info_.workspace,
-        project_name=experiment_info_.project_name,
-    )
+    return message_processing.process(message)
 
-    if chain.tags is not None:
-        experiment_api_.log_tags(chain.tags)
 
-    experiment_api_.log_asset_with_io(
-        name="comet_llm_data.json",
-        file=io.StringIO(json.dumps(chain_data)),
-        asset_type="llm_data",
-    )
+def build_sampled_message(
+    chain: chain.Chain, sampled: Optional[bool] = None
+) -> Optional[message_processing.TraceMessage]:
+    """
+    Returns None if the chain is sampled out. sampled overrides the
+    decision passed to start_chain.
+    """
+    if not chain.sampled:
+        sampling.sampled_out("chain")
+        return None
 
-    experiment_api_.log_metric(
-        name="chain_duration", value=chain_data["chain_duration"]
-    )
+    message = build_message(chain)
+    override = sampled if sampled is not None else chain.sampling_override
+    if len(chain.exported_segments) > 0:
+        # Part of the chain is already logged, the rest has to follow it
+        override = True
 
-    parameters = convert.chain_metadata_to_flat_parameters(chain_data["metadata"])
-    for name, value in parameters.items():
-        experiment_api_.log_parameter(name, value)
+    if not sampling.tail_sampled(message.trace_data, override):
+        sampling.sampled_out("chain")
+        return None
 
-    for name, value in chain.others.items():
-        experiment_api_.log_other(name, value)
+    return message
+
+
+@exceptions.filter(allow_raising=False, summary=app.SUMMARY)
+def export_segment(chain: chain.Chain, nodes: List[span.Span], index: int) -> str:
+    """
+    Logs the ended spans of a running chain in the background,
+    returns the name of the asset they are logged to.
+    """
+    message = build_segment_message(chain, nodes, index)
+    message_processing.process_in_background(message)
+
+    return message.asset_name
+
+
+def build_segment_message(
+    chain: chain.Chain, nodes: List[span.Span], index: int
+) -> message_processing.TraceMessage:
+    segment_data = {
+        "version": version.ASSET_FORMAT_VERSION,
+        "chain_segment": index,
+        "chain_nodes": list(nodes),
+    }
+
+    return message_processing.TraceMessage(
+        experiment_info=chain.experiment_info,
+        trace_data=segment_data,
+        category="chain",
+        experiment_ref=chain.experiment_ref,
+        segment_index=index,
+    )
 
-    app.SUMMARY.add_log(experiment_api_.project_url, "chain")
 
-    return llm_result.LLMResult(
-        id=experiment_api_.id, project_url=experiment_api_.project_url
+def build_message(chain: chain.Chain) -> message_processing.TraceMessage:
+    chain_data = chain.as_dict(lazy_nodes=True)
+
+    return message_processing.TraceMessage(
+        experiment_info=chain.experiment_info,
+        trace_data=chain_data,
+        category="chain",
+        tags=chain.tags,
+        metrics={
+            "chain_duration": chain_data["chain_duration"],
+            **chain.usage_metrics(),
+        },
+        parameters=convert.chain_metadata_to_flat_parameters(chain_data["metadata"]),
+        others=chain.others,
+        experiment_ref=chain.experiment_ref,
     )
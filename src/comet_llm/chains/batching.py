@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+# *******************************************************
+#   ____                     _               _
+#  / ___|___  _ __ ___   ___| |_   _ __ ___ | |
+# | |   / _ \| '_ ` _ \ / _ \ __| | '_ ` _ \| |
+# | |__| (_) | | | | | |  __/ |_ _| | | | | | |
+#  \____\___/|_| |_| |_|\___|\__(_)_| |_| |_|_|
+#
+#  Sign up for free at https://www.comet.com
+#  Copyright (C) 2015-2023 Comet ML INC
+#  This source code is licensed under the MIT license found in the
+#  LICENSE file in the root directory of this package.
+# *******************************************************
+
+
+import contextlib
+import contextvars
+import functools
+import threading
+from typing import Dict, Iterator, Optional
+
+from .. import config, experiment_info, message_processing
+from ..types import JSONEncodable
+from . import api as chains_api, chain
+
+_SESSION_KEY: "contextvars.ContextVar[Optional[str]]" = contextvars.ContextVar(
+    "comet_llm_session_key", default=None
+)
+
+
+class Batch:
+    """
+    Chain the autologged calls of one session are added to as spans.
+    It's logged as one trace, so one experiment is created for all of them.
+    """
+
+    __slots__ = ("key", "chain", "calls", "running", "closed", "timer", "_batcher")
+
+    def __init__(self, batcher: "Batcher", key: Optional[str], chain: chain.Chain):
+        self.key = key
+        self.chain = chain
+        self.calls = 0
+        self.running = 0
+        self.closed = False
+        self.timer: Optional[threading.Timer] = None
+        self._batcher = batcher
+
+    def end_call(self) -> None:
+        self._batcher.end_call(self)
+
+
+class Batcher:
+    """
+    Groups the autologged calls made outside of a user's chain by session
+    key. A batch stops accepting calls when it has max_calls of them,
+    window seconds after its first call, when its session ends or when
+    the data is flushed. It's logged once its running calls have ended.
+    """
+
+    def __init__(self, max_calls: int, window: float) -> None:
+        self._max_calls = max_calls
+        self._window = window
+        self._lock = threading.Lock()
+        self._open: Dict[Optional[str], Batch] = {}
+
+    def start_call(
+        self, key: Optional[str], others: Optional[Dict[str, JSONEncodable]] = None
+    ) -> Batch:
+        with self._lock:
+            batch = self._open.get(key)
+            if batch is None:
+                batch = Batch(self, key, _new_chain(key, others))
+                self._open[key] = batch
+                if self._window > 0:
+                    batch.timer = threading.Timer(
+                        self._window, self._close_batch, (batch,)
+                    )
+                    batch.timer.daemon = True
+                    batch.timer.start()
+
+            batch.calls += 1
+            batch.running += 1
+            if self._max_calls > 0 and batch.calls >= self._max_calls:
+                # Its last call is running, it's logged when the call ends
+                self._close(batch)
+
+        return batch
+
+    def end_call(self, batch: Batch) -> None:
+        with self._lock:
+            batch.running -= 1
+            ready = batch.closed and batch.running == 0
+
+        if ready:
+            _log(batch)
+
+    def close(self, key: Optional[str]) -> None:
+        with self._lock:
+            batch = self._open.get(key)
+            ready = batch is not None and self._close(batch)
+
+        if ready:
+            _log(batch)  # type: ignore
+
+    def close_all(self) -> None:
+        with self._lock:
+            ready = [batch for batch in list(self._open.values()) if self._close(batch)]
+
+        for batch in ready:
+            _log(batch)
+
+    def _close_batch(self, batch: Batch) -> None:
+        with self._lock:
+            ready = self._close(batch)
+
+        if ready:
+            _log(batch)
+
+    def _close(self, batch: Batch) -> bool:
+        """
+        Must be called with the lock held. Returns True if the batch
+        has to be logged now, i.e. none of its calls is running.
+        """
+        if batch.closed:
+            return False
+
+        batch.closed = True
+        if self._open.get(batch.key) is batch:
+            del self._open[batch.key]
+        if batch.timer is not None:
+            batch.timer.cancel()
+
+        return batch.running == 0
+
+
+_BATCHER: Optional[Batcher] = None
+_BATCHER_LOCK = threading.Lock()
+
+
+def enabled() -> bool:
+    """
+    True if the autologged calls made outside of a user's chain
+    are batched instead of being logged as one chain each.
+    """
+    return (
+        _SESSION_KEY.get() is not None
+        or config.autologging_batch_max_calls() > 0
+        or config.autologging_batch_window() > 0
+    )
+
+
+def start_call(others: Optional[Dict[str, JSONEncodable]] = None) -> Batch:
+    """
+    Returns the batch of the current session the call is added to,
+    Batch.end_call() must be called when the call ends.
+    """
+    return _get_batcher().start_call(_SESSION_KEY.get(), others)
+
+
+def close_all() -> None:
+    batcher = _BATCHER
+    if batcher is not None:
+        batcher.close_all()
+
+
+@contextlib.contextmanager
+def autolog_session(key: str) -> Iterator[None]:
+    """
+    Groups the calls autologged inside the block into the batches of the
+    session key, the batch still open is logged when the block exits.
+    Calls made inside a chain started with start_chain are not affected.
+
+    Args:
+        key: str (required) the session identifier, e.g. a user or
+            conversation id. It's logged as the input of the batch chains.
+    """
+    token = _SESSION_KEY.set(key)
+    try:
+        yield
+    finally:
+        _SESSION_KEY.reset(token)
+        batcher = _BATCHER
+        if batcher is not None:
+            batcher.close(key)
+
+
+def _get_batcher() -> Batcher:
+    global _BATCHER
+
+    with _BATCHER_LOCK:
+        if _BATCHER is None:
+            _BATCHER = Batcher(
+                max_calls=config.autologging_batch_max_calls(),
+                window=config.autologging_batch_window(),
+            )
+            message_processing.on_shutdown(_BATCHER.close_all)
+
+        return _BATCHER
+
+
+def _new_chain(
+    key: Optional[str], others: Optional[Dict[str, JSONEncodable]]
+) -> chain.Chain:
+    return chain.Chain(
+        inputs={"session_key": key} if key is not None else {},
+        metadata=None,
+        experiment_info=experiment_info.get(),
+        others=others,
+    )
+
+
+def _log(batch: Batch) -> None:
+    # The batch may be closed by a caller's thread, the parsing of the
+    # outputs and the upload are done by the uploader.
+    batch.chain.set_outputs(outputs={"calls": batch.calls})
+    message_processing.process_deferred(
+        functools.partial(chains_api.build_sampled_message, batch.chain)
+    )
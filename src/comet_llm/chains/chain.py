@@ -13,18 +13,47 @@
 # *******************************************************
 
 import collections
-from typing import TYPE_CHECKING, Dict, List, Optional
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set
 
-from .. import datetimes
+from .. import datetimes, usage
 from ..types import JSONEncodable
 from . import context, deepmerge, version
 
 if TYPE_CHECKING:  # pragma: no cover
     from ..experiment_info import ExperimentInfo
+    from ..message_processing import ExperimentRef
     from . import span
 
+SegmentExporter = Callable[["Chain", List["span.Span"], int], Optional[str]]
+
 
 class Chain:
+    __slots__ = (
+        "_nodes",
+        "_nodes_lock",
+        "_ended_node_ids",
+        "_segment_size",
+        "_segment_exporter",
+        "_segments_count",
+        "_exported_segments",
+        "_node_names_registry",
+        "_inputs",
+        "_outputs",
+        "_metadata",
+        "_context",
+        "_timer",
+        "_experiment_info",
+        "_tags",
+        "_others",
+        "_experiment_ref",
+        "_sampled",
+        "_sampling_override",
+        "_usage",
+        "_deferred_nodes",
+        "__weakref__",
+    )
+
     def __init__(
         self,
         inputs: JSONEncodable,
@@ -32,8 +61,27 @@ class Chain:
         experiment_info: "ExperimentInfo",
         tags: Optional[List[str]] = None,
         others: Optional[Dict[str, JSONEncodable]] = None,
+        experiment_ref: Optional["ExperimentRef"] = None,
+        segment_size: int = 0,
+        segment_exporter: Optional[SegmentExporter] = None,
+        sampled: bool = True,
+        sampling_override: Optional[bool] = None,
     ):
+        """
+        If segment_exporter is set, every time segment_size spans have ended
+        they are passed to it and dropped from the chain. The exporter returns
+        the name of the asset the segment is logged to, or None if it failed.
+
+        Spans are not tracked by a chain that is not sampled. sampling_override
+        is the sampling decision passed by the user when the chain was started.
+        """
         self._nodes: List["span.Span"] = []
+        self._nodes_lock = threading.Lock()
+        self._ended_node_ids: Set[int] = set()
+        self._segment_size = segment_size
+        self._segment_exporter = segment_exporter
+        self._segments_count = 0
+        self._exported_segments: List[str] = []
         self._node_names_registry: collections.defaultdict = collections.defaultdict(
             lambda: 0
         )
@@ -46,6 +94,11 @@ class Chain:
         self._experiment_info = experiment_info
         self._tags = tags
         self._others = others if others is not None else {}
+        self._experiment_ref = experiment_ref
+        self._sampled = sampled
+        self._sampling_override = sampling_override
+        self._usage = usage.Usage()
+        self._deferred_nodes: List["span.Span"] = []
 
     @property
     def experiment_info(self) -> "ExperimentInfo":  # pragma: no cover
@@ -59,6 +112,29 @@ class Chain:
     def others(self) -> Dict[str, JSONEncodable]:
         return self._others
 
+    @property
+    def experiment_ref(self) -> Optional["ExperimentRef"]:
+        return self._experiment_ref
+
+    @property
+    def sampled(self) -> bool:
+        return self._sampled
+
+    @property
+    def sampling_override(self) -> Optional[bool]:
+        return self._sampling_override
+
+    @property
+    def usage(self) -> usage.Usage:
+        """
+        Token usage of the spans of the chain, updated when their outputs are set.
+        """
+        return self._usage
+
+    @property
+    def exported_segments(self) -> List[str]:
+        return self._exported_segments
+
     @property
     def context(self) -> "context.Context":  # pragma: no cover
         return self._context
@@ -68,21 +144,84 @@ class Chain:
         self._timer.start()
 
     def track_node(self, node: "span.Span") -> None:
-        self._nodes.append(node)
+        with self._nodes_lock:
+            self._nodes.append(node)
+
+    def __api__track_deferred_node__(self, node: "span.Span") -> None:
+        with self._nodes_lock:
+            self._deferred_nodes.append(node)
+
+    def usage_metrics(self) -> Dict[str, JSONEncodable]:
+        """
+        The spans with deferred outputs are resolved first, they are the
+        only ones whose usage is not counted yet.
+        """
+        with self._nodes_lock:
+            deferred_nodes, self._deferred_nodes = self._deferred_nodes, []
+
+        for node in deferred_nodes:
+            node.__api__resolve_outputs__()
+
+        return self._usage.as_metrics()
+
+    def node_ended(self, node: "span.Span") -> None:
+        if self._segment_exporter is None:
+            return
+
+        with self._nodes_lock:
+            self._ended_node_ids.add(node.id)
+            if len(self._ended_node_ids) < self._segment_size:
+                return
+
+            # Spans that are still running, e.g. the parents of the ended
+            # ones, stay in the chain until they end too.
+            ended_ids = self._ended_node_ids
+            segment = [node for node in self._nodes if node.id in ended_ids]
+            self._nodes = [node for node in self._nodes if node.id not in ended_ids]
+            self._ended_node_ids = set()
+            index = self._segments_count
+            self._segments_count += 1
+
+        asset_name = self._segment_exporter(self, segment, index)
+        if asset_name is not None:
+            self._exported_segments.append(asset_name)
+
+    def __api__end__(self) -> None:
+        """
+        Stops the timer of the chain before its outputs are known, e.g.
+        when they are parsed in the background. They are set later with
+        __api__set_outputs__, which doesn't stop the timer again.
+        """
+        self._timer.stop()
 
-    def set_outputs(
+    def __api__set_outputs__(
         self,
         outputs: Dict[str, JSONEncodable],
         metadata: Optional[Dict[str, JSONEncodable]] = None,
     ) -> None:
-        self._timer.stop()
         self._outputs = outputs
 
         if metadata is not None:
             self._metadata = deepmerge.deepmerge(self._metadata, metadata)
 
-    def as_dict(self) -> Dict[str, JSONEncodable]:
-        chain_nodes = [chain_node.as_dict() for chain_node in self._nodes]
+    def set_outputs(
+        self,
+        outputs: Dict[str, JSONEncodable],
+        metadata: Optional[Dict[str, JSONEncodable]] = None,
+    ) -> None:
+        self._timer.stop()
+        self.__api__set_outputs__(outputs, metadata)
+
+    def as_dict(self, lazy_nodes: bool = False) -> Dict[str, JSONEncodable]:
+        """
+        lazy_nodes: if True, "chain_nodes" contains the span objects themselves,
+            they are converted to dictionaries by the serializer one at a time.
+        """
+        chain_nodes: List[Any]
+        if lazy_nodes:
+            chain_nodes = list(self._nodes)
+        else:
+            chain_nodes = [chain_node.as_dict() for chain_node in self._nodes]
 
         inputs = self._inputs
         outputs = self._outputs
@@ -102,6 +241,9 @@ class Chain:
             "chain_duration": self._timer.duration,
         }
 
+        if len(self._exported_segments) > 0:
+            result["chain_segments"] = sorted(self._exported_segments)
+
         return result
 
     def generate_node_name(self, category: str) -> str:
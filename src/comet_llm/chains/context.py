@@ -12,19 +12,83 @@
 #  LICENSE file in the root directory of this package.
 # *******************************************************
 
-from typing import List
+import contextvars
+from typing import List, Optional, Tuple
+
+
+class ContextNode:
+    """
+    Immutable node of the span tree, it's shared by all the spans
+    started inside the span with span_id.
+    """
+
+    __slots__ = ("span_id", "parent")
+
+    def __init__(self, span_id: int, parent: Optional["ContextNode"]) -> None:
+        self.span_id = span_id
+        self.parent = parent
+
+
+def node_ids(node: Optional[ContextNode]) -> List[int]:
+    """
+    Returns the ids of the node and all its ancestors, from the root.
+    """
+    result = []
+    while node is not None:
+        result.append(node.span_id)
+        node = node.parent
+
+    result.reverse()
+    return result
 
 
 class Context:
-    def __init__(self) -> None:
-        self._stack: List[int] = []
+    """
+    Stack of the active spans. Stored as a linked list of
+    ContextNode, so a span keeps a reference to its parent node
+    instead of a copy of the whole stack.
+
+    The top of the stack is kept in a context variable, so the asyncio
+    tasks sharing a chain don't see each other's spans as parents. Except
+    on Python 3.6, where the contextvars backport is per thread only.
+    """
+
+    __slots__ = ()
 
     def add(self, span_id: int) -> None:
-        self._stack.append(span_id)
+        _ACTIVE_NODE.set((self, ContextNode(span_id, self.current_node())))
 
     def pop(self) -> None:
-        if len(self._stack) > 0:
-            self._stack.pop()
+        top = self.current_node()
+        if top is not None:
+            _ACTIVE_NODE.set((self, top.parent))
+
+    def activate(
+        self, node: Optional[ContextNode]
+    ) -> "contextvars.Token[Optional[Tuple[Context, Optional[ContextNode]]]]":
+        """
+        Makes node the top of the stack until restore() is called with
+        the returned token, from the same thread or task.
+        """
+        return _ACTIVE_NODE.set((self, node))
+
+    def restore(
+        self,
+        token: "contextvars.Token[Optional[Tuple[Context, Optional[ContextNode]]]]",
+    ) -> None:
+        _ACTIVE_NODE.reset(token)
+
+    def current_node(self) -> Optional[ContextNode]:
+        active = _ACTIVE_NODE.get()
+        if active is None or active[0] is not self:
+            return None
+
+        return active[1]
 
     def current(self) -> List[int]:
-        return list(self._stack)
+        return node_ids(self.current_node())
+
+
+_ACTIVE_NODE: "contextvars.ContextVar[Optional[Tuple[Context, Optional[ContextNode]]]]" = contextvars.ContextVar(
+    "comet_llm_active_span", default=None
+)
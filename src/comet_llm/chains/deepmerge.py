@@ -12,7 +12,6 @@
 #  LICENSE file in the root directory of this package.
 # *******************************************************
 
-import copy
 import logging
 from typing import Any, Dict
 
@@ -24,7 +23,18 @@ LOGGER = logging.getLogger(__name__)
 def deepmerge(
     dict1: Dict[str, Any], dict2: Dict[str, Any], max_depth: int = 10
 ) -> Dict[str, Any]:
-    merged = copy.deepcopy(dict1)
+    """
+    Returns dict1 updated with dict2, nested dictionaries present in both
+    are merged recursively up to max_depth levels.
+
+    Neither argument is modified. Only the dictionaries on the paths
+    updated by dict2 are copied, the rest of the result is shared with
+    dict1 and dict2, so they must not be modified in place afterwards.
+    """
+    if len(dict2) == 0:
+        return dict1
+
+    merged = dict(dict1)
 
     for key, value in dict2.items():
         if (
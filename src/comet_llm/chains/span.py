@@ -13,19 +13,26 @@
 # *******************************************************
 
 import logging
-from typing import TYPE_CHECKING, Dict, List, Optional
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
 
 from comet_llm import logging as comet_logging
 
-from .. import config, datetimes, exceptions, logging_messages
+from .. import config, datetimes, exceptions, logging_messages, usage
 from ..types import JSONEncodable
-from . import deepmerge, state
+from . import context, deepmerge, state
 
 if TYPE_CHECKING:
     from . import chain
 
 LOGGER = logging.getLogger(__name__)
 
+_DEFERRED_OUTPUTS_LOCK = threading.Lock()
+
+DeferredOutputs = Callable[
+    [], Tuple[Dict[str, JSONEncodable], Optional[Dict[str, JSONEncodable]]]
+]
+
 
 class Span:
     """
@@ -35,6 +42,19 @@ class Span:
     Outer Span is considered to be a parent for an inner one.
     """
 
+    __slots__ = (
+        "_inputs",
+        "_category",
+        "_metadata",
+        "_outputs",
+        "_parent",
+        "_chain",
+        "_id",
+        "_name",
+        "_timer",
+        "_deferred_outputs",
+    )
+
     def __init__(
         self,
         inputs: JSONEncodable,
@@ -52,18 +72,20 @@ class Span:
         """
         self._inputs = inputs
         self._category = category
-        self._metadata = metadata if metadata is not None else {}
+        # Most spans have no metadata, None saves an empty dict per span
+        self._metadata = metadata
         self._outputs: Optional[Dict[str, JSONEncodable]] = None
-        self._context: Optional[List[int]] = None
+        self._parent: Optional[context.ContextNode] = None
         self._chain: Optional["chain.Chain"] = None
 
         self._id = state.get_new_id()
         self._name = name if name is not None else "unnamed"
         self._timer = datetimes.Timer()
+        self._deferred_outputs: Optional[DeferredOutputs] = None
 
     def _connect_to_chain(self, chain: "chain.Chain") -> None:
         chain.track_node(self)
-        self._context = chain.context.current()
+        self._parent = chain.context.current_node()
         self._name = (
             self._name
             if self._name != "unnamed"
@@ -95,7 +117,9 @@ class Span:
 
             return self
 
-        self.__api__start__(chain)
+        if chain.sampled:
+            self.__api__start__(chain)
+
         return self
 
     def __api__start__(self, chain: "chain.Chain") -> None:
@@ -107,11 +131,29 @@ class Span:
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:  # type: ignore
         self.__api__end__()
 
-    def __api__end__(self) -> None:
+    async def __aenter__(self) -> "Span":
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:  # type: ignore
+        self.__exit__(exc_type, exc_val, exc_tb)
+
+    def __api__detach__(self) -> None:
+        """
+        Removes the started span from the active context of its chain, so
+        the spans started after it are not its children, e.g. while the
+        caller consumes a stream the span is logging. The span keeps
+        running until __api__end__(detached=True) is called.
+        """
         if self._chain is not None:
-            self._timer.stop()
             self._chain.context.pop()
 
+    def __api__end__(self, detached: bool = False) -> None:
+        if self._chain is not None:
+            self._timer.stop()
+            if not detached:
+                self._chain.context.pop()
+            self._chain.node_ended(self)
+
     def set_outputs(
         self,
         outputs: Dict[str, JSONEncodable],
@@ -127,24 +169,125 @@ class Span:
         """
         self._outputs = outputs
         if metadata is not None:
-            self._metadata = deepmerge.deepmerge(self._metadata, metadata)
+            self._metadata = (
+                metadata
+                if self._metadata is None
+                else deepmerge.deepmerge(self._metadata, metadata)
+            )
+            if self._chain is not None:
+                usage.record(
+                    self._chain.usage, metadata, usage.model_name(self._metadata)
+                )
+
+    def __api__defer_outputs__(self, resolve: DeferredOutputs) -> None:
+        """
+        The outputs and metadata returned by resolve() are set when the span
+        is converted to a dictionary, usually by the thread uploading it,
+        instead of the thread that ended the span.
+        """
+        self._deferred_outputs = resolve
+        if self._chain is not None:
+            self._chain.__api__track_deferred_node__(self)
+
+    def __api__resolve_outputs__(self) -> None:
+        """
+        Sets the deferred outputs now, if they are not set yet.
+        """
+        with _DEFERRED_OUTPUTS_LOCK:
+            resolve, self._deferred_outputs = self._deferred_outputs, None
+
+        if resolve is None:
+            return
+
+        try:
+            outputs, metadata = resolve()
+        except Exception:
+            LOGGER.debug("Failed to compute the deferred span outputs", exc_info=True)
+            return
+
+        self.set_outputs(outputs, metadata)
+
+    def __api__snapshot__(self) -> "SpanSnapshot":
+        """
+        Returns the current state of the span, without converting it to a
+        dictionary. Cheap enough to be called in the caller's thread when
+        the span is queued for upload.
+        """
+        return SpanSnapshot(self)
+
+    def as_dict(self) -> Dict[str, JSONEncodable]:
+        return self.__api__snapshot__().as_dict()
+
+
+class SpanSnapshot:
+    """
+    References to the fields of a span taken at some point. Setting the
+    outputs of the span afterwards doesn't change the snapshot, unless
+    they were deferred and not resolved yet: then they are resolved by
+    as_dict(), usually in the thread uploading the span.
+    """
+
+    __slots__ = (
+        "_span",
+        "_inputs",
+        "_category",
+        "_metadata",
+        "_outputs",
+        "_parent",
+        "_connected",
+        "_id",
+        "_name",
+        "_start_timestamp",
+        "_end_timestamp",
+        "_duration",
+    )
+
+    def __init__(self, span: Span) -> None:
+        self._span = span if span._deferred_outputs is not None else None
+        self._inputs = span._inputs
+        self._category = span._category
+        self._metadata = span._metadata
+        self._outputs = span._outputs
+        self._parent = span._parent
+        self._connected = span._chain is not None
+        self._id = span._id
+        self._name = span._name
+        self._start_timestamp = span._timer.start_timestamp
+        self._end_timestamp = span._timer.end_timestamp
+        self._duration = span._timer.duration
+
+    @property
+    def outputs(self) -> Optional[Dict[str, JSONEncodable]]:
+        """
+        The outputs set when the snapshot was taken, deferred outputs
+        that are not resolved yet are not included.
+        """
+        return self._outputs
+
+    @property
+    def metadata(self) -> Optional[Dict[str, JSONEncodable]]:
+        return self._metadata
 
     def as_dict(self) -> Dict[str, JSONEncodable]:
-        inputs = self._inputs
-        outputs = self._outputs
+        inputs, outputs, metadata = self._inputs, self._outputs, self._metadata
+        if self._span is not None:
+            self._span.__api__resolve_outputs__()
+            outputs, metadata = self._span._outputs, self._span._metadata
 
         inputs = inputs if isinstance(inputs, dict) else {"input": inputs}
         outputs = outputs if isinstance(outputs, dict) else {"output": outputs}
 
+        parent_ids = context.node_ids(self._parent) if self._connected else None
+
         return {
             "id": self._id,
             "category": self._category,
             "name": self._name,
             "inputs": inputs,
             "outputs": outputs,
-            "duration": self._timer.duration,
-            "start_timestamp": self._timer.start_timestamp,
-            "end_timestamp": self._timer.end_timestamp,
-            "parent_ids": self._context,
-            "metadata": self._metadata,
+            "duration": self._duration,
+            "start_timestamp": self._start_timestamp,
+            "end_timestamp": self._end_timestamp,
+            "parent_ids": parent_ids,
+            "metadata": metadata if metadata is not None else {},
         }
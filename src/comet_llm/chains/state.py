@@ -12,39 +12,48 @@
 #  LICENSE file in the root directory of this package.
 # *******************************************************
 
+import contextvars
 import inspect
-import threading
+import itertools
 from typing import TYPE_CHECKING, Dict, Optional
 
 from .. import app, config, exceptions
-from . import thread_context_registry
 
 if TYPE_CHECKING:  # pragma: no cover
     from . import chain
 
 
 class State:
+    """
+    The global chain is stored in a context variable, every thread and
+    every asyncio task started after start_chain has its own one. Values
+    set by a thread are released with its context when the thread ends.
+    On Python 3.6 the contextvars backport is per thread only, the asyncio
+    tasks of a thread share the global chain.
+    """
+
     def __init__(self) -> None:
-        self._id: int = 0
-        self._thread_context_registry = thread_context_registry.ThreadContextRegistry()
-        self._lock = threading.Lock()
+        # next() of itertools.count is atomic, so ids are unique
+        # across threads without a lock.
+        self._ids = itertools.count(1)
+        self._chain: "contextvars.ContextVar[Optional[chain.Chain]]" = (
+            contextvars.ContextVar("comet_llm_global_chain", default=None)
+        )
 
     def chain_exists(self) -> bool:
-        return self._thread_context_registry.get("global-chain") is not None
+        return self._chain.get() is not None
 
     @property
     def chain(self) -> "chain.Chain":
-        result: "chain.Chain" = self._thread_context_registry.get("global-chain")
+        result: "chain.Chain" = self._chain.get()  # type: ignore
         return result
 
     @chain.setter
     def chain(self, value: "chain.Chain") -> None:
-        self._thread_context_registry.add("global-chain", value)
+        self._chain.set(value)
 
     def new_id(self) -> int:
-        with self._lock:
-            self._id += 1
-            return self._id
+        return next(self._ids)
 
 
 _APP_STATE = State()
@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+# *******************************************************
+#   ____                     _               _
+#  / ___|___  _ __ ___   ___| |_   _ __ ___ | |
+# | |   / _ \| '_ ` _ \ / _ \ __| | '_ ` _ \| |
+# | |__| (_) | | | | | |  __/ |_ _| | | | | | |
+#  \____\___/|_| |_| |_|\___|\__(_)_| |_| |_|_|
+#
+#  Sign up for free at https://www.comet.com
+#  Copyright (C) 2015-2023 Comet ML INC
+#  This source code is licensed under the MIT license found in the
+#  LICENSE file in the root directory of this package.
+# *******************************************************
+
+
+import functools
+import inspect
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncGenerator,
+    Callable,
+    Dict,
+    Generator,
+    List,
+    Optional,
+)
+
+from ..types import JSONEncodable
+from . import span, state
+
+if TYPE_CHECKING:  # pragma: no cover
+    from . import chain
+
+
+def track(
+    func: Optional[Callable] = None,
+    *,
+    name: Optional[str] = None,
+    category: str = "function",
+    metadata: Optional[Dict[str, JSONEncodable]] = None,
+    capture_inputs: bool = True,
+    capture_output: bool = True,
+) -> Callable:
+    """
+    Decorator that logs every call of the function as a Span of the active
+    chain, with the arguments as inputs and the returned value as outputs.
+    Functions, coroutine functions, generator functions and async generator
+    functions are supported, the outputs of generators are the list of the
+    yielded items.
+
+    If there is no active chain or it is not sampled, the function is called
+    directly, nothing is captured and no span is created.
+
+    Args:
+        func: Callable, the decorated function, when used as @track.
+        name: str (optional), span name, the function name by default.
+        category: str (optional), span category, "function" by default.
+        metadata: Dict[str, JSONEncodable] (optional), span metadata.
+        capture_inputs: bool (optional), log the arguments, True by default.
+        capture_output: bool (optional), log the returned value, True by default.
+    """
+    if func is None:
+        return functools.partial(
+            track,
+            name=name,
+            category=category,
+            metadata=metadata,
+            capture_inputs=capture_inputs,
+            capture_output=capture_output,
+        )
+
+    tracker = _Tracker(
+        func,
+        name=name if name is not None else func.__name__,
+        category=category,
+        metadata=metadata,
+        capture_inputs=capture_inputs,
+        capture_output=capture_output,
+    )
+
+    if inspect.isasyncgenfunction(func):
+        return _async_generator_wrapper(func, tracker)
+    if inspect.isgeneratorfunction(func):
+        return _generator_wrapper(func, tracker)
+    if inspect.iscoroutinefunction(func):
+        return _coroutine_wrapper(func, tracker)
+
+    return _function_wrapper(func, tracker)
+
+
+def _function_wrapper(func: Callable, tracker: "_Tracker") -> Callable:
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):  # type: ignore
+        chain_ = state.get_global_chain()
+        if chain_ is None or not chain_.sampled:
+            return func(*args, **kwargs)
+
+        span_ = tracker.start_span(chain_, args, kwargs)
+        try:
+            result = func(*args, **kwargs)
+            tracker.set_outputs(span_, result)
+            return result
+        finally:
+            span_.__api__end__()
+
+    return wrapper
+
+
+def _coroutine_wrapper(func: Callable, tracker: "_Tracker") -> Callable:
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):  # type: ignore
+        chain_ = state.get_global_chain()
+        if chain_ is None or not chain_.sampled:
+            return await func(*args, **kwargs)
+
+        span_ = tracker.start_span(chain_, args, kwargs)
+        try:
+            result = await func(*args, **kwargs)
+            tracker.set_outputs(span_, result)
+            return result
+        finally:
+            span_.__api__end__()
+
+    return wrapper
+
+
+def _generator_wrapper(func: Callable, tracker: "_Tracker") -> Callable:
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):  # type: ignore
+        chain_ = state.get_global_chain()
+        if chain_ is None or not chain_.sampled:
+            return func(*args, **kwargs)
+
+        span_ = tracker.create_span(args, kwargs)
+        return _traced_generator(func(*args, **kwargs), chain_, span_, tracker)
+
+    return wrapper
+
+
+def _async_generator_wrapper(func: Callable, tracker: "_Tracker") -> Callable:
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):  # type: ignore
+        chain_ = state.get_global_chain()
+        if chain_ is None or not chain_.sampled:
+            return func(*args, **kwargs)
+
+        span_ = tracker.create_span(args, kwargs)
+        return _traced_async_generator(func(*args, **kwargs), chain_, span_, tracker)
+
+    return wrapper
+
+
+def _traced_generator(
+    generator: Generator,
+    chain_: "chain.Chain",
+    span_: span.Span,
+    tracker: "_Tracker",
+) -> Generator:
+    # The span is started on the first iteration, so the spans the caller
+    # starts before it are not its children, and a generator that is never
+    # consumed logs nothing. The generator is suspended between the items,
+    # its span is made the active one only while its code runs, not while
+    # the caller's code does.
+    span_.__api__start__(chain_)
+    node = chain_.context.current_node()
+    chain_.context.pop()
+
+    items: List[Any] = []
+    method: Callable[[Any], Any] = generator.send
+    argument: Any = None
+    try:
+        while True:
+            token = chain_.context.activate(node)
+            try:
+                item = method(argument)
+            except StopIteration:
+                break
+            finally:
+                chain_.context.restore(token)
+
+            if tracker.capture_output:
+                items.append(item)
+            try:
+                method, argument = generator.send, (yield item)
+            except GeneratorExit:
+                generator.close()
+                raise
+            except BaseException as exception:
+                method, argument = generator.throw, exception
+
+        tracker.set_outputs(span_, items)
+    finally:
+        token = chain_.context.activate(node)
+        span_.__api__end__()
+        chain_.context.restore(token)
+
+
+async def _traced_async_generator(
+    generator: AsyncGenerator,
+    chain_: "chain.Chain",
+    span_: span.Span,
+    tracker: "_Tracker",
+) -> AsyncGenerator:
+    span_.__api__start__(chain_)
+    node = chain_.context.current_node()
+    chain_.context.pop()
+
+    items: List[Any] = []
+    method: Callable[[Any], Any] = generator.asend
+    argument: Any = None
+    try:
+        while True:
+            token = chain_.context.activate(node)
+            try:
+                item = await method(argument)
+            except StopAsyncIteration:
+                break
+            finally:
+                chain_.context.restore(token)
+
+            if tracker.capture_output:
+                items.append(item)
+            try:
+                method, argument = generator.asend, (yield item)
+            except GeneratorExit:
+                await generator.aclose()
+                raise
+            except BaseException as exception:
+                method, argument = generator.athrow, exception
+
+        tracker.set_outputs(span_, items)
+    finally:
+        token = chain_.context.activate(node)
+        span_.__api__end__()
+        chain_.context.restore(token)
+
+
+class _Tracker:
+    __slots__ = (
+        "_signature",
+        "_name",
+        "_category",
+        "_metadata",
+        "_capture_inputs",
+        "_capture_output",
+    )
+
+    def __init__(
+        self,
+        func: Callable,
+        name: str,
+        category: str,
+        metadata: Optional[Dict[str, JSONEncodable]],
+        capture_inputs: bool,
+        capture_output: bool,
+    ) -> None:
+        try:
+            self._signature: Optional[inspect.Signature] = inspect.signature(func)
+        except (TypeError, ValueError):
+            self._signature = None
+
+        self._name = name
+        self._category = category
+        self._metadata = metadata
+        self._capture_inputs = capture_inputs
+        self._capture_output = capture_output
+
+    @property
+    def capture_output(self) -> bool:
+        return self._capture_output
+
+    def start_span(
+        self, chain_: "chain.Chain", args: tuple, kwargs: Dict[str, Any]
+    ) -> span.Span:
+        span_ = self.create_span(args, kwargs)
+        span_.__api__start__(chain_)
+
+        return span_
+
+    def create_span(self, args: tuple, kwargs: Dict[str, Any]) -> span.Span:
+        inputs = self._inputs(args, kwargs) if self._capture_inputs else {}
+
+        return span.Span(
+            inputs=inputs,
+            category=self._category,
+            name=self._name,
+            metadata=self._metadata,
+        )
+
+    def set_outputs(self, span_: span.Span, result: Any) -> None:
+        if self._capture_output:
+            span_.set_outputs({"output": _jsonable(result)})
+
+    def _inputs(self, args: tuple, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        if self._signature is None:
+            return {"args": _jsonable(args), "kwargs": _jsonable(kwargs)}
+
+        try:
+            bound = self._signature.bind(*args, **kwargs)
+        except TypeError:
+            # The call itself fails with the same error
+            return {"args": _jsonable(args), "kwargs": _jsonable(kwargs)}
+
+        inputs = {}
+        for position, (name, value) in enumerate(bound.arguments.items()):
+            kind = self._signature.parameters[name].kind
+            if position == 0 and name in ("self", "cls"):
+                continue
+            if kind is inspect.Parameter.VAR_KEYWORD:
+                inputs.update({key: _jsonable(item) for key, item in value.items()})
+            else:
+                inputs[name] = _jsonable(value)
+
+        return inputs
+
+
+def _jsonable(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, dict):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+
+    return repr(value)
@@ -14,6 +14,7 @@
 
 
 import logging
+import os
 from types import ModuleType
 from typing import Dict, Optional, Tuple
 
@@ -39,6 +40,51 @@ def _extend_comet_ml_config() -> None:
         "comet.logging.console": {"type": str, "default": "INFO"},
         "comet.raise_exceptions_on_error": {"type": int, "default": 0},
         "comet.internal.check_tls_certificate": {"type": bool, "default": True},
+        "comet.parameters_batch.max_size": {"type": int, "default": 100},
+        "comet.experiment_writes.max_workers": {"type": int, "default": 1},
+        "comet.connection_pool.connections": {"type": int, "default": 10},
+        "comet.connection_pool.maxsize": {"type": int, "default": 10},
+        "comet.connection_pool.keep_alive": {"type": bool, "default": True},
+        "comet.connection_pool.session_scope": {"type": str, "default": "shared"},
+        "comet.client_cache.max_size": {"type": int, "default": 16},
+        "comet.client_cache.idle_timeout": {"type": float, "default": 300.0},
+        "comet.asset_compression": {"type": str, "default": "none"},
+        "comet.asset_compression.threshold": {"type": int, "default": 65536},
+        "comet.async_logging.enabled": {"type": int, "default": 0},
+        "comet.async_logging.workers": {"type": int, "default": 4},
+        "comet.async_logging.queue_size": {"type": int, "default": 1000},
+        "comet.async_logging.shutdown_timeout": {"type": float, "default": 30.0},
+        "comet.retry.max_attempts": {"type": int, "default": 3},
+        "comet.retry.backoff_factor": {"type": float, "default": 0.5},
+        "comet.retry.backoff_max": {"type": float, "default": 10.0},
+        "comet.retry.jitter": {"type": bool, "default": True},
+        "comet.circuit_breaker.failure_threshold": {"type": int, "default": 5},
+        "comet.circuit_breaker.reset_timeout": {"type": float, "default": 30.0},
+        "comet.spool.enabled": {"type": int, "default": 0},
+        "comet.spool.directory": {
+            "type": str,
+            "default": os.path.join(os.path.expanduser("~"), ".comet_llm", "spool"),
+        },
+        "comet.spool.fsync": {"type": str, "default": "segment"},
+        "comet.spool.segment_size": {"type": int, "default": 4 * 1024 * 1024},
+        "comet.spool.max_size": {"type": int, "default": 256 * 1024 * 1024},
+        "comet.spool.eviction": {"type": str, "default": "oldest"},
+        "comet.spool.replay_interval": {"type": float, "default": 30.0},
+        "comet.chain_export.segment_size": {"type": int, "default": 0},
+        "comet.sampling.head_rate": {"type": float, "default": 1.0},
+        "comet.sampling.tail_rate": {"type": float, "default": 1.0},
+        "comet.sampling.keep_errors": {"type": bool, "default": True},
+        "comet.sampling.slow_threshold": {"type": float, "default": 0.0},
+        "comet.payload.field_max_size": {"type": int, "default": 0},
+        "comet.payload.trace_max_size": {"type": int, "default": 0},
+        "comet.payload.string_policy": {"type": str, "default": "truncate"},
+        "comet.payload.drop_vectors": {"type": bool, "default": False},
+        "comet.autologging.background": {"type": bool, "default": False},
+        "comet.autologging.batch_max_calls": {"type": int, "default": 0},
+        "comet.autologging.batch_window": {"type": float, "default": 0.0},
+        "comet.dedup.min_size": {"type": int, "default": 0},
+        "comet.dedup.known_blobs_max_count": {"type": int, "default": 0},
+        "comet.usage.prices_file": {"type": str, "default": ""},
     }
 
     comet_ml_config.CONFIG_MAP.update(CONFIG_MAP_EXTENSION)
@@ -91,10 +137,263 @@ def autologging_enabled() -> bool:
     return not comet_ml.get_config("comet.disable_auto_logging")  # type: ignore
 
 
+def autologging_background_enabled() -> bool:
+    """
+    Parse the results of the autologged calls and log the chains they
+    create from the uploader threads, instead of the calling thread.
+    Opt-in, like asynchronous logging, since the chains are then logged
+    after the call returns.
+    """
+    return _COMET_ML_CONFIG["comet.autologging.background"]  # type: ignore
+
+
+def autologging_batch_max_calls() -> int:
+    """
+    Number of autologged calls grouped into one chain, and so into one
+    experiment, when they are not made inside a user's chain. 0 disables
+    the limit.
+    """
+    return _COMET_ML_CONFIG["comet.autologging.batch_max_calls"]  # type: ignore
+
+
+def autologging_batch_window() -> float:
+    """
+    Seconds after its first call a batch of autologged calls is logged.
+    0 disables the limit.
+    """
+    return _COMET_ML_CONFIG["comet.autologging.batch_window"]  # type: ignore
+
+
 def tls_verification_enabled() -> bool:
     return _COMET_ML_CONFIG["comet.internal.check_tls_certificate"]  # type: ignore
 
 
+def parameters_batch_size() -> int:
+    return max(_COMET_ML_CONFIG["comet.parameters_batch.max_size"], 1)  # type: ignore
+
+
+def experiment_writes_max_workers() -> int:
+    """
+    How many requests logging the data of one experiment may run concurrently,
+    1 sends them one after another.
+    """
+    return _COMET_ML_CONFIG["comet.experiment_writes.max_workers"]  # type: ignore
+
+
+def connection_pool_connections() -> int:
+    return _COMET_ML_CONFIG["comet.connection_pool.connections"]  # type: ignore
+
+
+def connection_pool_maxsize() -> int:
+    return _COMET_ML_CONFIG["comet.connection_pool.maxsize"]  # type: ignore
+
+
+def connection_pool_keep_alive() -> bool:
+    return _COMET_ML_CONFIG["comet.connection_pool.keep_alive"]  # type: ignore
+
+
+def connection_pool_session_scope() -> str:
+    """
+    "shared" - one session for all threads, "thread" - session per thread.
+    """
+    return _COMET_ML_CONFIG["comet.connection_pool.session_scope"]  # type: ignore
+
+
+def client_cache_max_size() -> int:
+    return _COMET_ML_CONFIG["comet.client_cache.max_size"]  # type: ignore
+
+
+def client_cache_idle_timeout() -> float:
+    return _COMET_ML_CONFIG["comet.client_cache.idle_timeout"]  # type: ignore
+
+
+def asset_compression() -> str:
+    """
+    "none", "gzip" or "zstd". zstd falls back to gzip if
+    zstandard package is not installed.
+    """
+    return _COMET_ML_CONFIG["comet.asset_compression"]  # type: ignore
+
+
+def asset_compression_threshold() -> int:
+    return _COMET_ML_CONFIG["comet.asset_compression.threshold"]  # type: ignore
+
+
+def async_logging_enabled() -> bool:
+    return bool(_COMET_ML_CONFIG["comet.async_logging.enabled"])
+
+
+def async_logging_workers() -> int:
+    return _COMET_ML_CONFIG["comet.async_logging.workers"]  # type: ignore
+
+
+def async_logging_queue_size() -> int:
+    return _COMET_ML_CONFIG["comet.async_logging.queue_size"]  # type: ignore
+
+
+def async_logging_shutdown_timeout() -> float:
+    return _COMET_ML_CONFIG["comet.async_logging.shutdown_timeout"]  # type: ignore
+
+
+def retry_max_attempts() -> int:
+    return max(_COMET_ML_CONFIG["comet.retry.max_attempts"], 1)  # type: ignore
+
+
+def retry_backoff_factor() -> float:
+    return _COMET_ML_CONFIG["comet.retry.backoff_factor"]  # type: ignore
+
+
+def retry_backoff_max() -> float:
+    return _COMET_ML_CONFIG["comet.retry.backoff_max"]  # type: ignore
+
+
+def retry_jitter_enabled() -> bool:
+    return _COMET_ML_CONFIG["comet.retry.jitter"]  # type: ignore
+
+
+def circuit_breaker_failure_threshold() -> int:
+    """
+    Number of consecutive failed requests after which the circuit opens,
+    0 disables the circuit breaker.
+    """
+    return _COMET_ML_CONFIG["comet.circuit_breaker.failure_threshold"]  # type: ignore
+
+
+def circuit_breaker_reset_timeout() -> float:
+    return _COMET_ML_CONFIG["comet.circuit_breaker.reset_timeout"]  # type: ignore
+
+
+def spool_enabled() -> bool:
+    return bool(_COMET_ML_CONFIG["comet.spool.enabled"])
+
+
+def spool_directory() -> str:
+    return _COMET_ML_CONFIG["comet.spool.directory"]  # type: ignore
+
+
+def spool_fsync() -> str:
+    """
+    "always" - every trace is fsynced, "segment" - segment files are fsynced
+    when completed, "never" - flushing to disk is left to the OS.
+    """
+    return _COMET_ML_CONFIG["comet.spool.fsync"]  # type: ignore
+
+
+def spool_segment_size() -> int:
+    return _COMET_ML_CONFIG["comet.spool.segment_size"]  # type: ignore
+
+
+def spool_max_size() -> int:
+    return _COMET_ML_CONFIG["comet.spool.max_size"]  # type: ignore
+
+
+def spool_eviction() -> str:
+    """
+    What to drop when the spool exceeds its max size: "oldest" segments
+    or the "newest" trace.
+    """
+    return _COMET_ML_CONFIG["comet.spool.eviction"]  # type: ignore
+
+
+def spool_replay_interval() -> float:
+    return _COMET_ML_CONFIG["comet.spool.replay_interval"]  # type: ignore
+
+
+def chain_export_segment_size() -> int:
+    """
+    How many ended spans are exported at once while the chain is still
+    running, 0 exports the whole chain in end_chain.
+    """
+    return max(_COMET_ML_CONFIG["comet.chain_export.segment_size"], 0)  # type: ignore
+
+
+def sampling_head_rate() -> float:
+    """
+    Share of the chains and prompts that are recorded, decided when
+    they start. The rest are not recorded at all.
+    """
+    return _COMET_ML_CONFIG["comet.sampling.head_rate"]  # type: ignore
+
+
+def sampling_tail_rate() -> float:
+    """
+    Share of the recorded chains and prompts that are logged, decided when
+    they end. Errors and slow ones are kept regardless of it.
+    """
+    return _COMET_ML_CONFIG["comet.sampling.tail_rate"]  # type: ignore
+
+
+def sampling_keep_errors() -> bool:
+    return _COMET_ML_CONFIG["comet.sampling.keep_errors"]  # type: ignore
+
+
+def sampling_slow_threshold() -> float:
+    """
+    Duration in milliseconds from which a chain or prompt is always
+    logged by the tail sampling, 0 disables it.
+    """
+    return _COMET_ML_CONFIG["comet.sampling.slow_threshold"]  # type: ignore
+
+
+def payload_field_max_size() -> int:
+    """
+    Size limit of every input, output and metadata value of a trace, in
+    characters of their JSON encoding, 0 means no limit.
+    """
+    return max(_COMET_ML_CONFIG["comet.payload.field_max_size"], 0)  # type: ignore
+
+
+def payload_trace_max_size() -> int:
+    """
+    Size limit of all the inputs, outputs and metadata of a trace together,
+    0 means no limit.
+    """
+    return max(_COMET_ML_CONFIG["comet.payload.trace_max_size"], 0)  # type: ignore
+
+
+def payload_string_policy() -> str:
+    """
+    How strings over the limit are cut: "truncate" keeps the beginning,
+    "head_tail" the beginning and the end, "hash" replaces them with
+    their sha256 and length.
+    """
+    return _COMET_ML_CONFIG["comet.payload.string_policy"]  # type: ignore
+
+
+def payload_drop_vectors() -> bool:
+    """
+    Replaces long lists of numbers, e.g. embeddings, with their length.
+    """
+    return _COMET_ML_CONFIG["comet.payload.drop_vectors"]  # type: ignore
+
+
+def dedup_min_size() -> int:
+    """
+    Strings of the inputs, outputs and metadata at least this long are
+    stored once per trace and referenced by their hash, 0 disables it.
+    """
+    return max(_COMET_ML_CONFIG["comet.dedup.min_size"], 0)  # type: ignore
+
+
+def dedup_known_blobs_max_count() -> int:
+    """
+    How many uploaded strings are remembered by the process, so the
+    following traces logged to the same experiment can reference them
+    instead of uploading them again, 0 disables it.
+    """
+    return max(_COMET_ML_CONFIG["comet.dedup.known_blobs_max_count"], 0)  # type: ignore
+
+
+def usage_prices_file() -> Optional[str]:
+    """
+    JSON file with the prices of the models, used to estimate the cost
+    of the token usage, e.g. {"gpt-4o": {"prompt": 2.5, "completion": 10}}
+    in USD per million tokens.
+    """
+    path = _COMET_ML_CONFIG["comet.usage.prices_file"]
+    return path if path else None  # type: ignore
+
+
 def init(
     api_key: Optional[str] = None,
     workspace: Optional[str] = None,
@@ -21,20 +21,19 @@ _JAN1_2030 = datetime.datetime(2030, 1, 1).timestamp()
 
 
 class Timer:
+    __slots__ = ("_start_timestamp", "_end_timestamp")
+
     def __init__(self) -> None:
         self._start_timestamp: Optional[int] = None
         self._end_timestamp: Optional[int] = None
-        self._duration: Optional[int] = None
 
     def start(self) -> None:
         self._start_timestamp = local_timestamp()
         self._end_timestamp = None
-        self._duration = None
 
     def stop(self) -> None:
         assert self._start_timestamp is not None
         self._end_timestamp = local_timestamp()
-        self._duration = self._end_timestamp - self._start_timestamp
 
     @property
     def start_timestamp(self) -> Optional[int]:
@@ -46,7 +45,10 @@ class Timer:
 
     @property
     def duration(self) -> Optional[int]:
-        return self._duration
+        if self._start_timestamp is None or self._end_timestamp is None:
+            return None
+
+        return self._end_timestamp - self._start_timestamp
 
 
 def is_valid_timestamp_seconds(timestamp: float) -> bool:
@@ -36,3 +36,9 @@ class DummyClass:
 
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:  # type: ignore
         pass
+
+    async def __aenter__(self) -> "DummyClass":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:  # type: ignore
+        pass
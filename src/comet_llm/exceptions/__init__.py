@@ -12,5 +12,5 @@
 #  LICENSE file in the root directory of this package.
 # *******************************************************
 
-from .exceptions import CometLLMException
+from .exceptions import BackendUnavailableException, CometLLMException
 from .filter_decorator import filter
@@ -17,3 +17,10 @@ class CometLLMException(Exception):
     def __init__(self, *args, log_message_once: bool = False) -> None:  # type: ignore
         super().__init__(*args)
         self.log_message_once = log_message_once
+
+
+class BackendUnavailableException(CometLLMException):
+    """
+    The data was not sent because Comet backend was unreachable or
+    overloaded, sending it later may succeed.
+    """
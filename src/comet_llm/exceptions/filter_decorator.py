@@ -13,6 +13,7 @@
 # *******************************************************
 
 import functools
+import inspect
 import logging
 from typing import TYPE_CHECKING, Any, Callable, Optional
 
@@ -28,6 +29,23 @@ def filter(
     allow_raising: bool, summary: Optional["summary.Summary"] = None
 ) -> Callable:
     def decorator(function: Callable) -> Callable:
+        if inspect.iscoroutinefunction(function):
+
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs) -> Any:  # type: ignore
+                try:
+                    return await function(*args, **kwargs)
+                except Exception as exception:
+                    if summary is not None:
+                        summary.increment_failed()
+
+                    if allow_raising:
+                        raise
+
+                    _log_exception(exception)
+
+            return async_wrapper
+
         @functools.wraps(function)
         def wrapper(*args, **kwargs) -> Any:  # type: ignore
             try:
@@ -39,21 +57,25 @@ def filter(
                 if allow_raising:
                     raise
 
-                if getattr(exception, "log_message_once", False):
-                    comet_logging.log_once_at_level(
-                        LOGGER,
-                        logging.ERROR,
-                        str(exception),
-                        exc_info=True,
-                        extra={"show_traceback": True},
-                    )
-                else:
-                    LOGGER.error(
-                        str(exception),
-                        exc_info=True,
-                        extra={"show_traceback": True},
-                    )
+                _log_exception(exception)
 
         return wrapper
 
     return decorator
+
+
+def _log_exception(exception: Exception) -> None:
+    if getattr(exception, "log_message_once", False):
+        comet_logging.log_once_at_level(
+            LOGGER,
+            logging.ERROR,
+            str(exception),
+            exc_info=True,
+            extra={"show_traceback": True},
+        )
+    else:
+        LOGGER.error(
+            str(exception),
+            exc_info=True,
+            extra={"show_traceback": True},
+        )
@@ -12,4 +12,5 @@
 #  LICENSE file in the root directory of this package.
 # *******************************************************
 
+from .async_experiment_api import AsyncExperimentAPI
 from .experiment_api import ExperimentAPI
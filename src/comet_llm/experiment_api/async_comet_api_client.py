@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+# *******************************************************
+#   ____                     _               _
+#  / ___|___  _ __ ___   ___| |_   _ __ ___ | |
+# | |   / _ \| '_ ` _ \ / _ \ __| | '_ ` _ \| |
+# | |__| (_) | | | | | |  __/ |_ _| | | | | | |
+#  \____\___/|_| |_| |_|\___|\__(_)_| |_| |_|_|
+#
+#  Sign up for free at https://www.comet.com
+#  Copyright (C) 2015-2023 Comet ML INC
+#  This source code is licensed under the MIT license found in the
+#  LICENSE file in the root directory of this package.
+# *******************************************************
+
+
+import asyncio
+import atexit
+import logging
+import threading
+import urllib.parse
+import weakref
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Iterable, Optional
+
+import requests  # type: ignore
+import urllib3.exceptions
+
+from .. import config, exceptions, logging_messages
+from . import client_registry, comet_api_client
+
+if TYPE_CHECKING:  # pragma: no cover
+    import httpx
+
+ResponseContent = comet_api_client.ResponseContent
+
+LOGGER = logging.getLogger(__name__)
+
+
+class AsyncCometAPIClient(comet_api_client.CometAPIClient):
+    """
+    Asyncio version of CometAPIClient. Request building is inherited,
+    only the transport is replaced, so all the public methods of
+    this class return awaitables.
+    """
+
+    def __init__(
+        self, api_key: str, comet_url: str, clients: "AsyncClientPool"
+    ) -> None:
+        self._headers = {"Authorization": api_key}
+        self._comet_url = comet_url
+        self._clients = clients
+
+    def close(self) -> None:
+        self._clients.close()
+
+    def closer(self) -> Callable[[], None]:
+        return self._clients.close
+
+    async def _request(self, method: str, path: str, *args, **kwargs) -> ResponseContent:  # type: ignore
+        httpx = _import_httpx()
+
+        url = urllib.parse.urljoin(self._comet_url, path)
+        headers = {**self._headers, **kwargs.pop("headers", {})}
+        if "data" in kwargs:
+            # raw body is passed as data to requests, but as content to httpx
+            content = kwargs.pop("data")
+            if not isinstance(content, bytes):
+                # httpx.AsyncClient accepts only async iterables as streamed content
+                content = _aiter(content)
+            kwargs["content"] = content
+
+        try:
+            response = await self._clients.get().request(
+                method, url, *args, headers=headers, **kwargs
+            )
+            response.raise_for_status()
+        except httpx.HTTPStatusError as exception:
+            # Converted to the requests exceptions to be handled by
+            # request_exception_wrapper the same way as for the sync client.
+            raise requests.HTTPError(
+                str(exception), response=exception.response
+            ) from exception
+        except httpx.ConnectTimeout as exception:
+            raise requests.exceptions.ConnectTimeout(str(exception)) from exception
+        except httpx.ConnectError as exception:
+            raise requests.ConnectionError(
+                urllib3.exceptions.NewConnectionError(None, str(exception))  # type: ignore
+            ) from exception
+        except httpx.TimeoutException as exception:
+            raise requests.Timeout(str(exception)) from exception
+        except httpx.HTTPError as exception:
+            raise requests.ConnectionError(str(exception)) from exception
+
+        if len(response.content) == 0:
+            return None
+
+        return response.json()
+
+
+async def _aiter(chunks: Iterable[bytes]) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+class AsyncClientPool:
+    """
+    Keeps one httpx.AsyncClient per event loop, so that coroutines running
+    in the same loop share its connection pool.
+    """
+
+    def __init__(self) -> None:
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def get(self) -> "httpx.AsyncClient":
+        loop = asyncio.get_event_loop()
+        client = self._clients.get(loop)
+
+        if client is None:
+            with self._lock:
+                client = self._clients.get(loop)
+                if client is None:
+                    client = _create_client()
+                    self._clients[loop] = client
+
+        return client
+
+    def close(self) -> None:
+        """
+        Closes every client with aclose() in its own event loop. The clients
+        of the loops that are already closed can't be closed anymore, their
+        connections are released by the garbage collector.
+        """
+        with self._lock:
+            clients = list(self._clients.items())
+            self._clients.clear()
+
+        for loop, client in clients:
+            try:
+                _close_client(loop, client)
+            except Exception:
+                LOGGER.debug("Failed to close httpx client", exc_info=True)
+
+
+def _close_client(loop: asyncio.AbstractEventLoop, client: "httpx.AsyncClient") -> None:
+    if loop.is_closed():
+        return
+
+    # asyncio.get_running_loop() doesn't exist on Python 3.6
+    if asyncio._get_running_loop() is loop:
+        loop.create_task(client.aclose())
+    elif loop.is_running():
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+    else:
+        loop.run_until_complete(client.aclose())
+
+
+_REGISTRY: Optional[
+    "client_registry.ClientRegistry[comet_api_client.ClientKey, AsyncCometAPIClient]"
+] = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get(api_key: str) -> AsyncCometAPIClient:
+    """
+    Same as comet_api_client.get, but for the asyncio client.
+    """
+    key = (api_key, config.comet_url(), config.tls_verification_enabled())
+    return _get_registry().get(key)
+
+
+def close() -> None:
+    """Closes all the cached clients and their connections."""
+    if _REGISTRY is not None:
+        _REGISTRY.clear()
+
+
+def _get_registry() -> "client_registry.ClientRegistry[comet_api_client.ClientKey, AsyncCometAPIClient]":
+    global _REGISTRY
+
+    with _REGISTRY_LOCK:
+        if _REGISTRY is None:
+            _REGISTRY = client_registry.ClientRegistry(
+                factory=_create_api_client,
+                max_size=config.client_cache_max_size(),
+                idle_timeout=config.client_cache_idle_timeout(),
+                closer=AsyncCometAPIClient.closer,
+            )
+            atexit.register(close)
+
+        return _REGISTRY
+
+
+def _create_api_client(key: comet_api_client.ClientKey) -> AsyncCometAPIClient:
+    api_key, comet_url, _ = key
+    return AsyncCometAPIClient(api_key, comet_url, AsyncClientPool())
+
+
+def _create_client() -> "httpx.AsyncClient":
+    httpx = _import_httpx()
+
+    maxsize = config.connection_pool_maxsize()
+    headers = {} if config.connection_pool_keep_alive() else {"Connection": "close"}
+
+    return httpx.AsyncClient(  # type: ignore
+        limits=httpx.Limits(max_connections=maxsize, max_keepalive_connections=maxsize),
+        # Like requests, wait as long as needed, including for a free
+        # connection from the pool when many coroutines log at once.
+        timeout=None,
+        verify=config.tls_verification_enabled(),
+        headers=headers,
+    )
+
+
+def _import_httpx():  # type: ignore
+    try:
+        import httpx
+
+        return httpx
+    except ImportError as exception:
+        raise exceptions.CometLLMException(
+            logging_messages.HTTPX_NOT_INSTALLED, log_message_once=True
+        ) from exception
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# *******************************************************
+#   ____                     _               _
+#  / ___|___  _ __ ___   ___| |_   _ __ ___ | |
+# | |   / _ \| '_ ` _ \ / _ \ __| | '_ ` _ \| |
+# | |__| (_) | | | | | |  __/ |_ _| | | | | | |
+#  \____\___/|_| |_| |_|\___|\__(_)_| |_| |_|_|
+#
+#  Sign up for free at https://www.comet.com
+#  Copyright (C) 2015-2023 Comet ML INC
+#  This source code is licensed under the MIT license found in the
+#  LICENSE file in the root directory of this package.
+# *******************************************************
+
+
+from typing import IO, Dict, Iterable, List, Optional
+
+from comet_llm.types import JSONEncodable
+
+from .. import config, constants
+from . import async_comet_api_client, experiment_api, request_exception_wrapper
+
+
+class AsyncExperimentAPI(experiment_api.ExperimentAPI):
+    """
+    Asyncio version of ExperimentAPI, all the logging methods are coroutines.
+    """
+
+    _client: async_comet_api_client.AsyncCometAPIClient
+
+    @classmethod
+    @request_exception_wrapper.wrap(check_on_prem=True, idempotent=False)
+    async def create_new(  # type: ignore
+        cls,
+        api_key: str,
+        workspace: Optional[str] = None,
+        project_name: Optional[str] = None,
+    ):
+        client = async_comet_api_client.get(api_key)
+        response = await client.create_experiment("LLM", workspace, project_name)
+
+        experiment_api = cls(
+            id=response[constants.EXPERIMENT_KEY_RESPONSE_KEY],
+            comet_api_client=client,
+            workspace=response[constants.WORKSPACE_RESPONSE_KEY],
+            project_name=response[constants.PROJECT_NAME_RESPONSE_KEY],
+        )
+
+        return experiment_api
+
+    @classmethod
+    def from_existing_id(  # type: ignore
+        cls,
+        id: str,
+        api_key: str,
+        load_metadata: bool = False,
+        workspace: Optional[str] = None,
+        project_name: Optional[str] = None,
+    ):
+        """
+        Metadata can't be loaded with the asynchronous client, workspace and
+        project_name should be passed if the project url is needed.
+        """
+        if load_metadata:
+            raise ValueError("AsyncExperimentAPI can't load experiment metadata")
+
+        return cls(
+            id=id,
+            comet_api_client=async_comet_api_client.get(api_key),
+            workspace=workspace,
+            project_name=project_name,
+        )
+
+    async def log_asset_with_io(  # type: ignore
+        self, name: str, file: IO, asset_type: str
+    ) -> None:
+        await self.log_asset_with_stream(
+            name=name,
+            chunks=[self._read_bytes(file)],
+            asset_type=asset_type,
+        )
+
+    @request_exception_wrapper.wrap(check_on_prem=True, idempotent=False)
+    async def log_asset_with_stream(  # type: ignore
+        self, name: str, chunks: Iterable[bytes], asset_type: str
+    ) -> None:
+        await self._client.log_experiment_asset_with_stream(
+            self._id, name=name, chunks=chunks, asset_type=asset_type
+        )
+
+    @request_exception_wrapper.wrap()
+    async def log_parameters(  # type: ignore
+        self, parameters: Dict[str, JSONEncodable]
+    ) -> None:
+        batch_size = config.parameters_batch_size()
+        items = list(parameters.items())
+
+        for start in range(0, len(items), batch_size):
+            await self._client.log_experiment_parameters(
+                self._id, parameters=dict(items[start : start + batch_size])
+            )
+
+    @request_exception_wrapper.wrap(idempotent=False)
+    async def log_metric(self, name: str, value: JSONEncodable) -> None:  # type: ignore
+        await self._client.log_experiment_metric(self._id, name=name, value=value)
+
+    @request_exception_wrapper.wrap()
+    async def log_tags(self, tags: List[str]) -> None:  # type: ignore
+        await self._client.log_experiment_tags(self._id, tags=tags)
+
+    @request_exception_wrapper.wrap()
+    async def log_other(self, name: str, value: JSONEncodable) -> None:  # type: ignore
+        await self._client.log_experiment_other(self._id, name=name, value=value)
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# *******************************************************
+#   ____                     _               _
+#  / ___|___  _ __ ___   ___| |_   _ __ ___ | |
+# | |   / _ \| '_ ` _ \ / _ \ __| | '_ ` _ \| |
+# | |__| (_) | | | | | |  __/ |_ _| | | | | | |
+#  \____\___/|_| |_| |_|\___|\__(_)_| |_| |_|_|
+#
+#  Sign up for free at https://www.comet.com
+#  Copyright (C) 2015-2023 Comet ML INC
+#  This source code is licensed under the MIT license found in the
+#  LICENSE file in the root directory of this package.
+# *******************************************************
+
+
+import functools
+import logging
+import threading
+import time
+from typing import Optional, Tuple
+
+from .. import config, exceptions, logging_messages
+
+LOGGER = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to the backend after failure_threshold consecutive
+    failures. While the circuit is open, requests fail fast. When
+    reset_timeout passes, one request is let through as a trial, its success
+    closes the circuit, its failure keeps it open for another reset_timeout.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        opened_at = self._opened_at
+        return (
+            opened_at is not None and time.monotonic() - opened_at < self._reset_timeout
+        )
+
+    def before_request(self) -> None:
+        if self._opened_at is None:
+            return
+
+        with self._lock:
+            if self._opened_at is None:
+                return
+
+            now = time.monotonic()
+            if now - self._opened_at < self._reset_timeout:
+                raise exceptions.BackendUnavailableException(
+                    logging_messages.CIRCUIT_BREAKER_OPEN, log_message_once=True
+                )
+
+            # Trial request, the others keep failing fast until it finishes
+            self._opened_at = now
+
+    def record_success(self) -> None:
+        if self._failures == 0 and self._opened_at is None:
+            return
+
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self) -> None:
+        if self._failure_threshold <= 0:
+            return
+
+        with self._lock:
+            self._failures += 1
+            if self._failures < self._failure_threshold:
+                return
+
+            if self._opened_at is None:
+                LOGGER.warning(
+                    logging_messages.CIRCUIT_BREAKER_OPENED, self._reset_timeout
+                )
+            self._opened_at = time.monotonic()
+
+
+BreakerKey = Tuple[Optional[str], str, bool]
+
+_MAX_BREAKERS = 1024
+
+
+@functools.lru_cache(maxsize=_MAX_BREAKERS)
+def get(key: BreakerKey) -> CircuitBreaker:
+    """
+    Returns the breaker of the (api_key, comet_url, tls_verification) key,
+    the same key the API clients are cached by. So a failing Comet URL or
+    API key doesn't make the requests sent with the other ones fail fast.
+    """
+    return CircuitBreaker(
+        failure_threshold=config.circuit_breaker_failure_threshold(),
+        reset_timeout=config.circuit_breaker_reset_timeout(),
+    )
+
+
+def for_api_key(api_key: Optional[str]) -> CircuitBreaker:
+    return get((api_key, config.comet_url(), config.tls_verification_enabled()))
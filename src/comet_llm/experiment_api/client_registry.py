@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# *******************************************************
+#   ____                     _               _
+#  / ___|___  _ __ ___   ___| |_   _ __ ___ | |
+# | |   / _ \| '_ ` _ \ / _ \ __| | '_ ` _ \| |
+# | |__| (_) | | | | | |  __/ |_ _| | | | | | |
+#  \____\___/|_| |_| |_|\___|\__(_)_| |_| |_|_|
+#
+#  Sign up for free at https://www.comet.com
+#  Copyright (C) 2015-2023 Comet ML INC
+#  This source code is licensed under the MIT license found in the
+#  LICENSE file in the root directory of this package.
+# *******************************************************
+
+
+import collections
+import threading
+import time
+import weakref
+from typing import Callable, Generic, Hashable, List, Tuple, TypeVar
+
+KeyT = TypeVar("KeyT", bound=Hashable)
+ClientT = TypeVar("ClientT")
+
+
+class ClientRegistry(Generic[KeyT, ClientT]):
+    """
+    Thread-safe cache of API clients, one per key. Holds at most max_size
+    clients, the least recently used one is evicted when it's full. Clients
+    that were not used for more than idle_timeout seconds are evicted on the
+    next access to the registry.
+
+    closer returns the function releasing the connections of a client, it
+    must not reference the client. An evicted client may still be used by
+    another thread, e.g. in the middle of an upload, so its connections are
+    released once the client is garbage collected. clear() releases them
+    right away.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[KeyT], ClientT],
+        max_size: int,
+        idle_timeout: float,
+        closer: Callable[[ClientT], Callable[[], None]],
+    ) -> None:
+        self._factory = factory
+        self._max_size = max(max_size, 1)
+        self._idle_timeout = idle_timeout
+        self._closer = closer
+        # Ordered from the least to the most recently used
+        self._entries: "collections.OrderedDict[KeyT, Tuple[ClientT, float]]" = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get(self, key: KeyT) -> ClientT:
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            client = self._factory(key) if entry is None else entry[0]
+            self._entries[key] = (client, now)
+            evicted = self._pop_evicted(now)
+
+        for evicted_client in evicted:
+            weakref.finalize(evicted_client, self._closer(evicted_client))
+
+        return client
+
+    def clear(self) -> None:
+        with self._lock:
+            evicted = [client for client, _ in self._entries.values()]
+            self._entries.clear()
+
+        for client in evicted:
+            self._closer(client)()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _pop_evicted(self, now: float) -> List[ClientT]:
+        evicted = []
+
+        while len(self._entries) > self._max_size:
+            _, (client, _) = self._entries.popitem(last=False)
+            evicted.append(client)
+
+        while len(self._entries) > 0:
+            client, last_used = next(iter(self._entries.values()))
+            if now - last_used <= self._idle_timeout:
+                break
+            self._entries.popitem(last=False)
+            evicted.append(client)
+
+        return evicted
@@ -12,26 +12,48 @@
 #  LICENSE file in the root directory of this package.
 # *******************************************************
 
-import functools
+import atexit
+import itertools
+import threading
 import urllib.parse
 import warnings
-from typing import IO, List, Optional
+from typing import IO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import requests  # type: ignore
+import requests.adapters  # type: ignore
 import urllib3.exceptions
+import urllib3.filepost
 
-from .. import config
+from .. import config, datetimes
 from ..types import JSONEncodable
-from . import request_exception_wrapper
+from . import (
+    circuit_breaker,
+    client_registry,
+    compression,
+    request_exception_wrapper,
+    session_pool,
+)
 
 ResponseContent = JSONEncodable
 
 
 class CometAPIClient:
-    def __init__(self, api_key: str, comet_url: str, session: requests.Session):
+    def __init__(
+        self, api_key: str, comet_url: str, sessions: session_pool.SessionPool
+    ):
         self._headers = {"Authorization": api_key}
         self._comet_url = comet_url
-        self._session = session
+        self._sessions = sessions
+
+    @property
+    def circuit_breaker(self) -> circuit_breaker.CircuitBreaker:
+        return circuit_breaker.get(
+            (
+                self._headers["Authorization"],
+                self._comet_url,
+                config.tls_verification_enabled(),
+            )
+        )
 
     def create_experiment(
         self,
@@ -65,6 +87,29 @@ class CometAPIClient:
             },
         )
 
+    def log_experiment_parameters(
+        self, experiment_key: str, parameters: Dict[str, JSONEncodable]
+    ) -> ResponseContent:
+        timestamp = datetimes.local_timestamp()
+
+        # Batch endpoint lives under the clientlib root, so the path
+        # is relative to comet_url unlike the REST API ones.
+        return self._request(
+            "POST",
+            "batch/logger/experiment/parameter",
+            json={
+                "experimentKey": experiment_key,
+                "values": [
+                    {
+                        "parameterName": name,
+                        "parameterValue": value,
+                        "timestamp": timestamp,
+                    }
+                    for name, value in parameters.items()
+                ],
+            },
+        )
+
     def log_experiment_metric(
         self, experiment_key: str, name: str, value: JSONEncodable
     ) -> ResponseContent:
@@ -86,8 +131,43 @@ class CometAPIClient:
         asset_type: str,
         extension: Optional[str] = None,
     ) -> ResponseContent:
+        content = file.read()
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+
+        return self.log_experiment_asset_with_stream(
+            experiment_key,
+            name=name,
+            chunks=[content],
+            asset_type=asset_type,
+            extension=extension,
+        )
+
+    def log_experiment_asset_with_stream(
+        self,
+        experiment_key: str,
+        name: str,
+        chunks: Iterable[bytes],
+        asset_type: str,
+        extension: Optional[str] = None,
+    ) -> ResponseContent:
+        """
+        Uploads the asset content produced by chunks without joining it
+        in memory. Big assets are sent with chunked transfer encoding.
+        """
         extension = name.split(".")[-1] if extension is None else extension
 
+        multipart_chunks, content_type = _multipart_file_body(chunks)
+        body, content_encoding = compression.encode(
+            multipart_chunks,
+            algorithm=config.asset_compression(),
+            threshold=config.asset_compression_threshold(),
+        )
+
+        headers = {"Content-Type": content_type}
+        if content_encoding is not None:
+            headers["Content-Encoding"] = content_encoding
+
         return self._request(
             "POST",
             "/api/rest/v2/write/experiment/upload-asset",
@@ -97,7 +177,8 @@ class CometAPIClient:
                 "extension": extension,
                 "type": asset_type,
             },
-            files={"file": file},
+            data=body,
+            headers=headers,
         )
 
     def log_experiment_tags(
@@ -122,32 +203,115 @@ class CometAPIClient:
             },
         )
 
+    def close(self) -> None:
+        self._sessions.close()
+
+    def closer(self) -> Callable[[], None]:
+        """
+        Returns the function closing the sessions, it doesn't reference
+        the client, so it can be called once the client is collected.
+        """
+        return self._sessions.close
+
     def _request(self, method: str, path: str, *args, **kwargs) -> ResponseContent:  # type: ignore
         url = urllib.parse.urljoin(self._comet_url, path)
-        response = self._session.request(
+        headers = {**self._headers, **kwargs.pop("headers", {})}
+        response = self._sessions.get().request(
             method=method,
             url=url,
-            headers=self._headers,
+            headers=headers,
             *args,
             **kwargs,
         )
         response.raise_for_status()
 
+        if len(response.content) == 0:
+            return None
+
         return response.json()
 
 
-@functools.lru_cache(maxsize=1)
+def _multipart_file_body(chunks: Iterable[bytes]) -> Tuple[Iterator[bytes], str]:
+    """
+    Same multipart/form-data body as urllib3.filepost.encode_multipart_formdata
+    produces for {"file": ("file", content)}, but generated lazily.
+    """
+    boundary = urllib3.filepost.choose_boundary()
+    opening = (
+        "--%s\r\n"
+        'Content-Disposition: form-data; name="file"; filename="file"\r\n'
+        "Content-Type: application/octet-stream\r\n\r\n" % boundary
+    ).encode("latin-1")
+    closing = ("\r\n--%s--\r\n" % boundary).encode("latin-1")
+
+    body = itertools.chain([opening], chunks, [closing])
+
+    return body, "multipart/form-data; boundary=%s" % boundary
+
+
+# (api key, comet url, TLS verification)
+ClientKey = Tuple[str, str, bool]
+
+_REGISTRY: Optional["client_registry.ClientRegistry[ClientKey, CometAPIClient]"] = None
+_REGISTRY_LOCK = threading.Lock()
+
+
 def get(api_key: str) -> CometAPIClient:
-    comet_url = config.comet_url()
-    session = _get_session()
-    comet_api_client = CometAPIClient(api_key, comet_url, session)
+    """
+    Returns the client for the API key and the current Comet URL and TLS
+    settings. Clients are cached and each of them keeps its own HTTP
+    sessions, so alternating between several API keys reuses warm
+    connections.
+    """
+    key = (api_key, config.comet_url(), config.tls_verification_enabled())
+    return _get_registry().get(key)
 
-    return comet_api_client
 
+def close() -> None:
+    """Closes all the cached clients and their connections."""
+    if _REGISTRY is not None:
+        _REGISTRY.clear()
 
-def _get_session() -> requests.Session:
+
+def _get_registry() -> "client_registry.ClientRegistry[ClientKey, CometAPIClient]":
+    global _REGISTRY
+
+    with _REGISTRY_LOCK:
+        if _REGISTRY is None:
+            _REGISTRY = client_registry.ClientRegistry(
+                factory=_create_client,
+                max_size=config.client_cache_max_size(),
+                idle_timeout=config.client_cache_idle_timeout(),
+                closer=CometAPIClient.closer,
+            )
+            atexit.register(close)
+
+        return _REGISTRY
+
+
+def _create_client(key: ClientKey) -> CometAPIClient:
+    api_key, comet_url, _ = key
+    sessions = session_pool.SessionPool(
+        session_factory=_create_session,
+        per_thread=config.connection_pool_session_scope() == "thread",
+    )
+
+    return CometAPIClient(api_key, comet_url, sessions)
+
+
+def _create_session() -> requests.Session:
     session = requests.Session()
 
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=config.connection_pool_connections(),
+        pool_maxsize=config.connection_pool_maxsize(),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    if not config.connection_pool_keep_alive():
+        session.headers["Connection"] = "close"
+
     if not config.tls_verification_enabled():
         # Only the set the verify if it's disabled. The current default for the verify attribute is
         # True but this way we will survive any change of the default value
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# *******************************************************
+#   ____                     _               _
+#  / ___|___  _ __ ___   ___| |_   _ __ ___ | |
+# | |   / _ \| '_ ` _ \ / _ \ __| | '_ ` _ \| |
+# | |__| (_) | | | | | |  __/ |_ _| | | | | | |
+#  \____\___/|_| |_| |_|\___|\__(_)_| |_| |_|_|
+#
+#  Sign up for free at https://www.comet.com
+#  Copyright (C) 2015-2023 Comet ML INC
+#  This source code is licensed under the MIT license found in the
+#  LICENSE file in the root directory of this package.
+# *******************************************************
+
+
+import itertools
+import logging
+import zlib
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+LOGGER = logging.getLogger(__name__)
+
+GZIP_COMPRESS_LEVEL = 6
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+Body = Union[bytes, Iterator[bytes]]
+
+
+def encode(
+    chunks: Iterable[bytes], algorithm: str, threshold: int
+) -> Tuple[Body, Optional[str]]:
+    """
+    Prepares the request body from the chunks.
+
+    At most threshold bytes are buffered. If the chunks end before that,
+    the body is returned as bytes and is not compressed. Otherwise the body
+    is returned as an iterator which compresses the chunks on the fly.
+
+    Returns: (body, content encoding), content encoding is None
+    if body is not compressed.
+    """
+    iterator = iter(chunks)
+    head = []
+    size = 0
+
+    for chunk in iterator:
+        head.append(chunk)
+        size += len(chunk)
+        if size >= threshold:
+            break
+    else:
+        return b"".join(head), None
+
+    body = itertools.chain(head, iterator)
+
+    if algorithm == "none":
+        return body, None
+
+    if algorithm == "zstd":
+        try:
+            import zstandard  # type: ignore
+
+            return (
+                _compress_stream(body, zstandard.ZstdCompressor().compressobj()),
+                "zstd",
+            )
+        except ImportError:
+            LOGGER.debug("zstandard is not installed, gzip is used instead")
+
+    compressor = zlib.compressobj(GZIP_COMPRESS_LEVEL, zlib.DEFLATED, GZIP_WBITS)
+
+    return _compress_stream(body, compressor), "gzip"
+
+
+def _compress_stream(chunks: Iterable[bytes], compressor) -> Iterator[bytes]:  # type: ignore
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+
+    yield compressor.flush()
@@ -12,13 +12,13 @@
 #  LICENSE file in the root directory of this package.
 # *******************************************************
 
-from typing import IO, List, Optional
+from typing import IO, Dict, Iterable, List, Optional
 from urllib import parse
 
 from comet_llm.types import JSONEncodable
 
 from .. import config, constants
-from . import comet_api_client, request_exception_wrapper
+from . import circuit_breaker, comet_api_client, request_exception_wrapper
 
 
 class ExperimentAPI:
@@ -39,7 +39,7 @@ class ExperimentAPI:
             self._project_url = self._build_comet_url()
 
     @classmethod
-    @request_exception_wrapper.wrap(check_on_prem=True)
+    @request_exception_wrapper.wrap(check_on_prem=True, idempotent=False)
     def create_new(  # type: ignore
         cls,
         api_key: str,
@@ -60,16 +60,33 @@ class ExperimentAPI:
 
     @classmethod
     def from_existing_id(  # type: ignore
-        cls, id: str, api_key: str, load_metadata: bool = True
+        cls,
+        id: str,
+        api_key: str,
+        load_metadata: bool = True,
+        workspace: Optional[str] = None,
+        project_name: Optional[str] = None,
     ):
         client = comet_api_client.get(api_key)
-        experiment_api = cls(id=id, comet_api_client=client)
+        experiment_api = cls(
+            id=id,
+            comet_api_client=client,
+            workspace=workspace,
+            project_name=project_name,
+        )
 
         if load_metadata:
             experiment_api.load_metadata()
 
         return experiment_api
 
+    @property
+    def circuit_breaker(self) -> circuit_breaker.CircuitBreaker:
+        """
+        The breaker the requests of the experiment are checked against.
+        """
+        return self._client.circuit_breaker
+
     @property
     def project_url(self) -> Optional[str]:
         return self._project_url
@@ -97,10 +114,27 @@ class ExperimentAPI:
         parsed_comet_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
         return f"{parsed_comet_url}/{self._workspace}/{self._project_name}"
 
-    @request_exception_wrapper.wrap(check_on_prem=True)
     def log_asset_with_io(self, name: str, file: IO, asset_type: str) -> None:
-        self._client.log_experiment_asset_with_io(
-            self._id, name=name, file=file, asset_type=asset_type
+        # Read once, outside of the retried upload, so that the retries
+        # don't send what's left of the already consumed file.
+        self.log_asset_with_stream(
+            name=name, chunks=[self._read_bytes(file)], asset_type=asset_type
+        )
+
+    @staticmethod
+    def _read_bytes(file: IO) -> bytes:
+        content = file.read()
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+
+        return content  # type: ignore
+
+    @request_exception_wrapper.wrap(check_on_prem=True, idempotent=False)
+    def log_asset_with_stream(
+        self, name: str, chunks: Iterable[bytes], asset_type: str
+    ) -> None:
+        self._client.log_experiment_asset_with_stream(
+            self._id, name=name, chunks=chunks, asset_type=asset_type
         )
 
     @request_exception_wrapper.wrap()
@@ -108,6 +142,16 @@ class ExperimentAPI:
         self._client.log_experiment_parameter(self._id, name=name, value=value)
 
     @request_exception_wrapper.wrap()
+    def log_parameters(self, parameters: Dict[str, JSONEncodable]) -> None:
+        batch_size = config.parameters_batch_size()
+        items = list(parameters.items())
+
+        for start in range(0, len(items), batch_size):
+            self._client.log_experiment_parameters(
+                self._id, parameters=dict(items[start : start + batch_size])
+            )
+
+    @request_exception_wrapper.wrap(idempotent=False)
     def log_metric(self, name: str, value: JSONEncodable) -> None:
         self._client.log_experiment_metric(self._id, name=name, value=value)
 
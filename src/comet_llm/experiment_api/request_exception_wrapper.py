@@ -12,50 +12,150 @@
 #  LICENSE file in the root directory of this package.
 # *******************************************************
 
+import asyncio
 import functools
+import inspect
 import logging
+import time
 import urllib.parse
 from pprint import pformat
-from typing import Any, Callable, List
+from typing import Any, Callable, Dict, List, NoReturn, Tuple
 
 import requests  # type: ignore
 
 from .. import config, exceptions, logging_messages
-from . import failed_response_handler
+from . import circuit_breaker, failed_response_handler, retries
 
 LOGGER = logging.getLogger(__name__)
 
 
-def wrap(check_on_prem: bool = False) -> Callable:
+def wrap(check_on_prem: bool = False, idempotent: bool = True) -> Callable:
+    """
+    Converts requests exceptions into CometLLMException.
+
+    Failures caused by backend unavailability are retried with exponential
+    backoff according to the retry configuration. Requests which are not
+    idempotent are retried only if the server surely didn't process them.
+    Failures that remain after the retries are reported to the circuit
+    breaker, which makes subsequent calls fail fast while the backend
+    is unavailable. The breaker is the one of the wrapped method's object
+    circuit_breaker attribute, or of the api_key argument.
+    """
+
     def inner_wrap(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs) -> Any:  # type: ignore
+                breaker = _circuit_breaker(args, kwargs)
+                breaker.before_request()
+
+                attempt = 1
+                while True:
+                    try:
+                        result = await func(*args, **kwargs)
+                    except requests.RequestException as exception:
+                        delay = retries.delay(exception, attempt, idempotent)
+                        if delay is None:
+                            return _give_up(breaker, exception, check_on_prem)
+                        _debug_log_retry(exception, attempt, delay)
+                        await asyncio.sleep(delay)
+                        attempt += 1
+                    else:
+                        breaker.record_success()
+                        return result
+
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs) -> Any:  # type: ignore
-            try:
-                return func(*args, **kwargs)
-            except requests.RequestException as exception:
-                _debug_log(exception)
-
-                if check_on_prem:
-                    comet_url = config.comet_url()
-                    if _is_on_prem(comet_url):
-                        raise exceptions.CometLLMException(
-                            f"Failed to send prompt to your Comet installation at "
-                            f"{comet_url}. Check that your Comet "
-                            f"installation is up-to-date and check the traceback for more details."
-                        ) from exception
-
-                if exception.response is None:
-                    raise exceptions.CometLLMException(
-                        logging_messages.FAILED_TO_SEND_DATA_TO_SERVER
-                    ) from exception
-
-                failed_response_handler.handle(exception)
+            breaker = _circuit_breaker(args, kwargs)
+            breaker.before_request()
+
+            attempt = 1
+            while True:
+                try:
+                    result = func(*args, **kwargs)
+                except requests.RequestException as exception:
+                    delay = retries.delay(exception, attempt, idempotent)
+                    if delay is None:
+                        return _give_up(breaker, exception, check_on_prem)
+                    _debug_log_retry(exception, attempt, delay)
+                    time.sleep(delay)
+                    attempt += 1
+                else:
+                    breaker.record_success()
+                    return result
 
         return wrapper
 
     return inner_wrap
 
 
+def _circuit_breaker(
+    args: Tuple[Any, ...], kwargs: Dict[str, Any]
+) -> circuit_breaker.CircuitBreaker:
+    breaker = getattr(args[0], "circuit_breaker", None) if len(args) > 0 else None
+    if isinstance(breaker, circuit_breaker.CircuitBreaker):
+        return breaker
+
+    return circuit_breaker.for_api_key(kwargs.get("api_key"))
+
+
+def _give_up(
+    breaker: circuit_breaker.CircuitBreaker,
+    exception: requests.RequestException,
+    check_on_prem: bool,
+) -> NoReturn:
+    transient = retries.is_transient(exception)
+    if transient:
+        breaker.record_failure()
+    else:
+        # The backend is up, it just didn't like the request
+        breaker.record_success()
+
+    _handle(exception, check_on_prem, transient)
+
+
+def _debug_log_retry(
+    exception: requests.RequestException, attempt: int, delay: float
+) -> None:
+    LOGGER.debug(
+        "Request failed on attempt %d with %r, retrying in %.2f seconds",
+        attempt,
+        exception,
+        delay,
+    )
+
+
+def _handle(
+    exception: requests.RequestException, check_on_prem: bool, transient: bool = False
+) -> NoReturn:
+    _debug_log(exception)
+
+    exception_class = (
+        exceptions.BackendUnavailableException
+        if transient
+        else exceptions.CometLLMException
+    )
+
+    if check_on_prem:
+        comet_url = config.comet_url()
+        if _is_on_prem(comet_url):
+            raise exception_class(
+                f"Failed to send prompt to your Comet installation at "
+                f"{comet_url}. Check that your Comet "
+                f"installation is up-to-date and check the traceback for more details."
+            ) from exception
+
+    if exception.response is None or transient:
+        raise exception_class(
+            logging_messages.FAILED_TO_SEND_DATA_TO_SERVER
+        ) from exception
+
+    failed_response_handler.handle(exception)
+
+
 def _is_on_prem(url: str) -> bool:
     parsed = urllib.parse.urlparse(url)
     root = f"{parsed.scheme}://{parsed.hostname}/"
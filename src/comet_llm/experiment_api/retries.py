@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+# *******************************************************
+#   ____                     _               _
+#  / ___|___  _ __ ___   ___| |_   _ __ ___ | |
+# | |   / _ \| '_ ` _ \ / _ \ __| | '_ ` _ \| |
+# | |__| (_) | | | | | |  __/ |_ _| | | | | | |
+#  \____\___/|_| |_| |_|\___|\__(_)_| |_| |_|_|
+#
+#  Sign up for free at https://www.comet.com
+#  Copyright (C) 2015-2023 Comet ML INC
+#  This source code is licensed under the MIT license found in the
+#  LICENSE file in the root directory of this package.
+# *******************************************************
+
+
+import datetime
+import email.utils
+import random
+from typing import Optional
+
+import requests  # type: ignore
+import urllib3.exceptions
+
+from .. import config
+
+RETRYABLE_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+
+# The server rejected these requests without processing them,
+# so it's safe to repeat even the non-idempotent ones.
+NOT_PROCESSED_STATUS_CODES = frozenset([429, 503])
+
+
+def is_transient(exception: requests.RequestException) -> bool:
+    """
+    Whether the failure is caused by backend unavailability rather than
+    by the request itself.
+    """
+    if isinstance(exception, (requests.ConnectionError, requests.Timeout)):
+        return True
+
+    return _status_code(exception) in RETRYABLE_STATUS_CODES
+
+
+def delay(
+    exception: requests.RequestException, attempt: int, idempotent: bool
+) -> Optional[float]:
+    """
+    Returns the number of seconds to wait before repeating the request
+    that failed on the given attempt (starting from 1), or None if the
+    request must not be repeated.
+    """
+    if not _is_retryable(exception, idempotent):
+        return None
+
+    if attempt >= config.retry_max_attempts():
+        return None
+
+    backoff_max = config.retry_backoff_max()
+
+    retry_after = _retry_after(exception)
+    if retry_after is not None:
+        # Retrying earlier than the server asks is pointless, waiting longer
+        # than backoff_max would block the caller for too long.
+        return retry_after if retry_after <= backoff_max else None
+
+    backoff: float = min(
+        backoff_max, config.retry_backoff_factor() * (2 ** (attempt - 1))
+    )
+
+    if config.retry_jitter_enabled():
+        return random.uniform(0, backoff)
+
+    return backoff
+
+
+def _is_retryable(exception: requests.RequestException, idempotent: bool) -> bool:
+    if idempotent:
+        return is_transient(exception)
+
+    return _status_code(exception) in NOT_PROCESSED_STATUS_CODES or _is_connect_error(
+        exception
+    )
+
+
+def _is_connect_error(exception: requests.RequestException) -> bool:
+    """
+    Whether the connection could not be established, so the request
+    never reached the server.
+    """
+    if isinstance(exception, requests.exceptions.ConnectTimeout):
+        return True
+
+    if not isinstance(exception, requests.ConnectionError) or len(exception.args) == 0:
+        return False
+
+    reason = exception.args[0]
+    if isinstance(reason, urllib3.exceptions.MaxRetryError):
+        reason = reason.reason
+
+    return isinstance(
+        reason,
+        (urllib3.exceptions.NewConnectionError, urllib3.exceptions.ConnectTimeoutError),
+    )
+
+
+def _status_code(exception: requests.RequestException) -> Optional[int]:
+    return getattr(exception.response, "status_code", None)
+
+
+def _retry_after(exception: requests.RequestException) -> Optional[float]:
+    headers = getattr(exception.response, "headers", None)
+    value = headers.get("Retry-After") if headers is not None else None
+
+    if value is None:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return max((retry_at - now).total_seconds(), 0.0)
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+# *******************************************************
+#   ____                     _               _
+#  / ___|___  _ __ ___   ___| |_   _ __ ___ | |
+# | |   / _ \| '_ ` _ \ / _ \ __| | '_ ` _ \| |
+# | |__| (_) | | | | | |  __/ |_ _| | | | | | |
+#  \____\___/|_| |_| |_|\___|\__(_)_| |_| |_|_|
+#
+#  Sign up for free at https://www.comet.com
+#  Copyright (C) 2015-2023 Comet ML INC
+#  This source code is licensed under the MIT license found in the
+#  LICENSE file in the root directory of this package.
+# *******************************************************
+
+
+import threading
+import weakref
+from typing import Callable, Optional
+
+import requests  # type: ignore
+
+
+class SessionPool:
+    """
+    Hands out requests sessions, either one shared by all threads
+    or a separate one per thread, and closes them on demand.
+    Sessions of finished threads are garbage collected together
+    with their connections.
+    """
+
+    def __init__(
+        self, session_factory: Callable[[], requests.Session], per_thread: bool
+    ) -> None:
+        self._session_factory = session_factory
+        self._per_thread = per_thread
+        self._shared_session: Optional[requests.Session] = None
+        self._thread_local = threading.local()
+        self._sessions: "weakref.WeakSet[requests.Session]" = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def get(self) -> requests.Session:
+        if self._per_thread:
+            session = getattr(self._thread_local, "session", None)
+            if session is None:
+                with self._lock:
+                    session = self._new_session()
+                self._thread_local.session = session
+
+            return session
+
+        session = self._shared_session
+        if session is None:
+            with self._lock:
+                if self._shared_session is None:
+                    self._shared_session = self._new_session()
+                session = self._shared_session
+
+        return session
+
+    def close(self) -> None:
+        """
+        Closes all the sessions created so far. The pool stays usable,
+        new sessions are created on the next get() call.
+        """
+        with self._lock:
+            sessions = list(self._sessions)
+            self._sessions.clear()
+            self._shared_session = None
+            self._thread_local = threading.local()
+
+        for session in sessions:
+            session.close()
+
+    def _new_session(self) -> requests.Session:
+        session = self._session_factory()
+        self._sessions.add(session)
+
+        return session
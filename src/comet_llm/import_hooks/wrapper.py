@@ -12,9 +12,10 @@
 #  LICENSE file in the root directory of this package.
 # *******************************************************
 
+import contextvars
 import functools
 import inspect
-from typing import Callable
+from typing import Any, Awaitable, Callable
 
 from . import callable_extenders, callback_runners
 
@@ -24,13 +25,60 @@ def wrap(
 ) -> Callable:
     original = _unbound_if_classmethod(original)
 
+    if _is_coroutine_function(original):
+        return _wrap_coroutine_function(original, callbacks)
+
     @functools.wraps(original)
     def wrapped(*args, **kwargs):  # type: ignore
+        # The callbacks share state through context variables. They run,
+        # with the call, in a copy of the caller's context, so if the call
+        # returns a coroutine the after callbacks run in the same context
+        # as the before ones, whichever task awaits it.
+        context = contextvars.copy_context()
+        return context.run(_call, context, original, callbacks, args, kwargs)
+
+    return wrapped
+
+
+def _call(  # type: ignore
+    context: contextvars.Context,
+    original: Callable,
+    callbacks: callable_extenders.CallableExtenders,
+    args,
+    kwargs,
+) -> Any:
+    args, kwargs = callback_runners.run_before(
+        callbacks.before, original, *args, **kwargs
+    )
+    try:
+        result = original(*args, **kwargs)
+    except Exception as exception:
+        callback_runners.run_after_exception(
+            callbacks.after_exception, original, exception, *args, **kwargs
+        )
+        raise exception
+
+    if inspect.iscoroutine(result):
+        # A regular function returning a coroutine that is not detected
+        # as a coroutine function, the after callbacks are run when the
+        # call is really finished.
+        return _awaited(context, result, original, callbacks, args, kwargs)
+
+    return callback_runners.run_after(
+        callbacks.after, original, result, *args, **kwargs
+    )
+
+
+def _wrap_coroutine_function(
+    original: Callable, callbacks: callable_extenders.CallableExtenders
+) -> Callable:
+    @functools.wraps(original)
+    async def wrapped(*args, **kwargs):  # type: ignore
         args, kwargs = callback_runners.run_before(
             callbacks.before, original, *args, **kwargs
         )
         try:
-            result = original(*args, **kwargs)
+            result = await original(*args, **kwargs)
         except Exception as exception:
             callback_runners.run_after_exception(
                 callbacks.after_exception, original, exception, *args, **kwargs
@@ -46,6 +94,44 @@ def wrap(
     return wrapped
 
 
+async def _awaited(  # type: ignore
+    context: contextvars.Context,
+    coroutine: Awaitable,
+    original: Callable,
+    callbacks: callable_extenders.CallableExtenders,
+    args,
+    kwargs,
+) -> Any:
+    try:
+        result = await coroutine
+    except Exception as exception:
+        context.run(
+            callback_runners.run_after_exception,
+            callbacks.after_exception,
+            original,
+            exception,
+            *args,
+            **kwargs,
+        )
+        raise exception
+
+    return context.run(
+        callback_runners.run_after, callbacks.after, original, result, *args, **kwargs
+    )
+
+
+def _is_coroutine_function(original: Callable) -> bool:
+    """
+    Also True for the regular functions wrapping a coroutine function with
+    functools.wraps, like the methods of the openai async client. The before
+    callbacks of such functions must run in the task awaiting them.
+    """
+    try:
+        return inspect.iscoroutinefunction(inspect.unwrap(original))
+    except ValueError:
+        return False
+
+
 def _unbound_if_classmethod(original: Callable) -> Callable:
     if hasattr(original, "__self__") and inspect.isclass(original.__self__):
         # when original is classmethod, mypy doesn't consider it as a callable.
@@ -17,5 +17,7 @@ import dataclasses
 
 @dataclasses.dataclass
 class LLMResult:
+    __slots__ = ("id", "project_url")
+
     id: str
     project_url: str
@@ -31,3 +31,17 @@ METADATA_KEY_COLLISION_DURING_DEEPMERGE = (
 INVALID_TIMESTAMP = "Invalid timestamp: %s. Timestamp must be in seconds if specified."
 
 GLOBAL_CHAIN_NOT_INITIALIZED = "Global chain is not initialized for this thread. Initialize it with `comet_llm.start_chain(...)` if you wish to use %s"
+
+HTTPX_NOT_INSTALLED = (
+    "comet_llm.aio requires httpx package, install it with `pip install httpx`"
+)
+
+CIRCUIT_BREAKER_OPENED = "Comet backend looks unavailable, requests to it will be skipped for the next %s seconds"
+
+CIRCUIT_BREAKER_OPEN = "Data was not sent, Comet backend is unavailable. See previous warnings for details."
+
+TRACE_SPOOLED = (
+    "Comet backend is unavailable, the data was saved to %s and will be sent later"
+)
+
+SPOOL_QUOTA_EXCEEDED = "Spool directory %s reached its max size, %s"
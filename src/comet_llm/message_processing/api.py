@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+# *******************************************************
+#   ____                     _               _
+#  / ___|___  _ __ ___   ___| |_   _ __ ___ | |
+# | |   / _ \| '_ ` _ \ / _ \ __| | '_ ` _ \| |
+# | |__| (_) | | | | | |  __/ |_ _| | | | | | |
+#  \____\___/|_| |_| |_|\___|\__(_)_| |_| |_|_|
+#
+#  Sign up for free at https://www.comet.com
+#  Copyright (C) 2015-2023 Comet ML INC
+#  This source code is licensed under the MIT license found in the
+#  LICENSE file in the root directory of this package.
+# *******************************************************
+
+
+import asyncio
+import atexit
+import logging
+import threading
+from typing import Callable, List, Optional
+
+from .. import (
+    app,
+    config,
+    exceptions,
+    llm_result,
+    logging as comet_logging,
+    logging_messages,
+)
+from . import async_sender, background_uploader, messages, replayer, sender, spool
+
+LOGGER = logging.getLogger(__name__)
+
+_UPLOADER: Optional[background_uploader.BackgroundUploader] = None
+_UPLOADER_LOCK = threading.Lock()
+
+_REPLAYER: Optional[replayer.Replayer] = None
+_REPLAYER_LOCK = threading.Lock()
+
+_SHUTDOWN_CALLBACKS: List[Callable[[], None]] = []
+_SHUT_DOWN = False
+
+
+def process(message: messages.TraceMessage) -> Optional[llm_result.LLMResult]:
+    """
+    Sends the message to Comet right away or, if asynchronous logging
+    is enabled, puts a snapshot of it into the upload queue and returns None.
+    """
+    if not config.async_logging_enabled():
+        return _send(message)
+
+    _get_uploader().put(messages.snapshot(message))
+    return None
+
+
+async def process_async(
+    message: messages.TraceMessage,
+) -> Optional[llm_result.LLMResult]:
+    """
+    Same as process, but awaits the HTTP requests instead of blocking on them.
+    """
+    if not config.async_logging_enabled():
+        message = _resumable(message)
+        try:
+            result = await async_sender.send(message)
+        except exceptions.BackendUnavailableException:
+            if not _save_to_spool(message):
+                raise
+            return None
+
+        _on_sent()
+        return result
+
+    uploader = _get_uploader()
+    snapshot = messages.snapshot(message)
+    if not uploader.put_nowait(snapshot):
+        # The queue is full, waiting for room must not block the event loop
+        # get_event_loop() returns the running loop, get_running_loop()
+        # doesn't exist on Python 3.6
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, uploader.put, snapshot)
+
+    return None
+
+
+def process_in_background(message: messages.TraceMessage) -> None:
+    """
+    Puts the message into the upload queue even if asynchronous logging
+    is disabled. Used for the data that is logged while the user code
+    is still running, e.g. the segments of a chain.
+    """
+    _get_uploader().put(messages.snapshot(message))
+
+
+def process_deferred(build_message: background_uploader.MessageBuilder) -> None:
+    """
+    Puts a function building the message into the upload queue, it's
+    called by an uploader thread, so the preparation of the data, e.g.
+    the parsing of an LLM response, is done off the caller's thread too.
+    If it returns None nothing is sent.
+    """
+    _get_uploader().put(build_message)
+
+
+def on_shutdown(callback: Callable[[], None]) -> None:
+    """
+    Registers a function called at exit right before the upload queue
+    is flushed, e.g. to put the data that is still buffered into it.
+    Starts the uploader if it's not running yet.
+    """
+    _SHUTDOWN_CALLBACKS.append(callback)
+    _get_uploader()
+
+
+def flush(timeout: Optional[float] = None) -> bool:
+    uploader = _UPLOADER
+    if uploader is None:
+        return True
+
+    return uploader.flush(timeout)
+
+
+def start_spool_replay() -> None:
+    """
+    Starts sending the data left in the spool by the previous runs,
+    if the spool is enabled.
+    """
+    if config.spool_enabled():
+        _get_replayer()
+
+
+def _send(message: messages.TraceMessage) -> Optional[llm_result.LLMResult]:
+    """
+    Sends the message, or saves it to the spool if the backend
+    is unavailable and the spool is enabled.
+    """
+    message = _resumable(message)
+    try:
+        result = sender.send(message)
+    except exceptions.BackendUnavailableException:
+        if not _save_to_spool(message):
+            raise
+        return None
+
+    _on_sent()
+    return result
+
+
+def _resumable(message: messages.TraceMessage) -> messages.TraceMessage:
+    if not config.spool_enabled():
+        return message
+
+    return messages.with_experiment_ref(message)
+
+
+def _on_sent() -> None:
+    replayer_ = _REPLAYER
+    if replayer_ is not None:
+        replayer_.wake_up()
+
+
+def _save_to_spool(message: messages.TraceMessage) -> bool:
+    if not config.spool_enabled():
+        return False
+
+    replayer_ = _get_replayer()
+    if not replayer_.spool.write(message):
+        return False
+
+    replayer_.notify_spooled()
+    app.SUMMARY.increment_spooled()
+    comet_logging.log_once_at_level(
+        LOGGER,
+        logging.WARNING,
+        logging_messages.TRACE_SPOOLED,
+        replayer_.spool.directory,
+    )
+
+    return True
+
+
+def _get_replayer() -> replayer.Replayer:
+    global _REPLAYER
+
+    with _REPLAYER_LOCK:
+        if _REPLAYER is None:
+            replay_interval = config.spool_replay_interval()
+            spool_ = spool.Spool(
+                directory=config.spool_directory(),
+                segment_size=config.spool_segment_size(),
+                max_size=config.spool_max_size(),
+                fsync=config.spool_fsync(),
+                eviction=config.spool_eviction(),
+                abandoned_after=replay_interval * spool.ABANDONED_SEGMENT_INTERVALS,
+            )
+            _REPLAYER = replayer.Replayer(
+                spool_, send=sender.send, interval=replay_interval
+            )
+            _REPLAYER.start()
+            # The uploader may be started before or after the replayer, both
+            # register the whole shutdown, the one that runs first does it.
+            atexit.register(_shutdown, config.async_logging_shutdown_timeout())
+
+        return _REPLAYER
+
+
+def _get_uploader() -> background_uploader.BackgroundUploader:
+    global _UPLOADER
+
+    with _UPLOADER_LOCK:
+        if _UPLOADER is None:
+            _UPLOADER = background_uploader.BackgroundUploader(
+                send=exceptions.filter(allow_raising=False, summary=app.SUMMARY)(_send),
+                workers=config.async_logging_workers(),
+                queue_size=config.async_logging_queue_size(),
+            )
+            _UPLOADER.start()
+            # Registered after the summary print, so it runs before it at exit.
+            atexit.register(_shutdown, config.async_logging_shutdown_timeout())
+
+        return _UPLOADER
+
+
+def _shutdown(timeout: float) -> None:
+    global _SHUT_DOWN
+
+    if _SHUT_DOWN:
+        return
+    _SHUT_DOWN = True
+
+    for callback in _SHUTDOWN_CALLBACKS:
+        try:
+            callback()
+        except Exception:
+            LOGGER.debug("Shutdown callback failed", exc_info=True)
+
+    if _UPLOADER is not None:
+        _UPLOADER.close(timeout)
+
+    # After the uploader is closed, so the traces spooled by its final
+    # flush are sealed too and not left in an open segment.
+    if _REPLAYER is not None:
+        _REPLAYER.stop()
+        _REPLAYER.spool.seal()
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# *******************************************************
+#   ____                     _               _
+#  / ___|___  _ __ ___   ___| |_   _ __ ___ | |
+# | |   / _ \| '_ ` _ \ / _ \ __| | '_ ` _ \| |
+# | |__| (_) | | | | | |  __/ |_ _| | | | | | |
+#  \____\___/|_| |_| |_|\___|\__(_)_| |_| |_|_|
+#
+#  Sign up for free at https://www.comet.com
+#  Copyright (C) 2015-2023 Comet ML INC
+#  This source code is licensed under the MIT license found in the
+#  LICENSE file in the root directory of this package.
+# *******************************************************
+
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, List
+
+from .. import app, config, experiment_api, llm_result
+from . import dedup, messages, sender
+
+
+async def send(message: messages.TraceMessage) -> llm_result.LLMResult:
+    experiment_api_ = await _get_experiment_api(message)
+
+    dedup_options = dedup.from_config(experiment_api_.id)
+    chunks = sender.trace_chunks(message, dedup_options)
+    writes = sender.experiment_writes(experiment_api_, message, chunks)
+    max_workers = config.experiment_writes_max_workers()
+    if max_workers > 1:
+        await _write_concurrently(writes, max_workers)
+    else:
+        for write in writes:
+            await write()
+
+    sender.remember_stored_blobs(dedup_options, experiment_api_, message, chunks)
+
+    if message.segment_index is None:
+        app.SUMMARY.add_log(experiment_api_.project_url, message.category)
+
+    return llm_result.LLMResult(
+        id=experiment_api_.id, project_url=experiment_api_.project_url
+    )
+
+
+async def _get_experiment_api(
+    message: messages.TraceMessage,
+) -> Any:
+    experiment_info_ = message.experiment_info
+    ref = message.experiment_ref
+    if ref is None:
+        return await experiment_api.AsyncExperimentAPI.create_new(
+            api_key=experiment_info_.api_key,
+            workspace=experiment_info_.workspace,
+            project_name=experiment_info_.project_name,
+        )
+
+    if ref.experiment_key is None:
+        await _acquire(ref.lock)
+        try:
+            if ref.experiment_key is None:
+                experiment_api_ = await experiment_api.AsyncExperimentAPI.create_new(
+                    api_key=experiment_info_.api_key,
+                    workspace=experiment_info_.workspace,
+                    project_name=experiment_info_.project_name,
+                )
+                ref.experiment_key = experiment_api_.id
+                ref.workspace = experiment_api_.workspace
+                ref.project_name = experiment_api_.project_name
+                return experiment_api_
+        finally:
+            ref.lock.release()
+
+    return experiment_api.AsyncExperimentAPI.from_existing_id(
+        ref.experiment_key,
+        api_key=experiment_info_.api_key,  # type: ignore
+        workspace=ref.workspace,
+        project_name=ref.project_name,
+    )
+
+
+async def _acquire(lock: threading.Lock) -> None:
+    """
+    The lock is shared with the uploader threads, which may hold it while
+    they create the experiment with retries. Waiting for it is done by an
+    executor thread, so the event loop is not blocked.
+    """
+    if lock.acquire(blocking=False):
+        return
+
+    acquired = asyncio.get_event_loop().run_in_executor(None, lock.acquire)
+    try:
+        await asyncio.shield(acquired)
+    except asyncio.CancelledError:
+        # The executor thread still gets the lock, it must not stay taken
+        acquired.add_done_callback(lambda _: lock.release())
+        raise
+
+
+async def _write_concurrently(
+    writes: List[Callable[[], Awaitable[Any]]], max_workers: int
+) -> None:
+    semaphore = asyncio.Semaphore(max_workers)
+
+    async def write_limited(write: Callable[[], Awaitable[Any]]) -> Any:
+        async with semaphore:
+            return await write()
+
+    results = await asyncio.gather(
+        *[write_limited(write) for write in writes], return_exceptions=True
+    )
+
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+# *******************************************************
+#   ____                     _               _
+#  / ___|___  _ __ ___   ___| |_   _ __ ___ | |
+# | |   / _ \| '_ ` _ \ / _ \ __| | '_ ` _ \| |
+# | |__| (_) | | | | | |  __/ |_ _| | | | | | |
+#  \____\___/|_| |_| |_|\___|\__(_)_| |_| |_|_|
+#
+#  Sign up for free at https://www.comet.com
+#  Copyright (C) 2015-2023 Comet ML INC
+#  This source code is licensed under the MIT license found in the
+#  LICENSE file in the root directory of this package.
+# *******************************************************
+
+
+import logging
+import queue
+import threading
+from typing import Any, Callable, List, Optional, Union
+
+from . import messages
+
+LOGGER = logging.getLogger(__name__)
+
+_STOP = object()
+
+MessageBuilder = Callable[[], Optional[messages.TraceMessage]]
+
+
+class BackgroundUploader:
+    """
+    Sends trace messages to Comet from a pool of daemon worker
+    threads so that the caller doesn't wait for HTTP round trips.
+
+    Instead of a message, a function building it can be put into the
+    queue, it's called by the worker thread and the message it returns,
+    if not None, is sent.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[messages.TraceMessage], Any],
+        workers: int,
+        queue_size: int,
+    ) -> None:
+        self._send = send
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._unfinished = 0
+        self._condition = threading.Condition()
+        self._workers: List[threading.Thread] = [
+            threading.Thread(
+                target=self._loop, name=f"comet-llm-uploader-{i}", daemon=True
+            )
+            for i in range(max(workers, 1))
+        ]
+
+    def start(self) -> None:
+        for worker in self._workers:
+            worker.start()
+
+    def put(self, message: Union[messages.TraceMessage, MessageBuilder]) -> None:
+        with self._condition:
+            self._unfinished += 1
+
+        # Blocks when the queue is full, which is the back pressure we
+        # want instead of growing memory without a limit.
+        self._queue.put(message)
+
+    def put_nowait(self, message: Union[messages.TraceMessage, MessageBuilder]) -> bool:
+        """
+        Same as put, but returns False instead of blocking when the queue is full.
+        """
+        with self._condition:
+            self._unfinished += 1
+
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            self._task_done()
+            return False
+
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until every message put so far is processed.
+        Returns False if timeout expired before that.
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._unfinished == 0, timeout=timeout
+            )
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        flushed = self.flush(timeout)
+
+        for _ in self._workers:
+            try:
+                self._queue.put_nowait(_STOP)
+            except queue.Full:
+                # Workers are still busy and they are daemons,
+                # they will die together with the process.
+                break
+
+        return flushed
+
+    def _loop(self) -> None:
+        while True:
+            message = self._queue.get()
+            if message is _STOP:
+                return
+
+            try:
+                if callable(message):
+                    message = message()
+                if message is not None:
+                    self._send(message)
+            except Exception:
+                LOGGER.debug("Failed to send trace message", exc_info=True)
+            finally:
+                self._task_done()
+
+    def _task_done(self) -> None:
+        with self._condition:
+            self._unfinished -= 1
+            if self._unfinished == 0:
+                self._condition.notify_all()
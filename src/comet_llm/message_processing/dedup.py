@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+# *******************************************************
+#   ____                     _               _
+#  / ___|___  _ __ ___   ___| |_   _ __ ___ | |
+# | |   / _ \| '_ ` _ \ / _ \ __| | '_ ` _ \| |
+# | |__| (_) | | | | | |  __/ |_ _| | | | | | |
+#  \____\___/|_| |_| |_|\___|\__(_)_| |_| |_|_|
+#
+#  Sign up for free at https://www.comet.com
+#  Copyright (C) 2015-2023 Comet ML INC
+#  This source code is licensed under the MIT license found in the
+#  LICENSE file in the root directory of this package.
+# *******************************************************
+
+
+import collections
+import dataclasses
+import hashlib
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .. import config
+from . import payload_limits
+
+BLOB_KEY = "$blob"
+BLOBS_KEY = "blobs"
+
+
+@dataclasses.dataclass(frozen=True)
+class BlobLocation:
+    experiment_key: str
+    asset_name: str
+
+
+class KnownBlobs:
+    """
+    Bounded registry of the strings already uploaded by the process. Only
+    the hashes and the assets the strings were stored in are kept, per
+    experiment since the references are resolved within the experiment
+    of the trace. The least recently used entries are evicted first.
+    """
+
+    def __init__(self, max_count: int) -> None:
+        self._max_count = max_count
+        self._locations: "collections.OrderedDict[Tuple[str, str], BlobLocation]" = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def get(self, experiment_key: str, digest: str) -> Optional[BlobLocation]:
+        with self._lock:
+            location = self._locations.get((experiment_key, digest))
+            if location is not None:
+                self._locations.move_to_end((experiment_key, digest))
+
+            return location
+
+    def add(self, digests: Iterable[str], location: BlobLocation) -> None:
+        with self._lock:
+            for digest in digests:
+                key = (location.experiment_key, digest)
+                self._locations[key] = location
+                self._locations.move_to_end(key)
+
+            while len(self._locations) > self._max_count:
+                self._locations.popitem(last=False)
+
+
+_KNOWN_BLOBS: Optional[KnownBlobs] = None
+_KNOWN_BLOBS_LOCK = threading.Lock()
+
+
+def known_blobs() -> Optional[KnownBlobs]:
+    global _KNOWN_BLOBS
+
+    max_count = config.dedup_known_blobs_max_count()
+    if max_count == 0:
+        return None
+
+    with _KNOWN_BLOBS_LOCK:
+        if _KNOWN_BLOBS is None:
+            _KNOWN_BLOBS = KnownBlobs(max_count)
+
+        return _KNOWN_BLOBS
+
+
+@dataclasses.dataclass(frozen=True)
+class DedupOptions:
+    min_size: int
+    known_blobs: Optional[KnownBlobs] = None
+    experiment_key: Optional[str] = None
+
+
+def from_config(experiment_key: str) -> Optional[DedupOptions]:
+    min_size = config.dedup_min_size()
+    if min_size == 0:
+        return None
+
+    return DedupOptions(
+        min_size=min_size, known_blobs=known_blobs(), experiment_key=experiment_key
+    )
+
+
+class Deduplicator:
+    """
+    Replaces the strings of one trace that are at least min_size long with
+    {"$blob": <sha256>} references and collects the distinct ones, so
+    every one of them is written once, in the "blobs" key of the trace.
+
+    Strings found in the known blobs were stored by an earlier trace of the
+    same experiment, their references also contain the experiment key and
+    the asset name to read them from, and they are not stored again. The
+    strings stored in other experiments are stored again.
+    """
+
+    def __init__(self, options: DedupOptions) -> None:
+        self._min_size = options.min_size
+        self._known_blobs = options.known_blobs
+        self._experiment_key = options.experiment_key
+        self._blobs: Dict[str, str] = {}
+        self._references: Dict[str, Dict[str, str]] = {}
+        # The same prompt object is usually shared by many nodes, it is
+        # hashed once. The string is kept so its id can't be reused.
+        self._digests: Dict[int, Tuple[str, str]] = {}
+
+    @property
+    def blobs(self) -> Dict[str, str]:
+        return self._blobs
+
+    def replace_field(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return (
+                self._replace_string(value) if len(value) >= self._min_size else value
+            )
+        if isinstance(value, dict):
+            return self._replace_dict(value)
+        if isinstance(value, (list, tuple)):
+            return self._replace_list(value)
+
+        return value
+
+    def replace_node(self, node: Dict[str, Any]) -> Dict[str, Any]:
+        result = node
+        for field in payload_limits.NODE_FIELDS:
+            if field not in node:
+                continue
+
+            value = node[field]
+            replaced = self.replace_field(value)
+            if replaced is not value:
+                if result is node:
+                    result = dict(node)
+                result[field] = replaced
+
+        return result
+
+    def _replace_string(self, value: str) -> Dict[str, str]:
+        cached = self._digests.get(id(value))
+        if cached is not None:
+            digest = cached[1]
+        else:
+            digest = hashlib.sha256(value.encode("utf-8")).hexdigest()
+            self._digests[id(value)] = (value, digest)
+
+        reference = self._references.get(digest)
+        if reference is not None:
+            return reference
+
+        location = None
+        if self._known_blobs is not None and self._experiment_key is not None:
+            location = self._known_blobs.get(self._experiment_key, digest)
+
+        if location is None:
+            self._blobs[digest] = value
+            reference = {BLOB_KEY: digest}
+        else:
+            reference = {
+                BLOB_KEY: digest,
+                "experiment_key": location.experiment_key,
+                "asset_name": location.asset_name,
+            }
+
+        self._references[digest] = reference
+        return reference
+
+    def _replace_dict(self, value: Dict) -> Dict:
+        result = value
+        for key, item in value.items():
+            replaced = self.replace_field(item)
+            if replaced is not item:
+                if result is value:
+                    result = dict(value)
+                result[key] = replaced
+
+        return result
+
+    def _replace_list(self, value: Any) -> Any:
+        items: List[Any] = []
+        changed = False
+        for item in value:
+            replaced = self.replace_field(item)
+            changed = changed or replaced is not item
+            items.append(replaced)
+
+        return items if changed else value
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+# *******************************************************
+#   ____                     _               _
+#  / ___|___  _ __ ___   ___| |_   _ __ ___ | |
+# | |   / _ \| '_ ` _ \ / _ \ __| | '_ ` _ \| |
+# | |__| (_) | | | | | |  __/ |_ _| | | | | | |
+#  \____\___/|_| |_| |_|\___|\__(_)_| |_| |_|_|
+#
+#  Sign up for free at https://www.comet.com
+#  Copyright (C) 2015-2023 Comet ML INC
+#  This source code is licensed under the MIT license found in the
+#  LICENSE file in the root directory of this package.
+# *******************************************************
+
+
+import collections
+import dataclasses
+import threading
+import uuid
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from ..types import JSONEncodable
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ..experiment_info import ExperimentInfo
+
+ASSET_NAME = "comet_llm_data.json"
+ASSET_TYPE = "llm_data"
+SEGMENT_ASSET_NAME = "comet_llm_data_segment_%05d.json"
+SEGMENT_ASSET_TYPE = "llm_data_segment"
+
+_EXPERIMENT_REFS_MAX_SIZE = 1024
+
+
+class ExperimentRef:
+    """
+    The experiment shared by several messages, e.g. by the segments of a
+    chain exported incrementally and its final message. The first message
+    that is sent creates the experiment, the other ones log to it.
+    """
+
+    def __init__(self, id: str) -> None:
+        self.id = id
+        self.lock = threading.Lock()
+        self.experiment_key: Optional[str] = None
+        self.workspace: Optional[str] = None
+        self.project_name: Optional[str] = None
+
+
+_EXPERIMENT_REFS: "collections.OrderedDict[str, ExperimentRef]" = (
+    collections.OrderedDict()
+)
+_EXPERIMENT_REFS_LOCK = threading.Lock()
+
+
+def experiment_ref(id: Optional[str] = None) -> ExperimentRef:
+    """
+    Returns the ExperimentRef with the given id, creating it if needed.
+    Messages loaded from the spool get the same object as the messages of
+    the same chain that are still in memory, so they end up in one experiment.
+    """
+    id = id if id is not None else uuid.uuid4().hex
+
+    with _EXPERIMENT_REFS_LOCK:
+        ref = _EXPERIMENT_REFS.get(id)
+        if ref is None:
+            ref = ExperimentRef(id)
+            _EXPERIMENT_REFS[id] = ref
+            if len(_EXPERIMENT_REFS) > _EXPERIMENT_REFS_MAX_SIZE:
+                _EXPERIMENT_REFS.popitem(last=False)
+        else:
+            _EXPERIMENT_REFS.move_to_end(id)
+
+        return ref
+
+
+@dataclasses.dataclass
+class TraceMessage:
+    """
+    Everything that is needed to log a prompt or a chain to Comet.
+    Built in the caller's thread, sent either right away or by
+    the background uploader.
+    """
+
+    experiment_info: "ExperimentInfo"
+    trace_data: Dict[str, JSONEncodable]
+    category: str
+    tags: Optional[List[str]] = None
+    metrics: Dict[str, JSONEncodable] = dataclasses.field(default_factory=dict)
+    parameters: Dict[str, JSONEncodable] = dataclasses.field(default_factory=dict)
+    others: Dict[str, JSONEncodable] = dataclasses.field(default_factory=dict)
+    experiment_ref: Optional[ExperimentRef] = None
+    segment_index: Optional[int] = None
+
+    @property
+    def asset_name(self) -> str:
+        if self.segment_index is None:
+            return ASSET_NAME
+
+        return SEGMENT_ASSET_NAME % self.segment_index
+
+    @property
+    def asset_type(self) -> str:
+        return ASSET_TYPE if self.segment_index is None else SEGMENT_ASSET_TYPE
+
+
+def with_experiment_ref(message: TraceMessage) -> TraceMessage:
+    """
+    Returns the message with an ExperimentRef of its own if it has none.
+    The ref records the key of the experiment once it's created, so if a
+    later request fails and the message is spooled, the replay logs to
+    that experiment instead of creating a second, partial one.
+    """
+    if message.experiment_ref is not None:
+        return message
+
+    return dataclasses.replace(message, experiment_ref=experiment_ref())
+
+
+def snapshot(message: TraceMessage) -> TraceMessage:
+    """
+    Returns a copy of the message that shares no mutable data with the
+    caller, so the changes made to the inputs, outputs or metadata after
+    the message is queued don't end up in the trace. The span objects of
+    "chain_nodes" are replaced with snapshots of their fields, they are
+    converted to dictionaries when the message is serialized, by the
+    uploader thread.
+    """
+    trace_data = {
+        key: (
+            [_node_snapshot(node) for node in value]
+            if key == "chain_nodes"
+            else _copy(value)
+        )
+        for key, value in message.trace_data.items()
+    }
+
+    return dataclasses.replace(
+        message,
+        trace_data=trace_data,
+        tags=_copy(message.tags),
+        metrics=_copy(message.metrics),
+        parameters=_copy(message.parameters),
+        others=_copy(message.others),
+    )
+
+
+def _node_snapshot(node: Any) -> Any:
+    if hasattr(node, "__api__snapshot__"):
+        return node.__api__snapshot__()
+
+    return _copy(node)
+
+
+def _copy(value: Any) -> Any:
+    """
+    Copies the containers of JSON-encodable data, the scalars are immutable.
+    """
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_copy(item) for item in value]
+
+    return value
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+# *******************************************************
+#   ____                     _               _
+#  / ___|___  _ __ ___   ___| |_   _ __ ___ | |
+# | |   / _ \| '_ ` _ \ / _ \ __| | '_ ` _ \| |
+# | |__| (_) | | | | | |  __/ |_ _| | | | | | |
+#  \____\___/|_| |_| |_|\___|\__(_)_| |_| |_|_|
+#
+#  Sign up for free at https://www.comet.com
+#  Copyright (C) 2015-2023 Comet ML INC
+#  This source code is licensed under the MIT license found in the
+#  LICENSE file in the root directory of this package.
+# *******************************************************
+
+
+import dataclasses
+import hashlib
+import json
+import math
+from typing import Any, Dict, List, Tuple
+
+from .. import config
+
+TRACE_FIELDS = ("chain_inputs", "chain_outputs", "metadata")
+NODE_FIELDS = ("inputs", "outputs", "metadata")
+
+TRUNCATION_MARKER = "...[truncated]"
+VECTOR_MIN_LENGTH = 32
+MAX_REPORTED_FIELDS = 100
+
+
+@dataclasses.dataclass(frozen=True)
+class PayloadLimits:
+    """
+    Sizes are the lengths of the JSON encoding, in characters, 0 means
+    no limit. The trace limit only counts the fields that can be
+    truncated, i.e. inputs, outputs and metadata.
+    """
+
+    field_max_size: int = 0
+    trace_max_size: int = 0
+    string_policy: str = "truncate"
+    drop_vectors: bool = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.field_max_size > 0 or self.trace_max_size > 0 or self.drop_vectors
+
+
+def from_config() -> PayloadLimits:
+    return PayloadLimits(
+        field_max_size=config.payload_field_max_size(),
+        trace_max_size=config.payload_trace_max_size(),
+        string_policy=config.payload_string_policy(),
+        drop_vectors=config.payload_drop_vectors(),
+    )
+
+
+class Truncator:
+    """
+    Fits the inputs, outputs and metadata of one trace into the limits.
+    Values are walked without being encoded, containers are rebuilt only
+    if something inside them was cut, and strings are cut by slicing, so
+    an oversized value is never copied as a whole.
+
+    Every cut is recorded with the path of the value, the policy and the
+    original length (characters of a string, items of a container).
+    """
+
+    def __init__(self, limits: PayloadLimits) -> None:
+        self._limits = limits
+        self._field_max_size = limits.field_max_size or math.inf
+        self._trace_remaining = limits.trace_max_size or math.inf
+        self._truncated: List[Dict[str, Any]] = []
+        self._truncated_count = 0
+
+    @property
+    def truncated_count(self) -> int:
+        return self._truncated_count
+
+    def report(self) -> List[Dict[str, Any]]:
+        return self._truncated
+
+    def limit_field(self, path: str, value: Any) -> Any:
+        budget = min(self._field_max_size, self._trace_remaining)
+        result, size = self._limit(value, budget, path)
+        self._trace_remaining = max(self._trace_remaining - size, 0)
+
+        return result
+
+    def limit_node(self, index: int, node: Dict[str, Any]) -> Dict[str, Any]:
+        result = node
+        for field in NODE_FIELDS:
+            if field not in node:
+                continue
+
+            value = node[field]
+            limited = self.limit_field(f"chain_nodes[{index}].{field}", value)
+            if limited is not value:
+                if result is node:
+                    result = dict(node)
+                result[field] = limited
+
+        return result
+
+    def _limit(self, value: Any, budget: float, path: str) -> Tuple[Any, int]:
+        if isinstance(value, str):
+            return self._limit_string(value, budget, path)
+        if isinstance(value, dict):
+            return self._limit_dict(value, budget, path)
+        if isinstance(value, (list, tuple)):
+            return self._limit_list(value, budget, path)
+
+        try:
+            return value, len(json.dumps(value))
+        except (TypeError, ValueError):
+            # Not JSON encodable, the encoder will report it
+            return value, 0
+
+    def _limit_string(self, value: str, budget: float, path: str) -> Tuple[Any, int]:
+        size = len(value) + 2
+        if size <= budget:
+            return value, size
+
+        policy = self._limits.string_policy
+        keep = max(int(budget) - 2 - len(TRUNCATION_MARKER), 0)
+        result: Any
+        if policy == "hash":
+            result = {
+                "sha256": hashlib.sha256(value.encode("utf-8")).hexdigest(),
+                "length": len(value),
+            }
+            result_size = len(json.dumps(result))
+        elif policy == "head_tail":
+            tail = keep // 2
+            result = (
+                value[: keep - tail] + TRUNCATION_MARKER + value[len(value) - tail :]
+            )
+            result_size = len(result) + 2
+        else:
+            policy = "truncate"
+            result = value[:keep] + TRUNCATION_MARKER
+            result_size = len(result) + 2
+
+        self._record(path, policy, len(value))
+        return result, result_size
+
+    def _limit_list(self, value: Any, budget: float, path: str) -> Tuple[Any, int]:
+        if self._limits.drop_vectors and _is_vector(value):
+            self._record(path, "drop_vector", len(value))
+            result = {"dropped_vector_length": len(value)}
+            return result, len(json.dumps(result))
+
+        items: List[Any] = []
+        size = 2
+        changed = False
+        for index, item in enumerate(value):
+            if size >= budget:
+                items.append(f"[{len(value) - index} more items truncated]")
+                self._record(path, "drop_items", len(value))
+                changed = True
+                break
+
+            limited, item_size = self._limit(item, budget - size, f"{path}[{index}]")
+            changed = changed or limited is not item
+            items.append(limited)
+            size += item_size + 2
+
+        return (items if changed else value), size
+
+    def _limit_dict(self, value: Dict, budget: float, path: str) -> Tuple[Any, int]:
+        result: Dict[Any, Any] = {}
+        size = 2
+        changed = False
+        for index, (key, item) in enumerate(value.items()):
+            key_size = len(str(key)) + 4
+            if size + key_size >= budget:
+                result["..."] = f"[{len(value) - index} more keys truncated]"
+                self._record(path, "drop_keys", len(value))
+                changed = True
+                break
+
+            size += key_size
+            limited, item_size = self._limit(item, budget - size, f"{path}.{key}")
+            changed = changed or limited is not item
+            result[key] = limited
+            size += item_size + 2
+
+        return (result if changed else value), size
+
+    def _record(self, path: str, policy: str, original_size: int) -> None:
+        self._truncated_count += 1
+        if len(self._truncated) < MAX_REPORTED_FIELDS:
+            self._truncated.append(
+                {"path": path, "policy": policy, "original_size": original_size}
+            )
+
+
+def _is_vector(value: Any) -> bool:
+    if len(value) < VECTOR_MIN_LENGTH:
+        return False
+
+    return all(
+        isinstance(item, (int, float)) and not isinstance(item, bool) for item in value
+    )
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+# *******************************************************
+#   ____                     _               _
+#  / ___|___  _ __ ___   ___| |_   _ __ ___ | |
+# | |   / _ \| '_ ` _ \ / _ \ __| | '_ ` _ \| |
+# | |__| (_) | | | | | |  __/ |_ _| | | | | | |
+#  \____\___/|_| |_| |_|\___|\__(_)_| |_| |_|_|
+#
+#  Sign up for free at https://www.comet.com
+#  Copyright (C) 2015-2023 Comet ML INC
+#  This source code is licensed under the MIT license found in the
+#  LICENSE file in the root directory of this package.
+# *******************************************************
+
+
+import contextlib
+import logging
+import os
+import threading
+from typing import Callable, Optional
+
+from .. import app, exceptions
+from . import messages, spool
+
+LOGGER = logging.getLogger(__name__)
+
+
+class Replayer:
+    """
+    Sends the spooled traces from a daemon thread. Runs right after start,
+    then every interval seconds or earlier if woken up, e.g. when a trace
+    was sent successfully which means that connectivity is back.
+    """
+
+    def __init__(
+        self,
+        spool_: spool.Spool,
+        send: Callable[[messages.TraceMessage], object],
+        interval: float,
+    ) -> None:
+        self._spool = spool_
+        self._send = send
+        self._interval = interval
+        self._wake_up = threading.Event()
+        self._stopped = False
+        # Spooled data may be left by the previous processes
+        self._pending = True
+
+    @property
+    def spool(self) -> spool.Spool:
+        return self._spool
+
+    def start(self) -> None:
+        thread = threading.Thread(
+            target=self._run, name="comet-llm-spool-replayer", daemon=True
+        )
+        thread.start()
+
+    def wake_up(self) -> None:
+        if self._pending:
+            self._wake_up.set()
+
+    def notify_spooled(self) -> None:
+        self._pending = True
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._wake_up.set()
+
+    def replay(self) -> None:
+        self._spool.seal()
+
+        for path in self._spool.claim_segments():
+            if self._stopped:
+                self._spool.release(path, 0)
+                return
+
+            if not self._replay_segment(path):
+                return
+
+        self._pending = False
+
+    def _run(self) -> None:
+        while not self._stopped:
+            try:
+                self.replay()
+            except Exception:
+                LOGGER.debug("Failed to replay spooled data", exc_info=True)
+
+            self._wake_up.wait(self._interval)
+            self._wake_up.clear()
+
+    def _replay_segment(self, path: str) -> bool:
+        unsent_offset = self._send_segment(path)
+        if unsent_offset is not None:
+            self._spool.release(path, unsent_offset)
+            return False
+
+        os.remove(path)
+        return True
+
+    def _send_segment(self, path: str) -> Optional[int]:
+        """
+        Returns: the offset of the first record that was not sent because
+            the backend is unavailable, None if all the records were processed.
+        """
+        with contextlib.closing(spool.read_segment(path)) as records:
+            for offset, message in records:
+                try:
+                    self._send(message)
+                except exceptions.BackendUnavailableException:
+                    return offset
+                except Exception:
+                    LOGGER.debug("Spooled data was dropped", exc_info=True)
+                    app.SUMMARY.increment_failed()
+
+                # Keeps the segment from being considered abandoned
+                os.utime(path)
+
+        return None
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+# *******************************************************
+#   ____                     _               _
+#  / ___|___  _ __ ___   ___| |_   _ __ ___ | |
+# | |   / _ \| '_ ` _ \ / _ \ __| | '_ ` _ \| |
+# | |__| (_) | | | | | |  __/ |_ _| | | | | | |
+#  \____\___/|_| |_| |_|\___|\__(_)_| |_| |_|_|
+#
+#  Sign up for free at https://www.comet.com
+#  Copyright (C) 2015-2023 Comet ML INC
+#  This source code is licensed under the MIT license found in the
+#  LICENSE file in the root directory of this package.
+# *******************************************************
+
+
+import concurrent.futures
+import functools
+import threading
+from typing import Any, Callable, List, Optional
+
+from .. import app, config, experiment_api, llm_result
+from . import dedup, messages, payload_limits, serialization
+
+_EXECUTOR: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def send(message: messages.TraceMessage) -> llm_result.LLMResult:
+    experiment_api_ = _get_experiment_api(message)
+
+    dedup_options = dedup.from_config(experiment_api_.id)
+    chunks = trace_chunks(message, dedup_options)
+    writes = experiment_writes(experiment_api_, message, chunks)
+    if config.experiment_writes_max_workers() > 1:
+        _write_concurrently(writes)
+    else:
+        for write in writes:
+            write()
+
+    remember_stored_blobs(dedup_options, experiment_api_, message, chunks)
+
+    if message.segment_index is None:
+        app.SUMMARY.add_log(experiment_api_.project_url, message.category)
+
+    return llm_result.LLMResult(
+        id=experiment_api_.id, project_url=experiment_api_.project_url
+    )
+
+
+def _get_experiment_api(
+    message: messages.TraceMessage,
+) -> Any:
+    experiment_info_ = message.experiment_info
+    ref = message.experiment_ref
+    if ref is None:
+        return experiment_api.ExperimentAPI.create_new(
+            api_key=experiment_info_.api_key,
+            workspace=experiment_info_.workspace,
+            project_name=experiment_info_.project_name,
+        )
+
+    with ref.lock:
+        if ref.experiment_key is None:
+            experiment_api_ = experiment_api.ExperimentAPI.create_new(
+                api_key=experiment_info_.api_key,
+                workspace=experiment_info_.workspace,
+                project_name=experiment_info_.project_name,
+            )
+            ref.experiment_key = experiment_api_.id
+            ref.workspace = experiment_api_.workspace
+            ref.project_name = experiment_api_.project_name
+            return experiment_api_
+
+    return experiment_api.ExperimentAPI.from_existing_id(
+        ref.experiment_key,
+        api_key=experiment_info_.api_key,  # type: ignore
+        load_metadata=False,
+        workspace=ref.workspace,
+        project_name=ref.project_name,
+    )
+
+
+def trace_chunks(
+    message: messages.TraceMessage, dedup_options: Optional[dedup.DedupOptions]
+) -> serialization.TraceChunks:
+    return serialization.TraceChunks(
+        message.trace_data,
+        limits=payload_limits.from_config(),
+        dedup=dedup_options,
+    )
+
+
+def remember_stored_blobs(
+    dedup_options: Optional[dedup.DedupOptions],
+    experiment_api_: experiment_api.ExperimentAPI,
+    message: messages.TraceMessage,
+    chunks: serialization.TraceChunks,
+) -> None:
+    """
+    Called once all the writes succeeded, so the following traces only
+    reference strings that were really uploaded.
+    """
+    if dedup_options is None or dedup_options.known_blobs is None:
+        return
+
+    dedup_options.known_blobs.add(
+        chunks.stored_blobs,
+        dedup.BlobLocation(
+            experiment_key=experiment_api_.id, asset_name=message.asset_name
+        ),
+    )
+
+
+def experiment_writes(
+    experiment_api_: experiment_api.ExperimentAPI,
+    message: messages.TraceMessage,
+    chunks: serialization.TraceChunks,
+) -> List[Callable[[], Any]]:
+    """
+    Requests that log the message data to the created experiment. They are
+    independent of each other, so they can be sent in any order. For
+    AsyncExperimentAPI calling them returns coroutines.
+    """
+    writes: List[Callable[[], Any]] = []
+
+    if message.tags is not None:
+        writes.append(functools.partial(experiment_api_.log_tags, message.tags))
+
+    writes.append(
+        functools.partial(
+            experiment_api_.log_asset_with_stream,
+            name=message.asset_name,
+            chunks=chunks,
+            asset_type=message.asset_type,
+        )
+    )
+
+    for name, value in message.metrics.items():
+        writes.append(
+            functools.partial(experiment_api_.log_metric, name=name, value=value)
+        )
+
+    if len(message.parameters) > 0:
+        writes.append(
+            functools.partial(experiment_api_.log_parameters, message.parameters)
+        )
+
+    for name, value in message.others.items():
+        writes.append(functools.partial(experiment_api_.log_other, name, value))
+
+    return writes
+
+
+def _write_concurrently(writes: List[Callable[[], Any]]) -> None:
+    futures = [_get_executor().submit(write) for write in writes]
+    concurrent.futures.wait(futures)
+
+    for future in futures:
+        # Raises the exception of the first failed write
+        future.result()
+
+
+def _get_executor() -> concurrent.futures.ThreadPoolExecutor:
+    global _EXECUTOR
+
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+                max_workers=config.experiment_writes_max_workers(),
+                thread_name_prefix="comet-llm-writer",
+            )
+
+        return _EXECUTOR
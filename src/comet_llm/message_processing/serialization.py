@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+# *******************************************************
+#   ____                     _               _
+#  / ___|___  _ __ ___   ___| |_   _ __ ___ | |
+# | |   / _ \| '_ ` _ \ / _ \ __| | '_ ` _ \| |
+# | |__| (_) | | | | | |  __/ |_ _| | | | | | |
+#  \____\___/|_| |_| |_|\___|\__(_)_| |_| |_|_|
+#
+#  Sign up for free at https://www.comet.com
+#  Copyright (C) 2015-2023 Comet ML INC
+#  This source code is licensed under the MIT license found in the
+#  LICENSE file in the root directory of this package.
+# *******************************************************
+
+
+import json
+from typing import Any, Dict, Iterator, List, Optional
+
+from .. import experiment_info
+from . import dedup, messages, payload_limits
+
+CHUNK_SIZE = 64 * 1024
+
+
+class TraceChunks:
+    """
+    Re-iterable JSON representation of the trace data, encoded to utf-8 and
+    split into chunks of about CHUNK_SIZE bytes.
+
+    The "chain_nodes" list may contain span objects, every node is converted
+    to a dictionary and encoded only when the iteration reaches it, so the
+    whole JSON document is never kept in memory. The produced JSON is
+    identical to json.dumps(trace_data) with the nodes converted.
+
+    If limits are passed, the inputs, outputs and metadata are cut to fit
+    them while they are encoded, and the cuts are listed in the
+    "truncated_fields" key. If dedup options are passed, their long strings
+    are then replaced with references to the "blobs" key, see
+    dedup.Deduplicator.
+    """
+
+    def __init__(
+        self,
+        trace_data: Dict[str, Any],
+        limits: Optional[payload_limits.PayloadLimits] = None,
+        dedup: Optional[dedup.DedupOptions] = None,
+    ) -> None:
+        self._trace_data = trace_data
+        self._limits = limits
+        self._dedup = dedup
+        self._stored_blobs: List[str] = []
+
+    @property
+    def stored_blobs(self) -> List[str]:
+        """
+        Hashes of the blobs written by the last complete iteration.
+        """
+        return self._stored_blobs
+
+    def __iter__(self) -> Iterator[bytes]:
+        truncator = None
+        if self._limits is not None and self._limits.enabled:
+            truncator = payload_limits.Truncator(self._limits)
+
+        deduplicator = None
+        if self._dedup is not None:
+            deduplicator = dedup.Deduplicator(self._dedup)
+
+        buffer = []
+        size = 0
+
+        for piece in _iter_pieces(self._trace_data, truncator, deduplicator):
+            buffer.append(piece)
+            size += len(piece)
+            if size >= CHUNK_SIZE:
+                yield "".join(buffer).encode("utf-8")
+                buffer = []
+                size = 0
+
+        if len(buffer) > 0:
+            yield "".join(buffer).encode("utf-8")
+
+        if deduplicator is not None:
+            self._stored_blobs = list(deduplicator.blobs)
+
+
+def iter_message_record(message: messages.TraceMessage) -> Iterator[bytes]:
+    """
+    Encodes the message into a single line of JSON, the trace data is
+    encoded incrementally the same way as by TraceChunks.
+    """
+    header = {
+        "experiment_info": {
+            "api_key": message.experiment_info.api_key,
+            "workspace": message.experiment_info.workspace,
+            "project_name": message.experiment_info.project_name,
+        },
+        "category": message.category,
+        "tags": message.tags,
+        "metrics": message.metrics,
+        "parameters": message.parameters,
+        "others": message.others,
+        "experiment_ref": _experiment_ref_dict(message.experiment_ref),
+        "segment_index": message.segment_index,
+    }
+    # json.dumps escapes line breaks inside strings, so the record stays one line
+    yield json.dumps(header)[:-1].encode("utf-8") + b', "trace_data": '
+    yield from TraceChunks(message.trace_data)
+    yield b"}\n"
+
+
+def load_message_record(record: bytes) -> messages.TraceMessage:
+    data = json.loads(record)
+
+    return messages.TraceMessage(
+        experiment_info=experiment_info.ExperimentInfo(**data["experiment_info"]),
+        trace_data=data["trace_data"],
+        category=data["category"],
+        tags=data["tags"],
+        metrics=data["metrics"],
+        parameters=data["parameters"],
+        others=data["others"],
+        experiment_ref=_load_experiment_ref(data.get("experiment_ref")),
+        segment_index=data.get("segment_index"),
+    )
+
+
+def _experiment_ref_dict(
+    ref: Optional[messages.ExperimentRef],
+) -> Optional[Dict[str, Any]]:
+    if ref is None:
+        return None
+
+    return {
+        "id": ref.id,
+        "experiment_key": ref.experiment_key,
+        "workspace": ref.workspace,
+        "project_name": ref.project_name,
+    }
+
+
+def _load_experiment_ref(
+    data: Optional[Dict[str, Any]]
+) -> Optional[messages.ExperimentRef]:
+    if data is None:
+        return None
+
+    ref = messages.experiment_ref(data["id"])
+    with ref.lock:
+        if ref.experiment_key is None and data["experiment_key"] is not None:
+            ref.experiment_key = data["experiment_key"]
+            ref.workspace = data["workspace"]
+            ref.project_name = data["project_name"]
+
+    return ref
+
+
+def _iter_pieces(
+    trace_data: Dict[str, Any],
+    truncator: Optional[payload_limits.Truncator] = None,
+    deduplicator: Optional[dedup.Deduplicator] = None,
+) -> Iterator[str]:
+    limited_fields = {}
+    if truncator is not None or deduplicator is not None:
+        # The chain level fields are limited first, so the budget of the
+        # trace is not used up by the nodes before them
+        for key in payload_limits.TRACE_FIELDS:
+            if key not in trace_data:
+                continue
+
+            value = trace_data[key]
+            if truncator is not None:
+                value = truncator.limit_field(key, value)
+            if deduplicator is not None:
+                value = deduplicator.replace_field(value)
+            limited_fields[key] = value
+
+    yield "{"
+    for i, (key, value) in enumerate(trace_data.items()):
+        if i > 0:
+            yield ", "
+        yield json.dumps(key)
+        yield ": "
+
+        if key == "chain_nodes":
+            yield from _iter_nodes(value, truncator, deduplicator)
+        else:
+            yield json.dumps(limited_fields.get(key, value))
+
+    if truncator is not None and truncator.truncated_count > 0:
+        yield ', "truncated_fields": '
+        yield json.dumps(truncator.report())
+        yield ', "truncated_fields_count": '
+        yield json.dumps(truncator.truncated_count)
+    if deduplicator is not None and len(deduplicator.blobs) > 0:
+        yield f', "{dedup.BLOBS_KEY}": '
+        yield json.dumps(deduplicator.blobs)
+    yield "}"
+
+
+def _iter_nodes(
+    nodes: Any,
+    truncator: Optional[payload_limits.Truncator] = None,
+    deduplicator: Optional[dedup.Deduplicator] = None,
+) -> Iterator[str]:
+    yield "["
+    for i, node in enumerate(nodes):
+        if i > 0:
+            yield ", "
+
+        node_dict = _node_dict(node)
+        if truncator is not None and isinstance(node_dict, dict):
+            node_dict = truncator.limit_node(i, node_dict)
+        if deduplicator is not None and isinstance(node_dict, dict):
+            node_dict = deduplicator.replace_node(node_dict)
+        yield json.dumps(node_dict)
+    yield "]"
+
+
+def _node_dict(node: Any) -> Any:
+    return node.as_dict() if hasattr(node, "as_dict") else node
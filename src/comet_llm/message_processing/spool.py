@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+# *******************************************************
+#   ____                     _               _
+#  / ___|___  _ __ ___   ___| |_   _ __ ___ | |
+# | |   / _ \| '_ ` _ \ / _ \ __| | '_ ` _ \| |
+# | |__| (_) | | | | | |  __/ |_ _| | | | | | |
+#  \____\___/|_| |_| |_|\___|\__(_)_| |_| |_|_|
+#
+#  Sign up for free at https://www.comet.com
+#  Copyright (C) 2015-2023 Comet ML INC
+#  This source code is licensed under the MIT license found in the
+#  LICENSE file in the root directory of this package.
+# *******************************************************
+
+
+import dataclasses
+import logging
+import os
+import shutil
+import threading
+import time
+from typing import IO, Dict, Generator, Iterator, List, Optional, Tuple
+
+from .. import config, logging_messages
+from . import messages, serialization
+
+LOGGER = logging.getLogger(__name__)
+
+OPEN_SUFFIX = ".open"
+SEALED_SUFFIX = ".jsonl"
+CLAIMED_SUFFIX = ".replaying"
+
+# Segments are sealed by their writer at least every replay interval, so an
+# open (or claimed) segment that wasn't touched for this many intervals
+# belongs to a process that has died.
+ABANDONED_SEGMENT_INTERVALS = 3
+
+
+class Spool:
+    """
+    Write-ahead spool for the traces that could not be sent.
+
+    Every trace is appended as one JSON line to the current segment file.
+    Segments are named after their creation time, so sorting the names
+    orders them from the oldest to the newest. A segment is "open" while
+    this process writes to it, "sealed" when it's ready to be replayed and
+    "claimed" while a replayer is sending it. Renames between these states
+    are atomic, so several processes can share the directory.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_size: int,
+        max_size: int,
+        fsync: str,
+        eviction: str,
+        abandoned_after: float,
+    ) -> None:
+        self._directory = directory
+        self._segment_size = segment_size
+        self._max_size = max_size
+        self._fsync = fsync
+        self._eviction = eviction
+        self._abandoned_after = abandoned_after
+
+        self._lock = threading.Lock()
+        self._file: Optional[IO[bytes]] = None
+        self._file_path: Optional[str] = None
+        self._segments_created = 0
+        # Running total of the segment sizes, None until the directory is
+        # scanned. Replays and other processes only change it between seals.
+        self._size: Optional[int] = None
+
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    def write(self, message: messages.TraceMessage) -> bool:
+        """
+        Appends the message to the current segment.
+
+        Returns: False if the message was dropped because the spool
+            is full and the eviction policy keeps the older data.
+        """
+        message = _without_default_api_key(message)
+
+        with self._lock:
+            file = self._current_file()
+            start = file.tell()
+
+            for chunk in serialization.iter_message_record(message):
+                file.write(chunk)
+            file.flush()
+
+            if self._fsync == "always":
+                os.fsync(file.fileno())
+
+            written = file.tell() - start
+            if not self._enforce_quota(written):
+                file.truncate(start)
+                file.seek(start)
+                if self._size is not None:
+                    self._size -= written
+                return False
+
+            if file.tell() >= self._segment_size:
+                self._seal()
+
+        return True
+
+    def seal(self) -> None:
+        """
+        Makes the current segment available for replaying.
+        """
+        with self._lock:
+            self._seal()
+
+    def claim_segments(self) -> Iterator[str]:
+        """
+        Yields the paths of the segments to replay from the oldest one.
+        Every segment is claimed right before it is yielded.
+        The claimed segment must be removed or released.
+        """
+        for name in self._segment_names():
+            path = os.path.join(self._directory, name)
+            if not name.endswith(SEALED_SUFFIX) and not self._abandoned(path):
+                continue
+
+            claimed_path = _base_path(path) + CLAIMED_SUFFIX
+            try:
+                os.rename(path, claimed_path)
+            except OSError:
+                # Claimed by another process
+                continue
+
+            yield claimed_path
+
+    def release(self, claimed_path: str, offset: int) -> None:
+        """
+        Returns the part of the claimed segment starting at offset
+        back to the spool.
+        """
+        sealed_path = _base_path(claimed_path) + SEALED_SUFFIX
+
+        if offset == 0:
+            os.rename(claimed_path, sealed_path)
+            return
+
+        with open(claimed_path, "rb") as source, _open_new(sealed_path) as target:
+            source.seek(offset)
+            shutil.copyfileobj(source, target)
+        os.remove(claimed_path)
+
+    def _current_file(self) -> IO[bytes]:
+        if self._file is None:
+            name = "%020d-%d-%d%s" % (
+                time.time() * 1e6,
+                os.getpid(),
+                self._segments_created,
+                OPEN_SUFFIX,
+            )
+            self._segments_created += 1
+            self._file_path = os.path.join(self._directory, name)
+            self._file = _open_new(self._file_path)
+
+        return self._file
+
+    def _seal(self) -> None:
+        if self._file is None or self._file_path is None:
+            return
+
+        file, path = self._file, self._file_path
+        self._file = self._file_path = None
+        # Rescanned on the next write, the replays and the other processes
+        # may have changed the directory in the meantime.
+        self._size = None
+
+        empty = file.tell() == 0
+        if self._fsync != "never" and not empty:
+            os.fsync(file.fileno())
+        file.close()
+
+        if empty:
+            os.remove(path)
+        else:
+            os.rename(path, _base_path(path) + SEALED_SUFFIX)
+
+    def _enforce_quota(self, written: int) -> bool:
+        """
+        Keeps a running total of the spool size, the directory is scanned
+        only if it's not known yet or if it goes over the quota.
+        """
+        if self._size is not None:
+            self._size += written
+            if self._size <= self._max_size:
+                return True
+
+        sizes = self._segment_sizes()
+        total = sum(sizes.values())
+        self._size = total
+        if total <= self._max_size:
+            return True
+
+        if self._eviction == "newest":
+            LOGGER.warning(
+                logging_messages.SPOOL_QUOTA_EXCEEDED,
+                self._directory,
+                "new data is dropped",
+            )
+            return False
+
+        LOGGER.warning(
+            logging_messages.SPOOL_QUOTA_EXCEEDED,
+            self._directory,
+            "the oldest data is dropped",
+        )
+        for name in sorted(sizes):
+            if total <= self._max_size:
+                break
+            if not name.endswith(SEALED_SUFFIX):
+                continue
+            try:
+                os.remove(os.path.join(self._directory, name))
+            except OSError:
+                # Claimed by a replayer in the meantime
+                continue
+            total -= sizes[name]
+
+        self._size = total
+        return total <= self._max_size
+
+    def _segment_names(self) -> List[str]:
+        return sorted(
+            name
+            for name in os.listdir(self._directory)
+            if name.endswith((OPEN_SUFFIX, SEALED_SUFFIX, CLAIMED_SUFFIX))
+        )
+
+    def _segment_sizes(self) -> Dict[str, int]:
+        sizes = {}
+        for entry in os.scandir(self._directory):
+            if entry.name.endswith((OPEN_SUFFIX, SEALED_SUFFIX, CLAIMED_SUFFIX)):
+                try:
+                    sizes[entry.name] = entry.stat().st_size
+                except OSError:
+                    continue
+
+        return sizes
+
+    def _abandoned(self, path: str) -> bool:
+        if path == self._file_path:
+            return False
+
+        try:
+            return time.time() - os.path.getmtime(path) > self._abandoned_after
+        except OSError:
+            return False
+
+
+def read_segment(path: str) -> Generator[Tuple[int, messages.TraceMessage], None, None]:
+    """
+    Yields (offset, message) for every record of the segment. Offset points
+    to the beginning of the record. Damaged records, e.g. the last one of a
+    process that crashed while writing, are skipped.
+    """
+    with open(path, "rb") as file:
+        offset = 0
+        for line in file:
+            try:
+                message = serialization.load_message_record(line)
+            except ValueError:
+                LOGGER.debug("Damaged record in %s was skipped", path)
+            else:
+                if message.experiment_info.api_key is None:
+                    message.experiment_info.api_key = config.api_key()
+                yield offset, message
+            offset += len(line)
+
+
+def _without_default_api_key(message: messages.TraceMessage) -> messages.TraceMessage:
+    """
+    The configured API key is not written to disk, it's picked up from the
+    configuration again when the trace is replayed.
+    """
+    if message.experiment_info.api_key != config.api_key():
+        return message
+
+    return dataclasses.replace(
+        message,
+        experiment_info=dataclasses.replace(message.experiment_info, api_key=None),
+    )
+
+
+def _base_path(path: str) -> str:
+    return os.path.splitext(path)[0]
+
+
+def _open_new(path: str) -> IO[bytes]:
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+    return os.fdopen(fd, "ab")
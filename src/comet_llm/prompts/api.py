@@ -12,8 +12,6 @@
 #  LICENSE file in the root directory of this package.
 # *******************************************************
 
-import io
-import json
 from typing import Dict, List, Optional, Union
 
 import comet_llm.convert
@@ -22,10 +20,11 @@ from .. import (
     app,
     config,
     exceptions,
-    experiment_api,
     experiment_info,
     llm_result,
     logging_messages,
+    message_processing,
+    sampling,
 )
 from ..chains import version
 from . import convert, preprocess
@@ -46,7 +45,8 @@ def log_prompt(
     metadata: Optional[Dict[str, Union[str, bool, float, None]]] = None,
     timestamp: Optional[float] = None,
     duration: Optional[float] = None,
-) -> llm_result.LLMResult:
+    sampled: Optional[bool] = None,
+) -> Optional[llm_result.LLMResult]:
     """
     Logs a single prompt and output to Comet platform.
 
@@ -64,6 +64,8 @@ def log_prompt(
             dictionary with additional metadata to the call.
         timestamp: float (optional) timestamp of prompt call in seconds
         duration: float (optional) duration of prompt call
+        sampled: bool (optional) True logs the prompt, False skips it,
+            regardless of the sampling configuration.
 
     Example:
 
@@ -89,9 +91,49 @@ def log_prompt(
 
     ```
 
-    Returns: LLMResult.
+    Returns: LLMResult, or None if asynchronous logging is enabled
+        or the prompt was not sampled.
     """
+    if not sampling.head_sampled(sampled):
+        sampling.sampled_out("prompt")
+        return None
 
+    message = build_message(
+        prompt=prompt,
+        output=output,
+        workspace=workspace,
+        project=project,
+        tags=tags,
+        api_key=api_key,
+        prompt_template=prompt_template,
+        prompt_template_variables=prompt_template_variables,
+        metadata=metadata,
+        timestamp=timestamp,
+        duration=duration,
+    )
+
+    if not sampling.tail_sampled(message.trace_data, sampled):
+        sampling.sampled_out("prompt")
+        return None
+
+    return message_processing.process(message)
+
+
+def build_message(
+    prompt: str,
+    output: str,
+    workspace: Optional[str] = None,
+    project: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    api_key: Optional[str] = None,
+    prompt_template: Optional[str] = None,
+    prompt_template_variables: Optional[
+        Dict[str, Union[str, bool, float, None]]
+    ] = None,
+    metadata: Optional[Dict[str, Union[str, bool, float, None]]] = None,
+    timestamp: Optional[float] = None,
+    duration: Optional[float] = None,
+) -> message_processing.TraceMessage:
     timestamp = preprocess.timestamp(timestamp)
 
     info = experiment_info.get(
@@ -101,10 +143,6 @@ def log_prompt(
         api_key_not_found_message=logging_messages.API_KEY_NOT_FOUND_MESSAGE
         % "log_prompt",
     )
-    experiment_api_ = experiment_api.ExperimentAPI.create_new(
-        api_key=info.api_key, workspace=info.workspace, project_name=info.project_name
-    )
-
     call_data = convert.call_data_to_dict(
         prompt=prompt,
         outputs=output,
@@ -132,25 +170,11 @@ def log_prompt(
         "chain_duration": duration,
     }
 
-    experiment_api_.log_asset_with_io(
-        name="comet_llm_data.json",
-        file=io.StringIO(json.dumps(asset_data)),
-        asset_type="llm_data",
-    )
-
-    if tags is not None:
-        experiment_api_.log_tags(tags)
-
-    if duration is not None:
-        experiment_api_.log_metric("chain_duration", duration)
-
-    parameters = comet_llm.convert.chain_metadata_to_flat_parameters(metadata)
-
-    for name, value in parameters.items():
-        experiment_api_.log_parameter(name, value)
-
-    app.SUMMARY.add_log(experiment_api_.project_url, "prompt")
-
-    return llm_result.LLMResult(
-        id=experiment_api_.id, project_url=experiment_api_.project_url
+    return message_processing.TraceMessage(
+        experiment_info=info,
+        trace_data=asset_data,
+        category="prompt",
+        tags=tags,
+        metrics={"chain_duration": duration} if duration is not None else {},
+        parameters=comet_llm.convert.chain_metadata_to_flat_parameters(metadata),
     )
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# *******************************************************
+#   ____                     _               _
+#  / ___|___  _ __ ___   ___| |_   _ __ ___ | |
+# | |   / _ \| '_ ` _ \ / _ \ __| | '_ ` _ \| |
+# | |__| (_) | | | | | |  __/ |_ _| | | | | | |
+#  \____\___/|_| |_| |_|\___|\__(_)_| |_| |_|_|
+#
+#  Sign up for free at https://www.comet.com
+#  Copyright (C) 2015-2023 Comet ML INC
+#  This source code is licensed under the MIT license found in the
+#  LICENSE file in the root directory of this package.
+# *******************************************************
+
+
+import logging
+import random
+from typing import Any, Dict, List, Optional
+
+from . import app, config
+
+LOGGER = logging.getLogger(__name__)
+
+ERROR_KEYS = ("error", "exception")
+
+
+def head_sampled(override: Optional[bool] = None) -> bool:
+    """
+    Decides whether a chain or prompt is recorded at all, when it starts.
+    Unsampled chains don't track their spans. override is the decision
+    passed by the user for this call.
+    """
+    if override is not None:
+        return override
+
+    return _sampled(config.sampling_head_rate())
+
+
+def tail_sampled(trace_data: Dict[str, Any], override: Optional[bool] = None) -> bool:
+    """
+    Decides whether a recorded chain or prompt is logged, when it ends.
+    Errors, i.e. traces with a non-empty "error" or "exception" key in the
+    outputs or metadata of the chain or of one of its spans, and traces
+    slower than the threshold are kept. The span outputs that are parsed
+    in the background are not checked.
+    """
+    if override is not None:
+        return override
+
+    rate = config.sampling_tail_rate()
+    if rate >= 1:
+        return True
+
+    if config.sampling_keep_errors() and _has_error(trace_data):
+        return True
+
+    slow_threshold = config.sampling_slow_threshold()
+    duration = trace_data.get("chain_duration")
+    if slow_threshold > 0 and duration is not None and duration >= slow_threshold:
+        return True
+
+    return _sampled(rate)
+
+
+def sampled_out(category: str) -> None:
+    app.SUMMARY.increment_sampled_out()
+    LOGGER.debug("The %s was not logged because of sampling", category)
+
+
+def _sampled(rate: float) -> bool:
+    if rate >= 1:
+        return True
+
+    return random.random() < rate
+
+
+def _has_error(trace_data: Dict[str, Any]) -> bool:
+    sections = [trace_data.get("chain_outputs"), trace_data.get("metadata")]
+    for node in trace_data.get("chain_nodes") or ():
+        sections.extend(_node_sections(node))
+
+    for values in sections:
+        if not isinstance(values, dict):
+            continue
+
+        if any(values.get(key) for key in ERROR_KEYS):
+            return True
+
+    return False
+
+
+def _node_sections(node: Any) -> List[Any]:
+    if hasattr(node, "__api__snapshot__"):
+        node = node.__api__snapshot__()
+    if isinstance(node, dict):
+        return [node.get("outputs"), node.get("metadata")]
+
+    return [getattr(node, "outputs", None), getattr(node, "metadata", None)]
@@ -24,6 +24,8 @@ class Summary:
     def __init__(self) -> None:
         self._logs_registry: DefaultDict[str, int] = collections.defaultdict(lambda: 0)
         self._failed = 0
+        self._spooled = 0
+        self._sampled_out = 0
         self._lock = threading.Lock()
 
     def add_log(self, project_url: str, name: str) -> None:
@@ -37,6 +39,14 @@ class Summary:
         with self._lock:
             self._failed += 1
 
+    def increment_spooled(self) -> None:
+        with self._lock:
+            self._spooled += 1
+
+    def increment_sampled_out(self) -> None:
+        with self._lock:
+            self._sampled_out += 1
+
     def print(self) -> None:
         for project, logs_amount in self._logs_registry.items():
             LOGGER.info("%d prompts and chains logged to %s", logs_amount, project)
@@ -45,3 +55,15 @@ class Summary:
             LOGGER.info(
                 "%d prompts and chains were not logged because of errors", self._failed
             )
+
+        if self._spooled > 0:
+            LOGGER.info(
+                "%d prompts and chains were saved to the spool and will be logged later",
+                self._spooled,
+            )
+
+        if self._sampled_out > 0:
+            LOGGER.info(
+                "%d prompts and chains were not logged because of sampling",
+                self._sampled_out,
+            )
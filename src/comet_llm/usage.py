@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+# *******************************************************
+#   ____                     _               _
+#  / ___|___  _ __ ___   ___| |_   _ __ ___ | |
+# | |   / _ \| '_ ` _ \ / _ \ __| | '_ ` _ \| |
+# | |__| (_) | | | | | |  __/ |_ _| | | | | | |
+#  \____\___/|_| |_| |_|\___|\__(_)_| |_| |_|_|
+#
+#  Sign up for free at https://www.comet.com
+#  Copyright (C) 2015-2023 Comet ML INC
+#  This source code is licensed under the MIT license found in the
+#  LICENSE file in the root directory of this package.
+# *******************************************************
+
+
+import dataclasses
+import json
+import logging
+import threading
+from typing import Any, Dict, Mapping, Optional
+
+from . import config
+from .types import JSONEncodable
+
+LOGGER = logging.getLogger(__name__)
+
+TOKEN_FIELDS = ("prompt_tokens", "completion_tokens", "total_tokens")
+
+
+@dataclasses.dataclass(frozen=True)
+class ModelPrice:
+    """
+    USD per million tokens.
+    """
+
+    prompt: float
+    completion: float
+
+
+@dataclasses.dataclass(frozen=True)
+class TokenUsage:
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+
+
+class PriceTable:
+    """
+    Prices of the models, a model without an exact entry gets the price
+    of the longest entry its name starts with, e.g. "gpt-4o-2024-05-13"
+    gets the price of "gpt-4o".
+    """
+
+    def __init__(self, prices: Mapping[str, ModelPrice]) -> None:
+        self._prices = dict(prices)
+        self._prefixes = sorted(self._prices, key=len, reverse=True)
+
+    @classmethod
+    def from_dict(cls, prices: Mapping[str, Mapping[str, float]]) -> "PriceTable":
+        return cls(
+            {
+                model: ModelPrice(
+                    prompt=float(price.get("prompt", 0)),
+                    completion=float(price.get("completion", 0)),
+                )
+                for model, price in prices.items()
+            }
+        )
+
+    def price(self, model: Optional[str]) -> Optional[ModelPrice]:
+        if model is None:
+            return None
+
+        price = self._prices.get(model)
+        if price is not None:
+            return price
+
+        for prefix in self._prefixes:
+            if model.startswith(prefix):
+                return self._prices[prefix]
+
+        return None
+
+    def cost(self, model: Optional[str], tokens: TokenUsage) -> Optional[float]:
+        price = self.price(model)
+        if price is None:
+            return None
+
+        return (
+            tokens.prompt_tokens * price.prompt
+            + tokens.completion_tokens * price.completion
+        ) / 1_000_000
+
+
+class Usage:
+    """
+    Running totals of the token usage and of its estimated cost, updated
+    every time a call with usage ends, so they are never recomputed from
+    the spans. The cost only includes the calls of the models with a price.
+    """
+
+    __slots__ = (
+        "calls",
+        "prompt_tokens",
+        "completion_tokens",
+        "total_tokens",
+        "cost",
+        "priced_calls",
+        "_lock",
+    )
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.total_tokens = 0
+        self.cost = 0.0
+        self.priced_calls = 0
+        self._lock = threading.Lock()
+
+    def add(self, tokens: TokenUsage, cost: Optional[float]) -> None:
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += tokens.prompt_tokens
+            self.completion_tokens += tokens.completion_tokens
+            self.total_tokens += tokens.total_tokens
+            if cost is not None:
+                self.cost += cost
+                self.priced_calls += 1
+
+    def as_dict(self) -> Dict[str, JSONEncodable]:
+        with self._lock:
+            result: Dict[str, JSONEncodable] = {
+                "calls": self.calls,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "total_tokens": self.total_tokens,
+            }
+            if self.priced_calls > 0:
+                result["cost"] = self.cost
+
+        return result
+
+    def as_metrics(self) -> Dict[str, JSONEncodable]:
+        """
+        Empty if no call with usage has ended.
+        """
+        if self.calls == 0:
+            return {}
+
+        usage = self.as_dict()
+        usage.pop("calls")
+
+        return {f"usage.{name}": value for name, value in usage.items()}
+
+
+class _ProcessCounters:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._total = Usage()
+        self._models: Dict[str, Usage] = {}
+
+    def add(
+        self, model: Optional[str], tokens: TokenUsage, cost: Optional[float]
+    ) -> None:
+        self._total.add(tokens, cost)
+
+        model = model if model is not None else "unknown"
+        with self._lock:
+            usage = self._models.get(model)
+            if usage is None:
+                usage = self._models[model] = Usage()
+
+        usage.add(tokens, cost)
+
+    def snapshot(self) -> Dict[str, JSONEncodable]:
+        with self._lock:
+            models = dict(self._models)
+
+        result = self._total.as_dict()
+        result["models"] = {model: usage.as_dict() for model, usage in models.items()}
+
+        return result
+
+
+_COUNTERS = _ProcessCounters()
+
+_PRICE_TABLE: Optional[PriceTable] = None
+_PRICE_TABLE_LOCK = threading.Lock()
+
+
+def usage_counters() -> Dict[str, JSONEncodable]:
+    """
+    Returns the token usage and estimated cost of all the LLM calls with
+    usage recorded in the spans of this process, in total and per model,
+    e.g. to be exported to a monitoring system. "cost" is only present
+    if at least one of the models has a price.
+    """
+    return _COUNTERS.snapshot()
+
+
+def set_model_prices(prices: Mapping[str, Mapping[str, float]]) -> None:
+    """
+    Sets the prices used to estimate the cost of the calls, replacing the
+    ones loaded from the comet.usage.prices_file configuration.
+
+    Args:
+        prices: Dict[str, Dict[str, float]] (required) the "prompt" and
+            "completion" prices of each model, in USD per million tokens,
+            e.g. {"gpt-4o": {"prompt": 2.5, "completion": 10.0}}.
+    """
+    global _PRICE_TABLE
+
+    table = PriceTable.from_dict(prices)
+    with _PRICE_TABLE_LOCK:
+        _PRICE_TABLE = table
+
+
+def record(totals: Usage, metadata: Mapping[str, Any], model: Optional[str]) -> None:
+    """
+    Adds the token usage found in metadata, if any, to totals and to the
+    process counters.
+    """
+    tokens = parse(metadata)
+    if tokens is None:
+        return
+
+    cost = _get_price_table().cost(model, tokens)
+    totals.add(tokens, cost)
+    _COUNTERS.add(model, tokens, cost)
+
+
+def parse(metadata: Mapping[str, Any]) -> Optional[TokenUsage]:
+    """
+    Reads the usage in OpenAI format, either nested, {"usage": {"prompt_tokens": 5}},
+    or flat, {"usage.prompt_tokens": 5}.
+    """
+    usage = metadata.get("usage")
+    if isinstance(usage, Mapping):
+        values = [usage.get(name) for name in TOKEN_FIELDS]
+    else:
+        values = [metadata.get(f"usage.{name}") for name in TOKEN_FIELDS]
+
+    if all(value is None for value in values):
+        return None
+
+    prompt_tokens, completion_tokens, total_tokens = [
+        _as_int(value) for value in values
+    ]
+    if values[2] is None:
+        total_tokens = prompt_tokens + completion_tokens
+
+    return TokenUsage(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        total_tokens=total_tokens,
+    )
+
+
+def model_name(metadata: Optional[Mapping[str, Any]]) -> Optional[str]:
+    """
+    The model that answered, the OpenAI autologger stores it as
+    "output_model", the requested one is "model".
+    """
+    if metadata is None:
+        return None
+
+    model = metadata.get("output_model", metadata.get("model"))
+    return model if isinstance(model, str) else None
+
+
+def _as_int(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _get_price_table() -> PriceTable:
+    global _PRICE_TABLE
+
+    with _PRICE_TABLE_LOCK:
+        if _PRICE_TABLE is None:
+            _PRICE_TABLE = _load_price_table(config.usage_prices_file())
+
+        return _PRICE_TABLE
+
+
+def _load_price_table(path: Optional[str]) -> PriceTable:
+    if path is None:
+        return PriceTable({})
+
+    try:
+        with open(path, encoding="utf-8") as stream:
+            return PriceTable.from_dict(json.load(stream))
+    except Exception:
+        LOGGER.warning("Failed to load the model prices from %s", path, exc_info=True)
+        return PriceTable({})
@@ -0,0 +1,102 @@
+"""
+deepmerge microbenchmarks: merges small updates into metadata of growing
+size, the way Span.set_outputs merges the metadata of an autologged
+OpenAI call into the span metadata.
+
+Run it with:
+    python tests/benchmarks/bench_deepmerge.py [--repeat N]
+
+Reports the time per merge of the current implementation and of the
+previous one, which started with copy.deepcopy of the first dictionary.
+"""
+import argparse
+import copy
+import timeit
+from typing import Any, Callable, Dict
+
+from comet_llm.chains import deepmerge
+
+
+def deepcopy_deepmerge(
+    dict1: Dict[str, Any], dict2: Dict[str, Any], max_depth: int = 10
+) -> Dict[str, Any]:
+    merged = copy.deepcopy(dict1)
+
+    for key, value in dict2.items():
+        if (
+            key in merged
+            and isinstance(merged[key], dict)
+            and isinstance(value, dict)
+            and max_depth > 0
+        ):
+            merged[key] = deepcopy_deepmerge(
+                merged[key], value, max_depth=max_depth - 1
+            )
+        else:
+            merged[key] = value
+
+    return merged
+
+
+def openai_like_metadata(choices: int, message_size: int) -> Dict[str, Any]:
+    return {
+        "openai": {
+            "id": "chatcmpl-id",
+            "model": "gpt-3.5-turbo",
+            "choices": [
+                {
+                    "index": index,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": "x" * message_size},
+                    "logprobs": {"tokens": [{"token": "x", "logprob": -0.1}] * 50},
+                }
+                for index in range(choices)
+            ],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 20, "total_tokens": 30},
+        }
+    }
+
+
+CASES = {
+    "small, new key": (
+        {"a": 1, "b": {"c": 2}},
+        {"d": 3},
+    ),
+    "openai response, usage update": (
+        openai_like_metadata(choices=4, message_size=1000),
+        {"openai": {"usage": {"total_tokens": 31}}},
+    ),
+    "openai response, new top level key": (
+        openai_like_metadata(choices=16, message_size=4000),
+        {"user": {"id": "user-id"}},
+    ),
+    "empty update": (
+        openai_like_metadata(choices=16, message_size=4000),
+        {},
+    ),
+}
+
+
+def measure(function: Callable, dict1: Dict, dict2: Dict, repeat: int) -> float:
+    return (
+        min(timeit.repeat(lambda: function(dict1, dict2), number=repeat, repeat=3))
+        / repeat
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'case':<36} {'current us':>11} {'deepcopy us':>12}")
+    for name, (dict1, dict2) in CASES.items():
+        assert deepmerge.deepmerge(dict1, dict2) == deepcopy_deepmerge(dict1, dict2)
+
+        current = measure(deepmerge.deepmerge, dict1, dict2, args.repeat)
+        previous = measure(deepcopy_deepmerge, dict1, dict2, args.repeat)
+        print(f"{name:<36} {current * 1e6:>11.2f} {previous * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
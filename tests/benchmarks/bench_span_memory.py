@@ -0,0 +1,90 @@
+"""
+Span memory benchmark: builds a chain of 100k ended spans and reports
+the bytes taken by every span, traced by tracemalloc.
+
+Run it with:
+    python tests/benchmarks/bench_span_memory.py [--spans N]
+
+The inputs, outputs and metadata of all the spans are the same objects,
+so only the memory of the span itself is counted: the Span object, its
+Timer with the timestamps, its ContextNode and the chain's reference to
+it. The sizes of the single objects, including the objects they create
+in __init__, are reported too.
+"""
+import argparse
+import gc
+import sys
+import tracemalloc
+from typing import Any, Callable
+
+from comet_llm import datetimes, llm_result
+from comet_llm.chains import chain, context, span
+
+INPUTS = {"prompt": "the-prompt"}
+OUTPUTS = {"output": "the-output"}
+
+
+def build_chain(spans: int) -> chain.Chain:
+    chain_ = chain.Chain(inputs={}, metadata=None, experiment_info=None)
+
+    for _ in range(spans):
+        span_ = span.Span(inputs=INPUTS, category="llm-call", name="the-name")
+        span_.__api__start__(chain_)
+        span_.set_outputs(OUTPUTS)
+        span_.__api__end__()
+
+    return chain_
+
+
+def object_size(factory: Callable[[], Any], count: int = 10_000) -> float:
+    """
+    Average traced size of the objects built by factory. Measured with
+    tracemalloc rather than sys.getsizeof, which doesn't count the
+    __dict__ and creates it if the instance keeps its values inline.
+    """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    list_size = sys.getsizeof(objects)
+    return (after - before - list_size) / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--spans", type=int, default=100_000)
+    args = parser.parse_args()
+
+    build_chain(10)  # imports and caches outside the measurement
+    gc.collect()
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    chain_ = build_chain(args.spans)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"bytes per span: {(after - before) / args.spans:.0f}")
+
+    sizes = {
+        "Span": object_size(lambda: span.Span(inputs=INPUTS, category="llm-call")),
+        "Timer": object_size(datetimes.Timer),
+        "Context": object_size(context.Context),
+        "ContextNode": object_size(lambda: context.ContextNode(1, None)),
+        "Chain": object_size(
+            lambda: chain.Chain(inputs={}, metadata=None, experiment_info=None)
+        ),
+        "LLMResult": object_size(
+            lambda: llm_result.LLMResult(id="id", project_url="url")
+        ),
+    }
+    for name, size in sizes.items():
+        print(f"{name:<12} {size:>6.0f} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Span tree benchmark: builds a chain of 100k spans nested 50 levels deep,
+then serializes it.
+
+Run it with:
+    python tests/benchmarks/bench_span_tree.py [--spans N] [--depth N]
+
+Reports the time and the peak memory traced by tracemalloc for both steps
+and, for comparison, the memory that per-span copies of the context stack
+would take. Every step runs twice, the time is measured without tracing
+as tracemalloc slows the code down a lot.
+"""
+import argparse
+import time
+import tracemalloc
+
+from comet_llm.chains import chain, span
+from comet_llm.message_processing import serialization
+
+
+def build_chain(spans: int, depth: int) -> chain.Chain:
+    chain_ = chain.Chain(inputs={}, metadata=None, experiment_info=None)
+    opened = []
+
+    for _ in range(spans):
+        if len(opened) == depth:
+            while opened:
+                opened.pop().__api__end__()
+
+        span_ = span.Span(inputs={}, category="llm-call")
+        span_.__api__start__(chain_)
+        opened.append(span_)
+
+    while opened:
+        opened.pop().__api__end__()
+
+    chain_.set_outputs({})
+    return chain_
+
+
+def serialize(chain_: chain.Chain) -> int:
+    return sum(
+        len(chunk)
+        for chunk in serialization.TraceChunks(chain_.as_dict(lazy_nodes=True))
+    )
+
+
+def stack_copies(spans: int, depth: int) -> list:
+    stack = list(range(depth))
+    return [list(stack[: i % depth]) for i in range(spans)]
+
+
+def measure(name, function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print("%-24s %8.3f s %10.1f MB" % (name, elapsed, peak / 2**20))
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--spans", type=int, default=100000)
+    parser.add_argument("--depth", type=int, default=50)
+    args = parser.parse_args()
+
+    chain_ = measure("build chain", build_chain, args.spans, args.depth)
+    size = measure("serialize chain", serialize, chain_)
+    measure("per-span stack copies", stack_copies, args.spans, args.depth)
+
+    print("serialized size: %.1f MB" % (size / 2**20))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Chain state benchmark: runs the per-span hot path (new span id, global
+chain lookup, span start and end) from many threads at once.
+
+Run it with:
+    python tests/benchmarks/bench_state.py [--threads 1 8 32 64] [--spans N]
+
+Reports the time per span for every thread count, next to a lock based
+id counter (the previous implementation) to show the contention it adds.
+Then starts and finishes many short-lived threads that each set a global
+chain, and reports how many of those chains are still alive afterwards.
+"""
+import argparse
+import gc
+import threading
+import time
+import weakref
+from typing import Callable, List
+
+from comet_llm.chains import chain, span, state
+
+
+class _LockedIds:
+    def __init__(self) -> None:
+        self._id = 0
+        self._lock = threading.Lock()
+
+    def new_id(self) -> int:
+        with self._lock:
+            self._id += 1
+            return self._id
+
+
+def _run_threads(threads: int, target: Callable[[], None]) -> float:
+    barrier = threading.Barrier(threads + 1)
+
+    def run() -> None:
+        barrier.wait()
+        target()
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+
+    return time.perf_counter() - start
+
+
+def spans_hot_path(spans: int) -> Callable[[], None]:
+    def target() -> None:
+        state.set_global_chain(
+            chain.Chain(inputs={}, metadata=None, experiment_info=None)
+        )
+        for _ in range(spans):
+            span_ = span.Span(inputs={}, category="llm-call")
+            span_.__api__start__(state.get_global_chain())
+            span_.__api__end__()
+
+    return target
+
+
+def ids(new_id: Callable[[], int], calls: int) -> Callable[[], None]:
+    def target() -> None:
+        for _ in range(calls):
+            new_id()
+
+    return target
+
+
+def thread_churn(threads: int) -> int:
+    """
+    Returns how many chains set by the finished threads are still alive.
+    """
+    references: List[weakref.ref] = []
+
+    def target() -> None:
+        chain_ = chain.Chain(inputs={}, metadata=None, experiment_info=None)
+        references.append(weakref.ref(chain_))
+        state.set_global_chain(chain_)
+
+    for _ in range(threads):
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join()
+
+    gc.collect()
+    return sum(1 for reference in references if reference() is not None)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--spans", type=int, default=200_000)
+    parser.add_argument("--churn", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'threads':>8} {'span ns':>10} {'count id ns':>12} {'locked id ns':>13}")
+    for threads in args.threads:
+        per_thread = max(args.spans // threads, 1)
+        total = per_thread * threads
+
+        spans_time = _run_threads(threads, spans_hot_path(per_thread))
+        count_time = _run_threads(threads, ids(state.get_new_id, per_thread))
+        locked_time = _run_threads(threads, ids(_LockedIds().new_id, per_thread))
+
+        print(
+            f"{threads:>8} {spans_time / total * 1e9:>10.0f}"
+            f" {count_time / total * 1e9:>12.0f} {locked_time / total * 1e9:>13.0f}"
+        )
+
+    alive = thread_churn(args.churn)
+    print(f"chains alive after {args.churn} finished threads: {alive}")
+
+
+if __name__ == "__main__":
+    main()
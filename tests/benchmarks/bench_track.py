@@ -0,0 +1,58 @@
+"""
+track decorator microbenchmarks: the cost of a call of a decorated
+function outside of a chain, in a chain that is not sampled and in a
+sampled chain, compared with the undecorated function.
+
+Run it with:
+    python tests/benchmarks/bench_track.py [--repeat N]
+
+Outside of a chain and in a chain that is not sampled the decorated
+function is called directly, the difference with the undecorated call is
+the lookup of the active chain.
+"""
+import argparse
+import timeit
+from typing import Callable
+
+from comet_llm.chains import chain, state, track
+
+
+def function(query: str, k: int = 2) -> str:
+    return query
+
+
+tracked_function = track.track(function)
+
+
+def measure(call: Callable, repeat: int) -> float:
+    return min(timeit.repeat(call, number=repeat, repeat=3)) / repeat
+
+
+def new_chain(sampled: bool) -> chain.Chain:
+    return chain.Chain(
+        inputs={}, metadata=None, experiment_info=None, sampled=sampled  # type: ignore
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"{'case':<28} {'us per call':>12}")
+    cases = [
+        ("undecorated", None, function),
+        ("no chain", None, tracked_function),
+        ("chain not sampled", new_chain(sampled=False), tracked_function),
+        ("sampled chain", new_chain(sampled=True), tracked_function),
+    ]
+    for name, chain_, call in cases:
+        state.set_global_chain(chain_)  # type: ignore
+        # The sampled chain keeps every span, so fewer calls are measured
+        repeat = args.repeat // 10 if name == "sampled chain" else args.repeat
+        result = measure(lambda: call("the-query", k=3), repeat)
+        print(f"{name:<28} {result * 1e6:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+from testix import *
+
+from comet_llm.aio import api
+
+
+def _run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def _awaitable(value):
+    return value
+
+
+@pytest.fixture(autouse=True)
+def mock_imports(patch_module):
+    patch_module(api, "prompts_api")
+    patch_module(api, "chains_api")
+    patch_module(api, "state")
+    patch_module(api, "message_processing")
+    patch_module(api, "sampling")
+
+
+def test_log_prompt__happyflow():
+    with Scenario() as s:
+        s.sampling.head_sampled(None) >> True
+        s.prompts_api.build_message(
+            prompt="the-prompt",
+            output="the-output",
+            workspace="the-workspace",
+            project="the-project",
+            tags="the-tags",
+            api_key="api-key",
+            prompt_template="prompt-template",
+            prompt_template_variables="prompt-template-variables",
+            metadata="the-metadata",
+            timestamp="the-timestamp",
+            duration="the-duration",
+        ) >> Fake("the_message", trace_data="the-trace-data")
+        s.sampling.tail_sampled("the-trace-data", None) >> True
+        s.message_processing.process_async(Fake("the_message")) >> _awaitable("llm-result")
+
+        result = _run(
+            api.log_prompt(
+                prompt="the-prompt",
+                output="the-output",
+                workspace="the-workspace",
+                project="the-project",
+                tags="the-tags",
+                api_key="api-key",
+                prompt_template="prompt-template",
+                prompt_template_variables="prompt-template-variables",
+                metadata="the-metadata",
+                timestamp="the-timestamp",
+                duration="the-duration",
+            )
+        )
+
+        assert result == "llm-result"
+
+
+def test_end_chain__happyflow():
+    global_chain = Fake("global_chain")
+
+    with Scenario() as s:
+        s.state.get_global_chain() >> global_chain
+        s.global_chain.set_outputs(outputs="the-outputs", metadata="the-metadata")
+        s.chains_api.build_sampled_message(global_chain, None) >> "the-message"
+        s.message_processing.process_async("the-message") >> _awaitable("llm-result")
+
+        result = _run(api.end_chain(outputs="the-outputs", metadata="the-metadata"))
+
+        assert result == "llm-result"
+
+
+def test_end_chain__chain_sampled_out__nothing_logged():
+    global_chain = Fake("global_chain")
+
+    with Scenario() as s:
+        s.state.get_global_chain() >> global_chain
+        s.global_chain.set_outputs(outputs="the-outputs", metadata=None)
+        s.chains_api.build_sampled_message(global_chain, False) >> None
+
+        result = _run(api.end_chain(outputs="the-outputs", sampled=False))
+
+        assert result is None
+
+
+def test_log_prompt__prompt_not_head_sampled__nothing_logged():
+    with Scenario() as s:
+        s.sampling.head_sampled(None) >> False
+        s.sampling.sampled_out("prompt")
+
+        assert _run(api.log_prompt(prompt="the-prompt", output="the-output")) is None
@@ -61,6 +61,15 @@ def test_parse_create_arguments__only_messages_presented():
     )
 
 
+def test_parse_create_arguments__messages_list_appended_after_the_call__inputs_unchanged():
+    messages = [{"role": "user", "content": "hi"}]
+
+    inputs, _ = chat_completion_parsers.parse_create_arguments({"messages": messages})
+    messages.append({"role": "assistant", "content": "hello"})
+
+    assert inputs == {"messages": [{"role": "user", "content": "hi"}]}
+
+
 def test_parse_create_result__input_is_ChatCompletion__input_parsed_successfully():
     create_result = Fake("create_result")
     with Scenario() as s:
@@ -90,13 +99,16 @@ def test_parse_create_result__input_is_ChatCompletion__input_parsed_successfully
         assert metadata == {"some-key": "some-value", "output_model": "the-model"}
 
 
-def test_parse_create_result__input_is_Stream__input_parsed_with_hardcoded_values_used():
+def test_create_result_is_stream__Stream__True_returned():
     create_result = (x for x in [])
 
-    outputs, metadata = chat_completion_parsers.parse_create_result(create_result)
+    assert chat_completion_parsers.create_result_is_stream(create_result) is True
+
+
+def test_create_result_is_stream__ChatCompletion__False_returned():
+    create_result = Fake("create_result", model_dump="not-used")
 
-    assert outputs == {"choices": "Generation is not logged when using stream mode"}
-    assert metadata == {}
+    assert chat_completion_parsers.create_result_is_stream(create_result) is False
 
 
 @pytest.mark.parametrize(
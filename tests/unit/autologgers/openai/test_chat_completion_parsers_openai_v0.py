@@ -40,12 +40,27 @@ def test_parse_create_result__input_is_openai_object__input_parsed_successfully_
         assert metadata == {"some-key": "some-value", "output_model": "the-model"}
 
 
-def test_parse_create_result__input_is_generator_object__input_parsed_with_hardcoded_values_used():
+def test_create_result_is_stream__generator_object__True_returned():
     create_result = (x for x in [])
 
     with Scenario() as s:
         s.metadata.openai_version() >> "0.99.99"
-        outputs, metadata = chat_completion_parsers.parse_create_result(create_result)
 
-        assert outputs == {"choices": "Generation is not logged when using stream mode"}
-        assert metadata == {}
+        assert chat_completion_parsers.create_result_is_stream(create_result) is True
+
+
+def test_create_result_is_stream__async_generator_object__True_returned():
+    async def create_result():
+        yield "chunk"
+
+    with Scenario() as s:
+        s.metadata.openai_version() >> "0.99.99"
+
+        assert chat_completion_parsers.create_result_is_stream(create_result()) is True
+
+
+def test_create_result_is_stream__openai_object__False_returned():
+    with Scenario() as s:
+        s.metadata.openai_version() >> "0.99.99"
+
+        assert chat_completion_parsers.create_result_is_stream({"choices": []}) is False
@@ -1,3 +1,5 @@
+import gc
+
 import pytest
 from testix import *
 
@@ -13,6 +15,9 @@ def mock_imports(patch_module):
     patch_module(hooks, "config")
     patch_module(hooks, "chat_completion_parsers")
     patch_module(hooks, "experiment_info")
+    patch_module(hooks, "sampling")
+    patch_module(hooks, "message_processing")
+    patch_module(hooks, "batching")
     patch_module(context, "CONTEXT", context.OpenAIContext())
 
 
@@ -40,17 +45,18 @@ def test_before_chat_completion_create__global_chain_exists__span_attached_to_gl
 
     span_instance = Fake("span_instance")
     with Scenario() as s:
+        global_chain = Fake("global_chain", sampled=True)
         s.config.is_ready() >> True
         s.chat_completion_parsers.create_arguments_supported(KWARGS) >> True
         s.chat_completion_parsers.parse_create_arguments(KWARGS) >> ("the-inputs", "the-metadata")
         s.chains_state.global_chain_exists() >> True
-        s.chains_state.get_global_chain() >> "global-chain"
+        s.chains_state.get_global_chain() >> global_chain
         s.span.Span(
             inputs="the-inputs",
             metadata = "the-metadata",
             category="llm",
         ) >> span_instance
-        s.span_instance.__api__start__(chain="global-chain")
+        s.span_instance.__api__start__(chain=global_chain)
 
         hooks.before_chat_completion_create(
             NOT_USED,
@@ -72,6 +78,8 @@ def test_before_chat_completion_create__global_chain_does_not_exist__session_cha
         s.chat_completion_parsers.create_arguments_supported(KWARGS) >> True
         s.chat_completion_parsers.parse_create_arguments(KWARGS) >> ("the-inputs", "the-metadata")
         s.chains_state.global_chain_exists() >> False
+        s.sampling.head_sampled() >> True
+        s.batching.enabled() >> False
         s.experiment_info.get() >> "experiment-info"
         s.chain.Chain(
             inputs="the-inputs",
@@ -94,6 +102,107 @@ def test_before_chat_completion_create__global_chain_does_not_exist__session_cha
         assert context.CONTEXT.span is span_instance
 
 
+def test_before_chat_completion_create__batching_enabled__span_attached_to_batch_chain():
+    NOT_USED = None
+    KWARGS = {"some-key": "some-value"}
+
+    span_instance = Fake("span_instance")
+    with Scenario() as s:
+        batch = Fake("batch")
+        batch.chain = "batch-chain"
+        s.config.is_ready() >> True
+        s.chat_completion_parsers.create_arguments_supported(KWARGS) >> True
+        s.chat_completion_parsers.parse_create_arguments(KWARGS) >> ("the-inputs", "the-metadata")
+        s.chains_state.global_chain_exists() >> False
+        s.sampling.head_sampled() >> True
+        s.batching.enabled() >> True
+        s.batching.start_call(others={"Created from": "openai-llm"}) >> batch
+        s.span.Span(
+            inputs="the-inputs",
+            metadata = "the-metadata",
+            category="llm",
+        ) >> span_instance
+        s.span_instance.__api__start__(chain="batch-chain")
+
+        hooks.before_chat_completion_create(
+            NOT_USED,
+            **KWARGS
+        )
+        assert context.CONTEXT.chain is None
+        assert context.CONTEXT.batch is batch
+        assert context.CONTEXT.span is span_instance
+
+
+def test_before_chat_completion_create__batching_enabled__span_start_failed__call_ended_in_batch_and_batch_not_set():
+    NOT_USED = None
+    KWARGS = {"some-key": "some-value"}
+
+    span_instance = Fake("span_instance")
+    with Scenario() as s:
+        batch = Fake("batch")
+        batch.chain = "batch-chain"
+        s.config.is_ready() >> True
+        s.chat_completion_parsers.create_arguments_supported(KWARGS) >> True
+        s.chat_completion_parsers.parse_create_arguments(KWARGS) >> ("the-inputs", "the-metadata")
+        s.chains_state.global_chain_exists() >> False
+        s.sampling.head_sampled() >> True
+        s.batching.enabled() >> True
+        s.batching.start_call(others={"Created from": "openai-llm"}) >> batch
+        s.span.Span(
+            inputs="the-inputs",
+            metadata = "the-metadata",
+            category="llm",
+        ) >> span_instance
+        s.span_instance.__api__start__(chain="batch-chain") >> Throwing(Exception)
+        s.batch.end_call()
+
+        with pytest.raises(Exception):
+            hooks.before_chat_completion_create(
+                NOT_USED,
+                **KWARGS
+            )
+        assert context.CONTEXT.batch is None
+        assert context.CONTEXT.span is None
+
+    with Scenario() as s:
+        hooks.after_exception_chat_completion_create(NOT_USED, Exception())
+
+
+def test_before_chat_completion_create__global_chain_not_sampled__span_not_created():
+    NOT_USED = None
+    KWARGS = {"some-key": "some-value"}
+
+    with Scenario() as s:
+        s.config.is_ready() >> True
+        s.chat_completion_parsers.create_arguments_supported(KWARGS) >> True
+        s.chat_completion_parsers.parse_create_arguments(KWARGS) >> ("the-inputs", "the-metadata")
+        s.chains_state.global_chain_exists() >> True
+        s.chains_state.get_global_chain() >> Fake("global_chain", sampled=False)
+
+        hooks.before_chat_completion_create(NOT_USED, **KWARGS)
+
+        assert context.CONTEXT.chain is None
+        assert context.CONTEXT.span is None
+
+
+def test_before_chat_completion_create__session_chain_not_sampled__nothing_created():
+    NOT_USED = None
+    KWARGS = {"some-key": "some-value"}
+
+    with Scenario() as s:
+        s.config.is_ready() >> True
+        s.chat_completion_parsers.create_arguments_supported(KWARGS) >> True
+        s.chat_completion_parsers.parse_create_arguments(KWARGS) >> ("the-inputs", "the-metadata")
+        s.chains_state.global_chain_exists() >> False
+        s.sampling.head_sampled() >> False
+        s.sampling.sampled_out("chain")
+
+        hooks.before_chat_completion_create(NOT_USED, **KWARGS)
+
+        assert context.CONTEXT.chain is None
+        assert context.CONTEXT.span is None
+
+
 def test_before_chat_completion_create__autologging_disabled__nothing_done():
     NOT_USED = None
     with Scenario() as s:
@@ -101,7 +210,7 @@ def test_before_chat_completion_create__autologging_disabled__nothing_done():
         hooks.before_chat_completion_create(NOT_USED)
 
 
-def test_after_chat_completion_create__session_chain_exists__session_chain_used_and_ended():
+def test_after_chat_completion_create__session_chain_exists__background_disabled__session_chain_used_and_ended():
     NOT_USED = None
 
     context.CONTEXT.chain = Fake("chain_instance")
@@ -109,12 +218,14 @@ def test_after_chat_completion_create__session_chain_exists__session_chain_used_
 
     with Scenario() as s:
         s.config.is_ready() >> True
+        s.chat_completion_parsers.create_result_is_stream("return-value") >> False
+        s.config.autologging_background_enabled() >> False
         s.chat_completion_parsers.parse_create_result("return-value") >> ("the-outputs", "the-metadata")
         s.span_instance.set_outputs(
             outputs="the-outputs",
             metadata="the-metadata"
         )
-        s.span_instance.__api__end__()
+        s.span_instance.__api__end__(detached=False)
         s.chain_instance.set_outputs(
             outputs="the-outputs",
             metadata="the-metadata"
@@ -127,6 +238,159 @@ def test_after_chat_completion_create__session_chain_exists__session_chain_used_
         assert context.CONTEXT.span is None
 
 
+def test_after_chat_completion_create__session_chain_exists__background_enabled__timers_stopped__chain_logged_by_deferred_message():
+    NOT_USED = None
+
+    context.CONTEXT.chain = Fake("chain_instance")
+    context.CONTEXT.span = Fake("span_instance")
+
+    with Scenario() as s:
+        s.config.is_ready() >> True
+        s.chat_completion_parsers.create_result_is_stream("return-value") >> False
+        s.config.autologging_background_enabled() >> True
+        s.span_instance.__api__end__(detached=False)
+        s.chain_instance.__api__end__()
+        s.message_processing.process_deferred(saveargument.SaveArgument("build_message"))
+
+        hooks.after_chat_completion_create(NOT_USED, "return-value")
+
+        assert context.CONTEXT.chain is None
+        assert context.CONTEXT.span is None
+
+        s.chat_completion_parsers.parse_create_result("return-value") >> ("the-outputs", "the-metadata")
+        s.span_instance.set_outputs(
+            outputs="the-outputs",
+            metadata="the-metadata"
+        )
+        s.chain_instance.__api__set_outputs__(
+            outputs="the-outputs",
+            metadata="the-metadata"
+        )
+        s.chains_api.build_sampled_message(Fake("chain_instance")) >> "the-message"
+
+        assert saveargument.saved()["build_message"]() == "the-message"
+
+
+def test_after_chat_completion_create__global_chain_used__background_enabled__span_outputs_deferred():
+    NOT_USED = None
+
+    context.CONTEXT.chain = None
+    context.CONTEXT.span = Fake("span_instance")
+
+    with Scenario() as s:
+        s.config.is_ready() >> True
+        s.chat_completion_parsers.create_result_is_stream("return-value") >> False
+        s.config.autologging_background_enabled() >> True
+        s.span_instance.__api__defer_outputs__(saveargument.SaveArgument("parse_result"))
+        s.span_instance.__api__end__(detached=False)
+
+        hooks.after_chat_completion_create(NOT_USED, "return-value")
+
+        assert context.CONTEXT.span is None
+
+        s.chat_completion_parsers.parse_create_result("return-value") >> ("the-outputs", "the-metadata")
+
+        assert saveargument.saved()["parse_result"]() == ("the-outputs", "the-metadata")
+
+
+def test_after_chat_completion_create__batched_call__span_outputs_deferred__call_ended_in_batch():
+    NOT_USED = None
+
+    context.CONTEXT.span = Fake("span_instance")
+    context.CONTEXT.batch = Fake("batch")
+
+    with Scenario() as s:
+        s.config.is_ready() >> True
+        s.chat_completion_parsers.create_result_is_stream("return-value") >> False
+        s.config.autologging_background_enabled() >> True
+        s.span_instance.__api__defer_outputs__(IgnoreArgument())
+        s.span_instance.__api__end__(detached=False)
+        s.batch.end_call()
+
+        hooks.after_chat_completion_create(NOT_USED, "return-value")
+
+        assert context.CONTEXT.span is None
+        assert context.CONTEXT.batch is None
+
+
+def test_after_chat_completion_create__stream__span_ended_when_stream_consumed():
+    NOT_USED = None
+    CHUNKS = [
+        {"id": "the-id", "model": "the-model", "choices": [{"index": 0, "delta": {"role": "assistant"}}]},
+        {"choices": [{"index": 0, "delta": {"content": "Hello"}}]},
+        {"choices": [{"index": 0, "delta": {"content": " world"}, "finish_reason": "stop"}]},
+    ]
+    OUTPUTS = {
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": "Hello world"},
+                "finish_reason": "stop",
+            }
+        ]
+    }
+    return_value = iter(CHUNKS)
+
+    context.CONTEXT.chain = Fake("chain_instance")
+    context.CONTEXT.span = Fake("span_instance")
+
+    with Scenario() as s:
+        s.config.is_ready() >> True
+        s.chat_completion_parsers.create_result_is_stream(return_value) >> True
+        s.span_instance.__api__detach__()
+
+        result = hooks.after_chat_completion_create(NOT_USED, return_value)
+
+        assert context.CONTEXT.chain is None
+        assert context.CONTEXT.span is None
+
+        assert next(result) is CHUNKS[0]
+        assert next(result) is CHUNKS[1]
+        assert next(result) is CHUNKS[2]
+
+        s.config.autologging_background_enabled() >> False
+        s.span_instance.set_outputs(outputs=OUTPUTS, metadata=IgnoreArgument())
+        s.span_instance.__api__end__(detached=True)
+        s.chain_instance.set_outputs(outputs=OUTPUTS, metadata=IgnoreArgument())
+        s.chains_api.log_chain(IgnoreArgument())
+
+        with pytest.raises(StopIteration):
+            next(result)
+
+
+def test_after_chat_completion_create__stream_abandoned__background_disabled__only_timers_stopped_chain_logged_by_deferred_message():
+    NOT_USED = None
+    CHUNKS = [
+        {"id": "the-id", "choices": [{"index": 0, "delta": {"role": "assistant", "content": "Hello"}}]},
+        {"choices": [{"index": 0, "delta": {"content": " world"}}]},
+    ]
+    return_value = iter(CHUNKS)
+
+    context.CONTEXT.chain = Fake("chain_instance")
+    context.CONTEXT.span = Fake("span_instance")
+
+    with Scenario() as s:
+        s.config.is_ready() >> True
+        s.chat_completion_parsers.create_result_is_stream(return_value) >> True
+        s.span_instance.__api__detach__()
+
+        result = hooks.after_chat_completion_create(NOT_USED, return_value)
+        assert next(result) is CHUNKS[0]
+
+        s.span_instance.__api__end__(detached=True)
+        s.chain_instance.__api__end__()
+        s.message_processing.process_deferred(saveargument.SaveArgument("build_message"))
+
+        del result
+        gc.collect()
+
+        s.span_instance.set_outputs(outputs=IgnoreArgument(), metadata=IgnoreArgument())
+        s.chain_instance.__api__set_outputs__(outputs=IgnoreArgument(), metadata=IgnoreArgument())
+        s.chains_api.build_sampled_message(IgnoreArgument()) >> "the-message"
+
+        assert saveargument.saved()["build_message"]() == "the-message"
+
+
 def test_after_chat_completion_create__autologging_disabled__nothing_done_but_context_cleared():
     NOT_USED = None
     context.CONTEXT.chain = "the-chain"
@@ -149,4 +413,51 @@ def test_after_chat_completion_create__context_span_is_None__nothing_done():
         hooks.after_chat_completion_create(NOT_USED, NOT_USED)
 
         assert context.CONTEXT.chain is None
-        assert context.CONTEXT.span is None
\ No newline at end of file
+        assert context.CONTEXT.span is None
+
+
+def test_after_exception_chat_completion_create__batched_call__span_ended__call_ended_in_batch():
+    NOT_USED = None
+
+    context.CONTEXT.span = Fake("span_instance")
+    context.CONTEXT.batch = Fake("batch")
+
+    with Scenario() as s:
+        s.span_instance.__api__end__()
+        s.batch.end_call()
+
+        hooks.after_exception_chat_completion_create(NOT_USED, Exception())
+
+        assert context.CONTEXT.span is None
+        assert context.CONTEXT.batch is None
+
+
+def test_after_chat_completion_create__batched_call__autologging_disabled__call_ended_in_batch():
+    NOT_USED = None
+    context.CONTEXT.span = "the-span"
+    context.CONTEXT.batch = Fake("batch")
+    with Scenario() as s:
+        s.config.is_ready() >> False
+        s.batch.end_call()
+
+        hooks.after_chat_completion_create(NOT_USED, NOT_USED)
+
+        assert context.CONTEXT.span is None
+        assert context.CONTEXT.batch is None
+
+
+def test_after_chat_completion_create__batched_call__parsing_failed__call_ended_in_batch():
+    NOT_USED = None
+    context.CONTEXT.span = "the-span"
+    context.CONTEXT.batch = Fake("batch")
+    with Scenario() as s:
+        s.config.is_ready() >> True
+        s.chat_completion_parsers.create_result_is_stream("the-return-value") >> False
+        s.config.autologging_background_enabled() >> False
+        s.chat_completion_parsers.parse_create_result("the-return-value") >> Throwing(Exception)
+        s.batch.end_call()
+
+        with pytest.raises(Exception):
+            hooks.after_chat_completion_create(NOT_USED, "the-return-value")
+
+        assert context.CONTEXT.batch is None
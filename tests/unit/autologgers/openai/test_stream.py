@@ -0,0 +1,308 @@
+import asyncio
+import gc
+import types
+
+import pytest
+
+from comet_llm.autologgers.openai import stream
+
+
+def _object(**kwargs):
+    return types.SimpleNamespace(**kwargs)
+
+
+def _v1_chunk(content=None, finish_reason=None, index=0, **delta):
+    return _object(
+        id="the-id",
+        object="chat.completion.chunk",
+        created=123,
+        model="the-model",
+        system_fingerprint=None,
+        usage=None,
+        choices=[
+            _object(
+                index=index,
+                delta=_object(content=content, **delta),
+                finish_reason=finish_reason,
+            )
+        ],
+    )
+
+
+class _Recorder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, outputs, metadata):
+        self.calls.append((outputs, metadata))
+
+
+class _ClosableStream:
+    def __init__(self, chunks, response="the-response"):
+        self._chunks = iter(chunks)
+        self.closed = False
+        self.response = response
+
+    def __iter__(self):
+        return self._chunks
+
+    def close(self):
+        self.closed = True
+
+
+def test_accumulator__v1_chunks__choices_built_from_deltas():
+    tested = stream.ChunksAccumulator()
+
+    assert tested.add(_v1_chunk(role="assistant")) is False
+    assert tested.add(_v1_chunk("Hel")) is True
+    assert tested.add(_v1_chunk("lo")) is True
+    assert tested.add(_v1_chunk(finish_reason="stop")) is False
+
+    outputs, metadata = tested.result()
+    assert outputs == {
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": "Hello"},
+                "finish_reason": "stop",
+            }
+        ]
+    }
+    assert metadata == {"id": "the-id", "created": 123, "output_model": "the-model"}
+    assert tested.chunks == 4
+    assert tested.content_chunks == 2
+
+
+def test_accumulator__tool_calls_in_fragments__arguments_joined():
+    tested = stream.ChunksAccumulator()
+    tool_call = lambda **kwargs: _object(  # noqa: E731
+        index=0,
+        id=kwargs.get("id"),
+        type=kwargs.get("type"),
+        function=_object(name=kwargs.get("name"), arguments=kwargs.get("arguments")),
+    )
+
+    tested.add(
+        _v1_chunk(tool_calls=[tool_call(id="call-1", type="function", name="f")])
+    )
+    tested.add(_v1_chunk(tool_calls=[tool_call(arguments='{"a": ')]))
+    tested.add(_v1_chunk(tool_calls=[tool_call(arguments="1}")]))
+
+    outputs, _ = tested.result()
+    assert outputs["choices"][0]["message"]["tool_calls"] == [
+        {
+            "id": "call-1",
+            "type": "function",
+            "function": {"name": "f", "arguments": '{"a": 1}'},
+        }
+    ]
+
+
+def test_accumulator__v0_dict_chunks_with_several_choices_and_function_call():
+    tested = stream.ChunksAccumulator()
+
+    tested.add(
+        {"model": "the-model", "choices": [{"index": 1, "delta": {"content": "b"}}]}
+    )
+    tested.add({"choices": [{"index": 0, "delta": {"function_call": {"name": "f"}}}]})
+    tested.add(
+        {"choices": [{"index": 0, "delta": {"function_call": {"arguments": "{}"}}}]}
+    )
+    tested.add({"choices": [], "usage": {"completion_tokens": 2}})
+
+    outputs, metadata = tested.result()
+    assert outputs == {
+        "choices": [
+            {
+                "index": 0,
+                "message": {
+                    "role": None,
+                    "content": None,
+                    "function_call": {"name": "f", "arguments": "{}"},
+                },
+                "finish_reason": None,
+            },
+            {
+                "index": 1,
+                "message": {"role": None, "content": "b"},
+                "finish_reason": None,
+            },
+        ]
+    }
+    assert metadata == {"output_model": "the-model", "usage": {"completion_tokens": 2}}
+
+
+def test_stream__exhausted__chunks_passed_through_and_metrics_reported(monkeypatch):
+    times = iter([10.5, 10.7, 10.9])
+    monkeypatch.setattr(stream.time, "perf_counter", lambda: next(times))
+    chunks = [_v1_chunk("a"), _v1_chunk("b"), _v1_chunk("c")]
+    on_end = _Recorder()
+
+    tested = stream.ChatCompletionStream(iter(chunks), on_end=on_end, started_at=10.0)
+
+    assert list(tested) == chunks
+    ((outputs, metadata),) = on_end.calls
+    assert outputs["choices"][0]["message"]["content"] == "abc"
+    assert metadata["stream_metrics"] == {
+        "completed": True,
+        "chunks": 3,
+        "time_to_first_token_ms": pytest.approx(500),
+        "inter_token_latency_ms": pytest.approx(200),
+        "tokens_per_second": pytest.approx(5),
+    }
+
+
+def test_stream__closed_before_the_end__original_closed_and_partial_outputs_reported():
+    original = _ClosableStream([_v1_chunk("a"), _v1_chunk("b")])
+    on_end = _Recorder()
+
+    with stream.ChatCompletionStream(original, on_end=on_end) as tested:
+        next(tested)
+
+    assert original.closed
+    ((outputs, metadata),) = on_end.calls
+    assert outputs["choices"][0]["message"]["content"] == "a"
+    assert metadata["stream_metrics"]["completed"] is False
+    assert "inter_token_latency_ms" not in metadata["stream_metrics"]
+
+
+def test_stream__abandoned_before_the_end__on_abandoned_called_with_partial_result():
+    on_end = _Recorder()
+    abandoned = []
+    tested = stream.ChatCompletionStream(
+        _ClosableStream([_v1_chunk("a"), _v1_chunk("b")]),
+        on_end=on_end,
+        on_abandoned=abandoned.append,
+    )
+    next(tested)
+
+    del tested
+    gc.collect()
+
+    assert on_end.calls == []
+    (parse_result,) = abandoned
+    outputs, metadata = parse_result()
+    assert outputs["choices"][0]["message"]["content"] == "a"
+    assert metadata["stream_metrics"]["completed"] is False
+
+
+def test_stream__exhausted_then_garbage_collected__on_abandoned_not_called():
+    on_end = _Recorder()
+    abandoned = []
+    tested = stream.ChatCompletionStream(
+        iter([_v1_chunk("a")]), on_end=on_end, on_abandoned=abandoned.append
+    )
+    list(tested)
+
+    del tested
+    gc.collect()
+
+    ((_, metadata),) = on_end.calls
+    assert metadata["stream_metrics"]["completed"] is True
+    assert abandoned == []
+
+
+def test_stream__iteration_failed__error_reported_and_reraised():
+    def failing():
+        yield _v1_chunk("a")
+        raise ConnectionError("connection lost")
+
+    on_end = _Recorder()
+    tested = stream.ChatCompletionStream(failing(), on_end=on_end)
+
+    with pytest.raises(ConnectionError):
+        list(tested)
+
+    ((_, metadata),) = on_end.calls
+    assert metadata["error"] == "ConnectionError('connection lost')"
+
+
+def test_stream__on_end_failed__iteration_not_affected():
+    def on_end(outputs, metadata):
+        raise Exception("failed")
+
+    tested = stream.ChatCompletionStream(iter([_v1_chunk("a")]), on_end=on_end)
+
+    assert len(list(tested)) == 1
+
+
+def test_stream__other_attributes__read_from_original_stream():
+    tested = stream.ChatCompletionStream(_ClosableStream([]), on_end=_Recorder())
+
+    assert tested.response == "the-response"
+
+
+def _run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def _async_chunks(chunks):
+    for chunk in chunks:
+        await asyncio.sleep(0)
+        yield chunk
+
+
+def test_wrap__sync_and_async_streams__matching_wrapper_returned():
+    assert isinstance(
+        stream.wrap(iter([]), on_end=_Recorder()), stream.ChatCompletionStream
+    )
+    assert isinstance(
+        stream.wrap(_async_chunks([]), on_end=_Recorder()),
+        stream.AsyncChatCompletionStream,
+    )
+
+
+def test_async_stream__exhausted__chunks_passed_through_and_outputs_reported():
+    chunks = [_v1_chunk("a"), _v1_chunk("b", finish_reason="stop")]
+    on_end = _Recorder()
+    tested = stream.AsyncChatCompletionStream(_async_chunks(chunks), on_end=on_end)
+
+    async def consume():
+        return [chunk async for chunk in tested]
+
+    assert _run(consume()) == chunks
+    ((outputs, metadata),) = on_end.calls
+    assert outputs["choices"][0]["message"]["content"] == "ab"
+    assert metadata["stream_metrics"]["completed"] is True
+    assert "time_to_first_token_ms" in metadata["stream_metrics"]
+
+
+def test_async_stream__closed_before_the_end__async_generator_closed():
+    original = _async_chunks([_v1_chunk("a"), _v1_chunk("b")])
+    on_end = _Recorder()
+
+    async def consume():
+        async with stream.AsyncChatCompletionStream(original, on_end=on_end) as tested:
+            await tested.__anext__()
+
+    _run(consume())
+
+    assert original.ag_frame is None
+    ((_, metadata),) = on_end.calls
+    assert metadata["stream_metrics"]["completed"] is False
+
+
+def test_async_stream__abandoned_before_the_end__partial_outputs_reported():
+    on_end = _Recorder()
+    abandoned = []
+
+    async def consume():
+        tested = stream.AsyncChatCompletionStream(
+            _async_chunks([_v1_chunk("a"), _v1_chunk("b")]),
+            on_end=on_end,
+            on_abandoned=abandoned.append,
+        )
+        await tested.__anext__()
+
+    _run(consume())
+    gc.collect()
+
+    assert on_end.calls == []
+    (parse_result,) = abandoned
+    outputs, metadata = parse_result()
+    assert outputs["choices"][0]["message"]["content"] == "a"
+    assert metadata["stream_metrics"]["completed"] is False
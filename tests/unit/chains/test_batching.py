@@ -0,0 +1,125 @@
+import threading
+
+import pytest
+from testix import *
+
+from comet_llm.chains import batching
+
+
+@pytest.fixture
+def logged(monkeypatch):
+    result = []
+    monkeypatch.setattr(batching, "_new_chain", lambda key, others: ("chain", key))
+    monkeypatch.setattr(batching, "_log", result.append)
+    return result
+
+
+def test_start_call__same_key__same_batch__calls_counted(logged):
+    tested = batching.Batcher(max_calls=0, window=0)
+
+    first = tested.start_call("the-key")
+    second = tested.start_call("the-key")
+    other = tested.start_call("other-key")
+
+    assert first is second
+    assert first.chain == ("chain", "the-key")
+    assert first.calls == 2
+    assert other is not first
+    assert other.chain == ("chain", "other-key")
+
+
+def test_start_call__max_calls_reached__batch_logged_when_its_calls_end__next_call_starts_new_batch(
+    logged,
+):
+    tested = batching.Batcher(max_calls=2, window=0)
+
+    first = tested.start_call(None)
+    tested.start_call(None)
+    first.end_call()
+
+    assert logged == []
+
+    new_batch = tested.start_call(None)
+    first.end_call()
+
+    assert logged == [first]
+    assert new_batch is not first
+
+
+def test_close_all__running_call__batch_logged_when_call_ends(logged):
+    tested = batching.Batcher(max_calls=0, window=0)
+    idle = tested.start_call("idle-key")
+    idle.end_call()
+    running = tested.start_call("running-key")
+
+    tested.close_all()
+
+    assert logged == [idle]
+
+    running.end_call()
+
+    assert logged == [idle, running]
+
+    tested.close_all()
+
+    assert logged == [idle, running]
+
+
+def test_window__expired__batch_logged(monkeypatch):
+    logged = threading.Event()
+    monkeypatch.setattr(batching, "_new_chain", lambda key, others: "the-chain")
+    monkeypatch.setattr(batching, "_log", lambda batch: logged.set())
+    tested = batching.Batcher(max_calls=0, window=0.01)
+
+    batch = tested.start_call(None)
+    batch.end_call()
+
+    assert logged.wait(timeout=10)
+    assert tested.start_call(None) is not batch
+
+
+def test_autolog_session__calls_batched_by_session_key__batch_logged_on_exit(
+    logged, monkeypatch
+):
+    monkeypatch.setattr(batching, "_BATCHER", batching.Batcher(max_calls=0, window=0))
+
+    with batching.autolog_session("the-key"):
+        assert batching.enabled()
+        batch = batching.start_call()
+        batch.end_call()
+
+        assert batch.key == "the-key"
+        assert logged == []
+
+    assert logged == [batch]
+
+
+def test_enabled__no_session__batch_limits_not_configured__False(
+    monkeypatch, patch_module
+):
+    patch_module(batching, "config")
+
+    with Scenario() as s:
+        s.config.autologging_batch_max_calls() >> 0
+        s.config.autologging_batch_window() >> 0
+
+        assert batching.enabled() is False
+
+
+def test_log__outputs_set__message_built_in_background(patch_module):
+    patch_module(batching, "message_processing")
+    patch_module(batching, "chains_api")
+
+    with Scenario() as s:
+        batch = batching.Batch(batcher=None, key=None, chain=Fake("chain_instance"))
+        batch.calls = 3
+        s.chain_instance.set_outputs(outputs={"calls": 3})
+        s.message_processing.process_deferred(
+            saveargument.SaveArgument("build_message")
+        )
+
+        batching._log(batch)
+
+        s.chains_api.build_sampled_message(Fake("chain_instance")) >> "the-message"
+
+        assert saveargument.saved()["build_message"]() == "the-message"
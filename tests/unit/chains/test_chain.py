@@ -165,6 +165,102 @@ def test_as_dict__input_and_output_are_not_dicts__input_and_output_turned_into_d
     assert result["chain_outputs"] == {"output": "the-outputs"}
 
 
+def test_as_dict__lazy_nodes__node_objects_returned_without_conversion():
+    tested = _construct("the-inputs", None)
+    tested.track_node(Fake("node1"))
+    tested.track_node(Fake("node2"))
+
+    with Scenario() as s:
+        _prepare_fake_timer(None, None, None)
+        result = tested.as_dict(lazy_nodes=True)
+
+    assert result["chain_nodes"] == [Fake("node1"), Fake("node2")]
+
+
+def _construct_incremental(segment_size, segment_exporter):
+    with Scenario() as s:
+        s.context.Context() >> Fake("context")
+        s.datetimes.Timer() >> Fake("timer")
+        s.timer.start()
+        tested = chain.Chain(
+            inputs="the-inputs",
+            metadata=None,
+            experiment_info="experiment-info",
+            experiment_ref="the-experiment-ref",
+            segment_size=segment_size,
+            segment_exporter=segment_exporter,
+        )
+
+    assert tested.experiment_ref == "the-experiment-ref"
+
+    return tested
+
+
+class _Node:
+    def __init__(self, id):
+        self.id = id
+
+
+def test_node_ended__segment_size_reached__ended_nodes_exported_running_nodes_kept():
+    exported = []
+
+    def exporter(chain_, nodes, index):
+        exported.append((chain_, nodes, index))
+        return "segment-%d" % index
+
+    tested = _construct_incremental(segment_size=2, segment_exporter=exporter)
+    parent, child1, child2, child3 = _Node(1), _Node(2), _Node(3), _Node(4)
+    for node in [parent, child1, child2, child3]:
+        tested.track_node(node)
+
+    tested.node_ended(child1)
+    assert exported == []
+
+    tested.node_ended(child2)
+    assert exported == [(tested, [child1, child2], 0)]
+
+    tested.node_ended(child3)
+    tested.node_ended(parent)
+    assert exported[1] == (tested, [parent, child3], 1)
+
+    tested.track_node(_Node(5))
+    with Scenario() as s:
+        _prepare_fake_timer(None, None, None)
+        result = tested.as_dict(lazy_nodes=True)
+
+    assert [node.id for node in result["chain_nodes"]] == [5]
+    assert result["chain_segments"] == ["segment-0", "segment-1"]
+
+
+def test_node_ended__exporter_failed__segment_not_listed_in_chain_segments():
+    tested = _construct_incremental(segment_size=1, segment_exporter=lambda *args: None)
+    node = _Node(1)
+    tested.track_node(node)
+
+    tested.node_ended(node)
+
+    with Scenario() as s:
+        _prepare_fake_timer(None, None, None)
+        result = tested.as_dict(lazy_nodes=True)
+
+    assert result["chain_nodes"] == []
+    assert "chain_segments" not in result
+
+
+def test_node_ended__incremental_export_disabled__nodes_kept_until_the_end():
+    tested = _construct("the-inputs", None)
+    node = _Node(1)
+    tested.track_node(node)
+
+    tested.node_ended(node)
+
+    with Scenario() as s:
+        _prepare_fake_timer(None, None, None)
+        result = tested.as_dict(lazy_nodes=True)
+
+    assert result["chain_nodes"] == [node]
+
+
 def _prepare_fake_timer(start_timestamp, end_timestamp, duration):
     timer = Fake("timer")
     timer.start_timestamp = start_timestamp
@@ -172,6 +268,41 @@ def _prepare_fake_timer(start_timestamp, end_timestamp, duration):
     timer.duration = duration
 
 
+def test_api_end__outputs_set_later__timer_stopped_only_once():
+    tested = _construct({"input-key": "input-value"}, metadata=None)
+
+    with Scenario() as s:
+        s.timer.stop()
+        tested.__api__end__()
+
+    with Scenario() as s:
+        s.deepmerge.deepmerge({}, {"meta-key": "meta-value"}) >> "merged-metadata"
+        tested.__api__set_outputs__({"output-key": "output-value"}, {"meta-key": "meta-value"})
+
+    _prepare_fake_timer(10, 25, 15)
+    assert tested.as_dict()["chain_outputs"] == {"output-key": "output-value"}
+    assert tested.as_dict()["metadata"] == "merged-metadata"
+
+
+def test_usage_metrics__deferred_nodes_resolved_once__usage_of_chain_returned():
+    tested = _construct({"input-key": "input-value"}, metadata=None)
+    node = Fake("node")
+    tested.__api__track_deferred_node__(node)
+    tested.usage.calls = 1
+    tested.usage.total_tokens = 12
+
+    with Scenario() as s:
+        s.node.__api__resolve_outputs__()
+
+        assert tested.usage_metrics() == {
+            "usage.prompt_tokens": 0,
+            "usage.completion_tokens": 0,
+            "usage.total_tokens": 12,
+        }
+
+    assert tested.usage_metrics()["usage.total_tokens"] == 12
+
+
 def test_generate_node_name__names_are_generated_with_uniqie_category_counter():
     NOT_DEFINED = None
 
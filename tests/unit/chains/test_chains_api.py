@@ -1,23 +1,20 @@
-import io
-import json
-
 import box
 import pytest
 from testix import *
 
 from comet_llm import llm_result
-from comet_llm.chains import api
+from comet_llm.chains import api, version
 
 
 @pytest.fixture(autouse=True)
 def mock_imports(patch_module):
-    patch_module(api, "io")
     patch_module(api, "chain")
     patch_module(api, "state")
     patch_module(api, "convert")
     patch_module(api, "experiment_info")
-    patch_module(api, "experiment_api")
+    patch_module(api, "message_processing")
     patch_module(api, "app")
+    patch_module(api, "sampling")
 
 
 def test_start_chain__happyflow():
@@ -33,11 +30,17 @@ def test_start_chain__happyflow():
             "project-name",
             api_key_not_found_message=MESSAGE,
         )>> "experiment-info"
+        s.sampling.head_sampled(None) >> True
         s.chain.Chain(
             inputs="the-inputs",
             metadata="the-metadata",
             experiment_info="experiment-info",
             tags="the-tags",
+            experiment_ref=None,
+            segment_size=0,
+            segment_exporter=None,
+            sampled=True,
+            sampling_override=None,
         ) >> "the-chain"
         s.state.set_global_chain("the-chain")
 
@@ -51,6 +54,56 @@ def test_start_chain__happyflow():
         )
 
 
+def test_start_chain__incremental_export_enabled__chain_exports_segments(patch_module):
+    patch_module(api, "config")
+
+    with Scenario() as s:
+        s.experiment_info.get(
+            None,
+            None,
+            None,
+            api_key_not_found_message=IgnoreArgument(),
+        )>> "experiment-info"
+        s.config.chain_export_segment_size() >> 50
+        s.sampling.head_sampled(None) >> True
+        s.message_processing.experiment_ref() >> "the-experiment-ref"
+        s.chain.Chain(
+            inputs="the-inputs",
+            metadata=None,
+            experiment_info="experiment-info",
+            tags=None,
+            experiment_ref="the-experiment-ref",
+            segment_size=50,
+            segment_exporter=api.export_segment,
+            sampled=True,
+            sampling_override=None,
+        ) >> "the-chain"
+        s.state.set_global_chain("the-chain")
+
+        api.start_chain(inputs="the-inputs")
+
+
+def test_export_segment__segment_message_put_into_upload_queue():
+    experiment_info = box.Box(api_key="api-key", workspace="the-workspace", project_name="project-name")
+
+    with Scenario() as s:
+        chain_ = Fake("the_chain", experiment_info=experiment_info, experiment_ref="the-experiment-ref")
+        s.message_processing.TraceMessage(
+            experiment_info=experiment_info,
+            trace_data={
+                "version": version.ASSET_FORMAT_VERSION,
+                "chain_segment": 3,
+                "chain_nodes": ["node-1", "node-2"],
+            },
+            category="chain",
+            experiment_ref="the-experiment-ref",
+            segment_index=3,
+        ) >> Fake("segment_message", asset_name="segment-asset-name")
+        s.message_processing.process_in_background(Fake("segment_message"))
+
+        assert api.export_segment(chain_, ["node-1", "node-2"], 3) == "segment-asset-name"
+
+
 def test_end_chain__happyflow():
     experiment_info = box.Box(api_key="api-key", workspace="the-workspace", project_name="project-name")
 
@@ -66,36 +119,33 @@ def test_end_chain__happyflow():
             "global_chain",
             experiment_info=experiment_info,
             tags="the-tags",
-            others={"other-name-1": "other-value-1", "other-name-2": "other-value-2"}
+            others={"other-name-1": "other-value-1", "other-name-2": "other-value-2"},
+            experiment_ref="the-experiment-ref",
+            sampled=True,
+            sampling_override=None,
+            exported_segments=[],
         )
         s.global_chain.set_outputs(outputs="the-outputs", metadata="the-metadata")
-        s.global_chain.as_dict() >> CHAIN_DICT
-
-        s.experiment_api.ExperimentAPI.create_new(
-            api_key="api-key",
-            workspace="the-workspace",
-            project_name="project-name"
-        ) >> Fake("experiment_api_instance", project_url="project-url", id="experiment-id")
+        s.global_chain.as_dict(lazy_nodes=True) >> CHAIN_DICT
+        s.global_chain.usage_metrics() >> {"usage.total_tokens": 12}
 
-        s.experiment_api_instance.log_tags("the-tags")
-
-        s.io.StringIO(json.dumps(CHAIN_DICT)) >> "asset-data"
-        s.experiment_api_instance.log_asset_with_io(
-            name="comet_llm_data.json",
-            file="asset-data",
-            asset_type="llm_data",
-        )
-        s.experiment_api_instance.log_metric(name="chain_duration", value="chain-duration")
         s.convert.chain_metadata_to_flat_parameters(
             "the-metadata",
         ) >> {"parameter-key-1": "value-1", "parameter-key-2": "value-2"}
-
-        s.experiment_api_instance.log_parameter("parameter-key-1", "value-1")
-        s.experiment_api_instance.log_parameter("parameter-key-2", "value-2")
-        s.experiment_api_instance.log_other("other-name-1", "other-value-1")
-        s.experiment_api_instance.log_other("other-name-2", "other-value-2")
-
-        s.app.SUMMARY.add_log("project-url", "chain")
+        s.message_processing.TraceMessage(
+            experiment_info=experiment_info,
+            trace_data=CHAIN_DICT,
+            category="chain",
+            tags="the-tags",
+            metrics={"chain_duration": "chain-duration", "usage.total_tokens": 12},
+            parameters={"parameter-key-1": "value-1", "parameter-key-2": "value-2"},
+            others={"other-name-1": "other-value-1", "other-name-2": "other-value-2"},
+            experiment_ref="the-experiment-ref",
+        ) >> Fake("the_message", trace_data=CHAIN_DICT)
+        s.sampling.tail_sampled(CHAIN_DICT, None) >> True
+        s.message_processing.process(Fake("the_message")) >> llm_result.LLMResult(
+            id="experiment-id", project_url="project-url"
+        )
 
         result = api.end_chain(
             outputs="the-outputs",
@@ -104,3 +154,63 @@ def test_end_chain__happyflow():
 
         assert result == llm_result.LLMResult(id="experiment-id", project_url="project-url")
 
+
+def test_start_chain__chain_not_head_sampled__chain_does_not_export_segments(patch_module):
+    patch_module(api, "config")
+
+    with Scenario() as s:
+        s.experiment_info.get(
+            None,
+            None,
+            None,
+            api_key_not_found_message=IgnoreArgument(),
+        )>> "experiment-info"
+        s.config.chain_export_segment_size() >> 50
+        s.sampling.head_sampled(False) >> False
+        s.chain.Chain(
+            inputs="the-inputs",
+            metadata=None,
+            experiment_info="experiment-info",
+            tags=None,
+            experiment_ref=None,
+            segment_size=50,
+            segment_exporter=None,
+            sampled=False,
+            sampling_override=False,
+        ) >> "the-chain"
+        s.state.set_global_chain("the-chain")
+
+        api.start_chain(inputs="the-inputs", sampled=False)
+
+
+def test_log_chain__chain_not_head_sampled__nothing_logged():
+    with Scenario() as s:
+        chain_ = Fake("the_chain", sampled=False)
+        s.sampling.sampled_out("chain")
+
+        assert api.log_chain(chain_) is None
+
+
+def test_build_sampled_message__tail_sampled_out__None_returned(patch_module):
+    patch_module(api, "build_message")
+
+    with Scenario() as s:
+        chain_ = Fake("the_chain", sampled=True, sampling_override=True, exported_segments=[])
+        s.build_message(chain_) >> Fake("the_message", trace_data="the-trace-data")
+        s.sampling.tail_sampled("the-trace-data", False) >> False
+        s.sampling.sampled_out("chain")
+
+        assert api.build_sampled_message(chain_, sampled=False) is None
+
+
+def test_build_sampled_message__segments_already_exported__message_always_kept(patch_module):
+    patch_module(api, "build_message")
+
+    with Scenario() as s:
+        chain_ = Fake(
+            "the_chain", sampled=True, sampling_override=None, exported_segments=["segment"]
+        )
+        s.build_message(chain_) >> Fake("the_message", trace_data="the-trace-data")
+        s.sampling.tail_sampled("the-trace-data", True) >> True
+
+        assert api.build_sampled_message(chain_) is Fake("the_message")
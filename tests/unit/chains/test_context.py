@@ -1,3 +1,6 @@
+import asyncio
+import sys
+
 import box
 import pytest
 from testix import *
@@ -36,3 +39,66 @@ def test_current__spans_added_and_popped__span_ids_returned_without_popped_one()
     tested.pop()
 
     assert tested.current() == ["span-id-1"]
+
+
+def test_current_node__spans_added__node_linked_to_parent_node():
+    tested = context.Context()
+    tested.add("span-id-1")
+    parent = tested.current_node()
+    tested.add("span-id-2")
+
+    assert tested.current_node().span_id == "span-id-2"
+    assert tested.current_node().parent is parent
+
+
+def test_current_node__no_spans__None_returned():
+    assert context.Context().current_node() is None
+
+
+def test_node_ids__sibling_spans__share_parent_node():
+    tested = context.Context()
+    tested.add("parent")
+    tested.add("child-1")
+    child_1 = tested.current_node()
+    tested.pop()
+    tested.add("child-2")
+    child_2 = tested.current_node()
+
+    assert child_1.parent is child_2.parent
+    assert context.node_ids(child_1) == ["parent", "child-1"]
+    assert context.node_ids(child_2) == ["parent", "child-2"]
+    assert context.node_ids(None) == []
+
+
+@pytest.mark.skipif(
+    sys.version_info < (3, 7), reason="contextvars backport is not task-local"
+)
+def test_current_node__spans_added_in_concurrent_asyncio_tasks__every_task_has_own_stack():
+    tested = context.Context()
+    tested.add("parent")
+
+    async def task(span_id):
+        tested.add(span_id)
+        await asyncio.sleep(0.01)
+        result = tested.current()
+        tested.pop()
+        return result
+
+    async def main():
+        return await asyncio.gather(task("child-1"), task("child-2"))
+
+    loop = asyncio.new_event_loop()
+    try:
+        result = loop.run_until_complete(main())
+    finally:
+        loop.close()
+
+    assert result == [["parent", "child-1"], ["parent", "child-2"]]
+    assert tested.current() == ["parent"]
+
+
+def test_current_node__span_added_to_another_context__not_visible():
+    tested = context.Context()
+    context.Context().add("span-of-another-chain")
+
+    assert tested.current_node() is None
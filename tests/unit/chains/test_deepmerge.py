@@ -110,3 +110,26 @@ def test_deepmerge__recursion_limit_not_exceeded__merging_performed_as_usual():
             }
         }
     }
+
+
+def test_deepmerge__arguments_not_modified_and_unchanged_subtrees_shared():
+    unchanged = {"b": {"c": "c-value"}}
+    updated = {"e": "e-value"}
+    dict1 = {"a": unchanged, "d": updated}
+    dict2 = {"d": {"f": "f-value"}}
+
+    result = deepmerge.deepmerge(dict1, dict2)
+
+    assert result == {"a": {"b": {"c": "c-value"}}, "d": {"e": "e-value", "f": "f-value"}}
+    assert dict1 == {"a": {"b": {"c": "c-value"}}, "d": {"e": "e-value"}}
+    assert dict2 == {"d": {"f": "f-value"}}
+    assert result["a"] is unchanged
+    assert result["d"] is not updated
+
+
+def test_deepmerge__key_collision__collision_logged(caplog):
+    caplog.set_level("DEBUG", logger=deepmerge.LOGGER.name)
+
+    deepmerge.deepmerge({"a": "value-1"}, {"a": "value-2"})
+
+    assert "a" in caplog.text and "value-1" in caplog.text and "value-2" in caplog.text
@@ -3,7 +3,7 @@ import pytest
 from testix import *
 from testix import saveargument
 
-from comet_llm.chains import span
+from comet_llm.chains import context, span
 from comet_llm.exceptions import CometLLMException
 
 
@@ -69,7 +69,7 @@ def test_api_start__happyflow():
 
     with Scenario() as s:
         s.chain.track_node(tested)
-        s.chain.context.current() >> "parent-ids"
+        s.chain.context.current_node() >> context.ContextNode("parent-id", None)
         s.chain.generate_node_name("the-category") >> "the-name"
         s.timer.start()
         s.chain.context.add("the-id")
@@ -78,15 +78,40 @@ def test_api_start__happyflow():
 
         tested_data = tested.as_dict()
 
-        assert tested_data["parent_ids"] == "parent-ids"
+        assert tested_data["parent_ids"] == ["parent-id"]
         assert tested_data["name"] == "the-name"
 
 
+def test_api_detach__span_ended_detached__context_popped_once():
+    NOT_DEFINED = None
+    tested = _construct(
+        inputs=NOT_DEFINED,
+        name="the-name",
+        category="the-category",
+        metadata=NOT_DEFINED,
+        id="the-id",
+    )
+
+    with Scenario() as s:
+        s.chain.track_node(tested)
+        s.chain.context.current_node() >> None
+        s.timer.start()
+        s.chain.context.add("the-id")
+        tested.__api__start__(Fake("chain"))
+
+        s.chain.context.pop()
+        tested.__api__detach__()
+
+        s.timer.stop()
+        s.chain.node_ended(tested)
+        tested.__api__end__(detached=True)
+
+
 def _use_context_manager_scenario(
         s,
         tested,
         id,
-        parent_ids,
+        parent_node,
         start_timestamp,
         end_timestamp,
         duration
@@ -96,7 +121,7 @@ def _use_context_manager_scenario(
     s.state.get_global_chain() >> global_chain
 
     s.global_chain.track_node(tested)
-    s.global_chain.context.current() >> parent_ids
+    s.global_chain.context.current_node() >> parent_node
 
     s.timer.start()
     s.global_chain.context.add(id)
@@ -104,6 +129,7 @@ def _use_context_manager_scenario(
     with tested:
         s.timer.stop()
         s.global_chain.context.pop()
+        s.global_chain.node_ended(tested)
 
     timer = Fake("timer")
     timer.duration = duration
@@ -150,7 +176,13 @@ def test_lifecycle__happyflow():
 
     with Scenario() as s:
         _use_context_manager_scenario(
-            s, tested, "the-id", "parent-ids", START_TIMESTAMP, END_TIMESTAMP, DURATION
+            s,
+            tested,
+            "the-id",
+            context.ContextNode("parent-id-2", context.ContextNode("parent-id-1", None)),
+            START_TIMESTAMP,
+            END_TIMESTAMP,
+            DURATION,
         )
         assert tested.as_dict() == {
             "id": "the-id",
@@ -161,7 +193,7 @@ def test_lifecycle__happyflow():
             "duration": DURATION,
             "start_timestamp": START_TIMESTAMP,
             "end_timestamp": END_TIMESTAMP,
-            "parent_ids": "parent-ids",
+            "parent_ids": ["parent-id-1", "parent-id-2"],
             "metadata": {"metadata-key": "value-1"},
         }
 
@@ -187,6 +219,80 @@ def test_set_output__new_metadata_is_not_None__existing_metadata_is_merged_with_
     }
 
 
+def test_as_dict__outputs_deferred__resolved_once_when_converted():
+    NOT_DEFINED = None
+    calls = []
+
+    def resolve():
+        calls.append(None)
+        return {"output-key": "output-value"}, {"new-key": "new-value"}
+
+    tested = _construct(
+        inputs=NOT_DEFINED,
+        name="some-name",
+        category=NOT_DEFINED,
+        metadata={"existing-key": "existing-value"},
+        id=NOT_DEFINED,
+    )
+    tested.__api__defer_outputs__(resolve)
+
+    assert calls == []
+    assert tested.as_dict()["outputs"] == {"output-key": "output-value"}
+    assert tested.as_dict()["metadata"] == {
+        "existing-key": "existing-value",
+        "new-key": "new-value",
+    }
+    assert len(calls) == 1
+
+
+def test_as_dict__deferred_outputs_failed__span_converted_without_outputs(monkeypatch):
+    NOT_DEFINED = None
+    monkeypatch.setattr(span, "LOGGER", Fake("logger"))
+
+    def resolve():
+        raise Exception("parsing failed")
+
+    tested = _construct(
+        inputs=NOT_DEFINED,
+        name="some-name",
+        category=NOT_DEFINED,
+        metadata=NOT_DEFINED,
+        id=NOT_DEFINED,
+    )
+    tested.__api__defer_outputs__(resolve)
+
+    with Scenario() as s:
+        s.logger.debug(IgnoreArgument(), exc_info=True)
+
+        assert tested.as_dict()["outputs"] == {"output": None}
+
+
+def test_set_outputs__span_started_in_chain__usage_recorded_in_chain(patch_module):
+    NOT_DEFINED = None
+    patch_module(span, "usage")
+
+    tested = _construct(
+        inputs=NOT_DEFINED,
+        name="some-name",
+        category=NOT_DEFINED,
+        metadata={"model": "the-model"},
+        id="the-id",
+    )
+
+    with Scenario() as s:
+        chain = Fake("chain")
+        chain.usage = "chain-usage"
+        chain.context = context.Context()
+        s.chain.track_node(tested)
+        s.timer.start()
+        tested.__api__start__(chain)
+
+        s.usage.model_name({"model": "the-model", "usage": "the-usage"}) >> "the-model"
+        s.usage.record("chain-usage", {"usage": "the-usage"}, "the-model")
+
+        tested.set_outputs(outputs=NOT_DEFINED, metadata={"usage": "the-usage"})
+
+
 def test_span__no_chain_started_raising_exceptions_disabled__wont_connect_to_chain():
     with Scenario() as s:
         s.state.get_new_id() >> "example_id"
@@ -239,3 +345,16 @@ def test_span__no_chain_started_raising_exceptions_enabled__exception_raised():
             inputs={"input": "input"},
         ) as tested_span:
                 tested_span.set_outputs({"outputs": "outputs"})
+
+
+def test_span__chain_not_sampled__wont_connect_to_chain():
+    with Scenario() as s:
+        s.state.get_new_id() >> "example_id"
+        s.datetimes.Timer() >> box.Box(duration=None, start_timestamp=None, end_timestamp=None)
+
+        s.state.get_global_chain() >> Fake("global_chain", sampled=False)
+
+        with span.Span(category="llm-call", inputs={"input": "input"}) as tested_span:
+            pass
+
+    assert tested_span.as_dict()["parent_ids"] is None
@@ -1,57 +1,114 @@
+import asyncio
+import gc
+import sys
+import threading
+import weakref
+
 import pytest
-from testix import *
 
-from comet_llm import exceptions
 from comet_llm.chains import state
 
 
-@pytest.fixture(autouse=True)
-def mock_imports(patch_module):
-    patch_module(state, "thread_context_registry")
-
-
-def _construct():
-    with Scenario() as s:
-        s.thread_context_registry.ThreadContextRegistry() >> Fake("registry")
-
-        tested = state.State()
-
-    return tested
-
 def test_new_id__happyflow():
-    tested = _construct()
+    tested = state.State()
 
     assert tested.new_id() == 1
     assert tested.new_id() == 2
 
 
 def test_chain_exists__chain_was_not_set__returned_False():
-    tested = _construct()
+    tested = state.State()
 
-    with Scenario() as s:
-        s.registry.get("global-chain") >> None
-        assert tested.chain_exists() is False
+    assert tested.chain_exists() is False
 
 
 def test_chain_exists__chain_was_set__returned_True():
-    tested = _construct()
+    tested = state.State()
+    tested.chain = "the-chain"
+
+    assert tested.chain_exists() is True
+
+
+def test_chain_property__set_and_get__happyflow():
+    tested = state.State()
+    tested.chain = "the-chain"
+
+    assert tested.chain == "the-chain"
+
+
+def test_chain_property__set_in_another_thread__not_visible_in_this_thread():
+    tested = state.State()
+    tested.chain = "main-thread-chain"
+    results = {}
+
+    def thread_target():
+        results["before"] = tested.chain
+        tested.chain = "other-thread-chain"
+        results["after"] = tested.chain
+
+    thread = threading.Thread(target=thread_target)
+    thread.start()
+    thread.join()
+
+    assert results == {"before": None, "after": "other-thread-chain"}
+    assert tested.chain == "main-thread-chain"
+
+
+@pytest.mark.skipif(
+    sys.version_info < (3, 7), reason="contextvars backport is not task-local"
+)
+def test_chain_property__set_in_concurrent_asyncio_tasks__every_task_has_own_chain():
+    tested = state.State()
+
+    async def task(name):
+        tested.chain = name
+        await asyncio.sleep(0.01)
+        return tested.chain
+
+    async def main():
+        return await asyncio.gather(task("chain-1"), task("chain-2"))
+
+    loop = asyncio.new_event_loop()
+    try:
+        result = loop.run_until_complete(main())
+    finally:
+        loop.close()
+
+    assert result == ["chain-1", "chain-2"]
+
+
+def test_new_id__called_from_many_threads__all_ids_unique():
+    tested = state.State()
+    ids = []
+
+    def thread_target():
+        ids.extend(tested.new_id() for _ in range(1000))
+
+    threads = [threading.Thread(target=thread_target) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(ids) == list(range(1, 8001))
 
-    with Scenario() as s:
-        s.registry.get("global-chain") >> "the-chain"
-        assert tested.chain_exists() is True
 
+class _Chain:
+    pass
 
-def test_chain_property_get__happyflow():
-    tested = _construct()
 
-    with Scenario() as s:
-        s.registry.get("global-chain") >> "the-chain"
-        assert tested.chain == "the-chain"
+def test_chain_property__set_in_finished_thread__chain_released():
+    tested = state.State()
+    chain_references = []
 
+    def thread_target():
+        chain_ = _Chain()
+        chain_references.append(weakref.ref(chain_))
+        tested.chain = chain_
 
-def test_chain_property_set__happyflow():
-    tested = _construct()
+    thread = threading.Thread(target=thread_target)
+    thread.start()
+    thread.join()
+    gc.collect()
 
-    with Scenario() as s:
-        s.registry.add("global-chain", "the-chain")
-        tested.chain = "the-chain"
+    assert chain_references[0]() is None
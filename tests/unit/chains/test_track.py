@@ -0,0 +1,301 @@
+import asyncio
+import gc
+import weakref
+
+import pytest
+
+from comet_llm.chains import chain, span, state, track
+
+
+@pytest.fixture
+def chain_():
+    result = chain.Chain(inputs={}, metadata=None, experiment_info="experiment-info")
+    state.set_global_chain(result)
+    yield result
+    state.set_global_chain(None)
+
+
+def _nodes(chain_):
+    return chain_.as_dict()["chain_nodes"]
+
+
+def _run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_track__no_chain__function_called_without_span():
+    @track.track
+    def f(x):
+        return x + 1
+
+    assert f(1) == 2
+
+
+def test_track__chain_not_sampled__function_called_without_span():
+    not_sampled = chain.Chain(
+        inputs={}, metadata=None, experiment_info="experiment-info", sampled=False
+    )
+    state.set_global_chain(not_sampled)
+
+    @track.track
+    def f(x):
+        return x + 1
+
+    try:
+        assert f(1) == 2
+    finally:
+        state.set_global_chain(None)
+    assert not_sampled.as_dict()["chain_nodes"] == []
+
+
+def test_track__function__span_with_arguments_and_result_logged(chain_):
+    @track.track
+    def f(x, y=2, **options):
+        return x + y
+
+    assert f(1, y=3, temperature=0.5) == 4
+
+    (node,) = _nodes(chain_)
+    assert node["name"] == "f"
+    assert node["category"] == "function"
+    assert node["inputs"] == {"x": 1, "y": 3, "temperature": 0.5}
+    assert node["outputs"] == {"output": 4}
+    assert node["parent_ids"] == []
+    assert node["duration"] is not None
+
+
+def test_track__method__self_not_captured(chain_):
+    class Retriever:
+        @track.track(name="retrieve", category="retrieval", metadata={"k": 2})
+        def __call__(self, query):
+            return ["doc-1", "doc-2"]
+
+    Retriever()("the-query")
+
+    (node,) = _nodes(chain_)
+    assert node["name"] == "retrieve"
+    assert node["category"] == "retrieval"
+    assert node["metadata"] == {"k": 2}
+    assert node["inputs"] == {"query": "the-query"}
+    assert node["outputs"] == {"output": ["doc-1", "doc-2"]}
+
+
+def test_track__capture_disabled_and_arguments_not_json_encodable__nothing_captured(
+    chain_,
+):
+    @track.track(capture_inputs=False, capture_output=False)
+    def f(client):
+        return client
+
+    f(object())
+
+    (node,) = _nodes(chain_)
+    assert node["inputs"] == {}
+    assert node["outputs"] == {"output": None}
+
+
+def test_track__arguments_not_json_encodable__repr_captured(chain_):
+    class Client:
+        def __repr__(self):
+            return "Client()"
+
+    @track.track
+    def f(client, options):
+        return (client, 1)
+
+    f(Client(), {1: Client()})
+
+    (node,) = _nodes(chain_)
+    assert node["inputs"] == {"client": "Client()", "options": {"1": "Client()"}}
+    assert node["outputs"] == {"output": ["Client()", 1]}
+
+
+def test_track__exception_raised__span_ended_and_exception_reraised(chain_):
+    @track.track
+    def f():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        f()
+
+    (node,) = _nodes(chain_)
+    assert node["end_timestamp"] is not None
+    assert chain_.context.current() == []
+
+
+def test_track__nested_calls__inner_span_is_child_of_outer_one(chain_):
+    @track.track
+    def inner():
+        return "inner"
+
+    @track.track
+    def outer():
+        return inner()
+
+    outer()
+
+    outer_node, inner_node = sorted(_nodes(chain_), key=lambda node: node["id"])
+    assert outer_node["name"] == "outer"
+    assert inner_node["parent_ids"] == [outer_node["id"]]
+
+
+def test_track__coroutine_function__span_logged(chain_):
+    @track.track
+    async def f(x):
+        await asyncio.sleep(0)
+        return x * 2
+
+    assert _run(f(2)) == 4
+
+    (node,) = _nodes(chain_)
+    assert node["inputs"] == {"x": 2}
+    assert node["outputs"] == {"output": 4}
+
+
+def test_track__generator_function__yielded_items_logged_and_span_active_only_inside(
+    chain_,
+):
+    @track.track
+    def f(count):
+        for i in range(count):
+            with span.Span(inputs={}, category="inner"):
+                pass
+            yield i
+
+    items = []
+    for item in f(2):
+        items.append(item)
+        with span.Span(inputs={}, category="caller"):
+            pass
+
+    assert items == [0, 1]
+    nodes = {node["id"]: node for node in _nodes(chain_)}
+    (generator_node,) = [node for node in nodes.values() if node["name"] == "f"]
+    assert generator_node["outputs"] == {"output": [0, 1]}
+    assert generator_node["inputs"] == {"count": 2}
+    for node in nodes.values():
+        if node["category"] == "inner":
+            assert node["parent_ids"] == [generator_node["id"]]
+        if node["category"] == "caller":
+            assert node["parent_ids"] == []
+    assert chain_.context.current() == []
+
+
+def test_track__generator_closed_early__span_ended_with_consumed_items(chain_):
+    @track.track
+    def f():
+        yield 1
+        yield 2
+
+    generator = f()
+    assert next(generator) == 1
+    generator.close()
+
+    (node,) = _nodes(chain_)
+    assert node["end_timestamp"] is not None
+    assert chain_.context.current() == []
+
+
+def test_track__span_started_between_generator_creation_and_iteration__not_its_child(
+    chain_,
+):
+    @track.track
+    def f():
+        yield 1
+
+    @track.track
+    def other():
+        return 2
+
+    generator = f()
+    other()
+    assert list(generator) == [1]
+
+    nodes = {node["name"]: node for node in _nodes(chain_)}
+    assert nodes["other"]["parent_ids"] == []
+    assert nodes["f"]["parent_ids"] == []
+    assert chain_.context.current() == []
+
+
+def test_track__generator_never_consumed__no_span_logged(chain_):
+    @track.track
+    def f():
+        yield 1
+
+    generator = f()
+    generator.close()
+
+    @track.track
+    def other():
+        return 2
+
+    other()
+
+    (node,) = _nodes(chain_)
+    assert node["name"] == "other"
+    assert node["parent_ids"] == []
+    assert chain_.context.current() == []
+
+
+def test_track__generator_output_not_captured__yielded_items_not_kept(chain_):
+    class Item:
+        pass
+
+    @track.track(capture_output=False)
+    def f():
+        yield Item()
+        yield Item()
+
+    generator = f()
+    first = weakref.ref(next(generator))
+    next(generator)
+    gc.collect()
+
+    assert first() is None
+    assert list(generator) == []
+    (node,) = _nodes(chain_)
+    assert node["outputs"] == {"output": None}
+
+
+def test_track__generator_send__values_passed_to_generator(chain_):
+    @track.track
+    def f():
+        received = yield "first"
+        yield received
+
+    generator = f()
+    assert next(generator) == "first"
+    assert generator.send("sent") == "sent"
+
+
+def test_track__async_generator_function__yielded_items_logged(chain_):
+    @track.track
+    async def f(count):
+        for i in range(count):
+            await asyncio.sleep(0)
+            yield i
+
+    async def consume():
+        return [item async for item in f(3)]
+
+    assert _run(consume()) == [0, 1, 2]
+
+    (node,) = _nodes(chain_)
+    assert node["outputs"] == {"output": [0, 1, 2]}
+    assert chain_.context.current() == []
+
+
+def test_track__async_generator_never_consumed__no_span_logged(chain_):
+    @track.track
+    async def f():
+        yield 1
+
+    generator = f()
+    _run(generator.aclose())
+
+    assert _nodes(chain_) == []
+    assert chain_.context.current() == []
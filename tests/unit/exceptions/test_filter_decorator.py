@@ -1,3 +1,4 @@
+import asyncio
 import logging
 
 import pytest
@@ -76,3 +77,19 @@ def test_filter__upraising_not_allowed__summary_not_passed_to_filter__function_r
             extra={"show_traceback": True}
         )
         assert f() is None
+
+
+def test_filter__coroutine_function__upraising_not_allowed__exception_info_logged():
+    @filter_decorator.filter(allow_raising=False, summary=Fake("summary"))
+    async def f():
+        raise Exception("some-message")
+
+    with Scenario() as s:
+        s.summary.increment_failed()
+        s.LOGGER.error("some-message", exc_info=True, extra={"show_traceback": True})
+
+        loop = asyncio.new_event_loop()
+        try:
+            assert loop.run_until_complete(f()) is None
+        finally:
+            loop.close()
@@ -0,0 +1,158 @@
+import asyncio
+import io
+import json
+
+import pytest
+import requests
+
+from comet_llm.experiment_api import async_comet_api_client
+
+httpx = pytest.importorskip("httpx")
+
+
+def _run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class FakeClientPool:
+    def __init__(self, handler):
+        self._handler = handler
+
+    def get(self):
+        return httpx.AsyncClient(transport=httpx.MockTransport(self._handler))
+
+
+def test_log_experiment_tags__request_sent_with_authorization_header():
+    requests_sent = []
+
+    def handler(request):
+        requests_sent.append(request)
+        return httpx.Response(200, json={"some-key": "some-value"})
+
+    tested = async_comet_api_client.AsyncCometAPIClient(
+        "api-key", "https://comet.com/clientlib/", FakeClientPool(handler)
+    )
+
+    result = _run(tested.log_experiment_tags("experiment-key", ["tag-1"]))
+
+    assert result == {"some-key": "some-value"}
+    assert str(requests_sent[0].url) == "https://comet.com/api/rest/v2/write/experiment/tags"
+    assert requests_sent[0].headers["Authorization"] == "api-key"
+    assert json.loads(requests_sent[0].content) == {
+        "experimentKey": "experiment-key",
+        "addedTags": ["tag-1"],
+    }
+
+
+def test_log_experiment_asset_with_io__text_io__uploaded_as_bytes():
+    requests_sent = []
+
+    def handler(request):
+        requests_sent.append(request)
+        return httpx.Response(200, content=b"")
+
+    tested = async_comet_api_client.AsyncCometAPIClient(
+        "api-key", "https://comet.com/clientlib/", FakeClientPool(handler)
+    )
+
+    result = _run(
+        tested.log_experiment_asset_with_io(
+            "experiment-key",
+            name="the-name.json",
+            file=io.StringIO('{"asset": "content"}'),
+            asset_type="llm_data",
+        )
+    )
+
+    assert result is None
+    assert b'{"asset": "content"}' in requests_sent[0].content
+    assert requests_sent[0].url.params["fileName"] == "the-name.json"
+
+
+def test_request__error_status_code__converted_to_requests_HTTPError():
+    def handler(request):
+        return httpx.Response(500, json={"sdk_error_code": 123})
+
+    tested = async_comet_api_client.AsyncCometAPIClient(
+        "api-key", "https://comet.com/clientlib/", FakeClientPool(handler)
+    )
+
+    with pytest.raises(requests.HTTPError) as exception_info:
+        _run(tested.log_experiment_tags("experiment-key", ["tag-1"]))
+
+    assert json.loads(exception_info.value.response.text) == {"sdk_error_code": 123}
+
+
+def test_client_pool__same_loop__same_client_returned():
+    tested = async_comet_api_client.AsyncClientPool()
+
+    async def get_twice():
+        return tested.get(), tested.get()
+
+    first, second = _run(get_twice())
+
+    assert first is second
+
+
+def test_client_pool__close__clients_of_open_loops_closed_in_their_loop():
+    tested = async_comet_api_client.AsyncClientPool()
+    loop = asyncio.new_event_loop()
+    closed_loop = asyncio.new_event_loop()
+
+    async def get():
+        return tested.get()
+
+    try:
+        client = loop.run_until_complete(get())
+        closed_loop_client = closed_loop.run_until_complete(get())
+        closed_loop.close()
+
+        tested.close()
+
+        assert client.is_closed
+        assert not closed_loop_client.is_closed
+        assert loop.run_until_complete(get()) is not client
+    finally:
+        loop.close()
+
+
+def test_client_pool__closed_from_its_running_loop__client_closed_by_task():
+    tested = async_comet_api_client.AsyncClientPool()
+
+    async def get_and_close():
+        client = tested.get()
+        tested.close()
+        await asyncio.sleep(0)
+        return client
+
+    assert _run(get_and_close()).is_closed
+
+
+def test_log_experiment_asset_with_stream__big_asset__streamed_chunks_uploaded(monkeypatch):
+    requests_sent = []
+
+    def handler(request):
+        requests_sent.append(request)
+        return httpx.Response(200, content=b"")
+
+    monkeypatch.setattr(async_comet_api_client.config, "asset_compression", lambda: "none")
+    monkeypatch.setattr(async_comet_api_client.config, "asset_compression_threshold", lambda: 0)
+    tested = async_comet_api_client.AsyncCometAPIClient(
+        "api-key", "https://comet.com/clientlib/", FakeClientPool(handler)
+    )
+
+    _run(
+        tested.log_experiment_asset_with_stream(
+            "experiment-key",
+            name="the-name.json",
+            chunks=[b'{"asset": ', b'"content"}'],
+            asset_type="llm_data",
+        )
+    )
+
+    assert requests_sent[0].headers["Transfer-Encoding"] == "chunked"
+    assert b'{"asset": "content"}' in requests_sent[0].content
@@ -0,0 +1,100 @@
+import pytest
+from testix import *
+
+from comet_llm.exceptions import exceptions
+from comet_llm.experiment_api import circuit_breaker
+
+
+@pytest.fixture(autouse=True)
+def mock_imports(patch_module):
+    patch_module(circuit_breaker, "time")
+
+
+def test_record_failure__threshold_not_reached__circuit_closed():
+    tested = circuit_breaker.CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    tested.record_failure()
+    tested.before_request()
+
+
+def test_record_failure__threshold_reached__requests_fail_fast():
+    tested = circuit_breaker.CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    with Scenario() as s:
+        s.time.monotonic() >> 100
+        tested.record_failure()
+        tested.record_failure()
+
+        s.time.monotonic() >> 110
+        with pytest.raises(exceptions.CometLLMException):
+            tested.before_request()
+
+
+def test_record_success__failures_counter_reset():
+    tested = circuit_breaker.CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    tested.record_failure()
+    tested.record_success()
+    tested.record_failure()
+    tested.before_request()
+
+
+def test_before_request__reset_timeout_passed__one_trial_request_let_through():
+    tested = circuit_breaker.CircuitBreaker(failure_threshold=1, reset_timeout=30)
+
+    with Scenario() as s:
+        s.time.monotonic() >> 100
+        tested.record_failure()
+
+        s.time.monotonic() >> 131
+        tested.before_request()
+
+        s.time.monotonic() >> 132
+        with pytest.raises(exceptions.CometLLMException):
+            tested.before_request()
+
+
+def test_record_success__after_trial_request__circuit_closed():
+    tested = circuit_breaker.CircuitBreaker(failure_threshold=1, reset_timeout=30)
+
+    with Scenario() as s:
+        s.time.monotonic() >> 100
+        tested.record_failure()
+        s.time.monotonic() >> 131
+        tested.before_request()
+
+    tested.record_success()
+    tested.before_request()
+    assert not tested.is_open
+
+
+def test_record_failure__threshold_is_zero__circuit_never_opens():
+    tested = circuit_breaker.CircuitBreaker(failure_threshold=0, reset_timeout=30)
+
+    for _ in range(10):
+        tested.record_failure()
+
+    tested.before_request()
+
+
+def test_get__breaker_per_key__failures_of_one_key_dont_open_the_others(
+    monkeypatch,
+):
+    monkeypatch.setattr(
+        circuit_breaker.config, "circuit_breaker_failure_threshold", lambda: 1
+    )
+    circuit_breaker.get.cache_clear()
+
+    failing = circuit_breaker.get(("api-key-1", "https://comet-1/", True))
+    other = circuit_breaker.get(("api-key-2", "https://comet-1/", True))
+
+    with Scenario() as s:
+        s.time.monotonic() >> 100
+        failing.record_failure()
+
+        s.time.monotonic() >> 110
+        with pytest.raises(exceptions.CometLLMException):
+            circuit_breaker.get(("api-key-1", "https://comet-1/", True)).before_request()
+
+    other.before_request()
+    circuit_breaker.get.cache_clear()
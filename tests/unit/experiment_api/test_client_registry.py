@@ -0,0 +1,117 @@
+import functools
+import gc
+
+import pytest
+from testix import *
+
+from comet_llm.experiment_api import client_registry
+
+
+@pytest.fixture(autouse=True)
+def mock_imports(patch_module):
+    patch_module(client_registry, "time")
+
+
+class _Client:
+    def __init__(self, name):
+        self.name = name
+
+    def __eq__(self, other):
+        return self.name == other
+
+    def __hash__(self):
+        return hash(self.name)
+
+
+def _construct(max_size=2, idle_timeout=60):
+    evicted = []
+    tested = client_registry.ClientRegistry(
+        factory=lambda key: _Client("client-%s" % key),
+        max_size=max_size,
+        idle_timeout=idle_timeout,
+        closer=lambda client: functools.partial(evicted.append, client.name),
+    )
+
+    return tested, evicted
+
+
+def test_get__same_key__cached_client_returned():
+    tested, evicted = _construct()
+
+    with Scenario() as s:
+        s.time.monotonic() >> 100
+        assert tested.get("a") == "client-a"
+        s.time.monotonic() >> 101
+        assert tested.get("a") == "client-a"
+
+    assert len(tested) == 1
+    assert evicted == []
+
+
+def test_get__alternating_keys__both_clients_kept():
+    tested, evicted = _construct()
+
+    with Scenario() as s:
+        for now, key in enumerate(["a", "b", "a", "b"]):
+            s.time.monotonic() >> now
+            assert tested.get(key) == "client-%s" % key
+
+    assert evicted == []
+
+
+def test_get__max_size_exceeded__least_recently_used_client_evicted():
+    tested, evicted = _construct(max_size=2)
+
+    with Scenario() as s:
+        for now, key in enumerate(["a", "b", "a", "c"]):
+            s.time.monotonic() >> now
+            tested.get(key)
+
+    assert evicted == ["client-b"]
+    assert len(tested) == 2
+
+
+def test_get__clients_idle_for_too_long__evicted():
+    tested, evicted = _construct(max_size=10, idle_timeout=60)
+
+    with Scenario() as s:
+        s.time.monotonic() >> 0
+        tested.get("a")
+        s.time.monotonic() >> 30
+        tested.get("b")
+        s.time.monotonic() >> 61
+        tested.get("c")
+
+    assert evicted == ["client-a"]
+
+
+def test_clear__all_clients_evicted():
+    tested, evicted = _construct()
+
+    with Scenario() as s:
+        s.time.monotonic() >> 0
+        tested.get("a")
+        s.time.monotonic() >> 1
+        tested.get("b")
+
+    tested.clear()
+
+    assert evicted == ["client-a", "client-b"]
+    assert len(tested) == 0
+
+
+def test_get__evicted_client_still_used__closed_once_released():
+    tested, evicted = _construct(max_size=1)
+
+    with Scenario() as s:
+        s.time.monotonic() >> 0
+        in_use = tested.get("a")
+        s.time.monotonic() >> 1
+        tested.get("b")
+
+    gc.collect()
+    assert evicted == []
+
+    del in_use
+    gc.collect()
+    assert evicted == ["client-a"]
@@ -1,8 +1,16 @@
+import email.parser
+import gzip
+import http.server
+import io
+import json
+import threading
+
 import box
 import pytest
+import requests as real_requests
 from testix import *
 
-from comet_llm.experiment_api import comet_api_client
+from comet_llm.experiment_api import comet_api_client, session_pool
 
 
 @pytest.fixture(autouse=True)
@@ -10,6 +18,7 @@ def mock_imports(patch_module):
     patch_module(comet_api_client, "comet_ml")
     patch_module(comet_api_client, "config")
     patch_module(comet_api_client, "requests")
+    patch_module(comet_api_client, "datetimes")
 
 
 @pytest.fixture
@@ -17,30 +26,197 @@ def mock_rest_api_class(patch_module):
     patch_module(comet_api_client, "CometAPIClient")
 
 
-def test_get__happyflow(mock_rest_api_class):
-    client_instance = Fake("client")
-    tested_function_undecorated = comet_api_client.get.__wrapped__
+def test_get__happyflow(monkeypatch):
+    registry = Fake("registry")
+    monkeypatch.setattr(comet_api_client, "_REGISTRY", registry)
 
     with Scenario() as s:
         s.config.comet_url() >> "comet-url"
-        s.requests.Session() >> "the-session"
         s.config.tls_verification_enabled() >> True
-        s.CometAPIClient("api-key", "comet-url", "the-session") >> client_instance
+        s.registry.get(("api-key", "comet-url", True)) >> "the-client"
+
+        assert comet_api_client.get("api-key") == "the-client"
+
 
-        assert tested_function_undecorated("api-key") is client_instance
+def test_create_client__client_with_its_own_session_pool_created(
+    mock_rest_api_class, patch_module
+):
+    patch_module(comet_api_client, "session_pool")
 
+    with Scenario() as s:
+        s.config.connection_pool_session_scope() >> "thread"
+        s.session_pool.SessionPool(
+            session_factory=comet_api_client._create_session, per_thread=True
+        ) >> "the-session-pool"
+        s.CometAPIClient("api-key", "comet-url", "the-session-pool") >> "the-client"
+
+        assert comet_api_client._create_client(("api-key", "comet-url", True)) == "the-client"
 
-def test_get__tls_verification_disabled__set_session_property_verify_to_False(mock_rest_api_class):
-    client_instance = Fake("client")
-    session = box.Box()
 
-    tested_function_undecorated = comet_api_client.get.__wrapped__
+def test_create_session__pool_configured__adapter_mounted_for_http_and_https():
+    session = Fake("session")
 
     with Scenario() as s:
-        s.config.comet_url() >> "comet-url"
         s.requests.Session() >> session
+        s.config.connection_pool_connections() >> "pool-connections"
+        s.config.connection_pool_maxsize() >> "pool-maxsize"
+        s.requests.adapters.HTTPAdapter(
+            pool_connections="pool-connections",
+            pool_maxsize="pool-maxsize",
+        ) >> "the-adapter"
+        s.session.mount("https://", "the-adapter")
+        s.session.mount("http://", "the-adapter")
+        s.config.connection_pool_keep_alive() >> True
+        s.config.tls_verification_enabled() >> True
+
+        assert comet_api_client._create_session() is session
+
+
+def test_create_session__tls_verification_disabled_keep_alive_disabled__session_configured_accordingly():
+    session = box.Box(headers={}, mount=lambda prefix, adapter: None)
+
+    with Scenario() as s:
+        s.requests.Session() >> session
+        s.config.connection_pool_connections() >> "pool-connections"
+        s.config.connection_pool_maxsize() >> "pool-maxsize"
+        s.requests.adapters.HTTPAdapter(
+            pool_connections="pool-connections",
+            pool_maxsize="pool-maxsize",
+        ) >> "the-adapter"
+        s.config.connection_pool_keep_alive() >> False
         s.config.tls_verification_enabled() >> False
-        s.CometAPIClient("api-key", "comet-url", session) >> client_instance
 
-        assert tested_function_undecorated("api-key") is client_instance
+        assert comet_api_client._create_session() is session
         assert session.verify is False
+        assert session.headers == {"Connection": "close"}
+
+
+def test_log_experiment_parameters__all_parameters_sent_in_one_request():
+    session = Fake("session")
+    tested = comet_api_client.CometAPIClient(
+        "api-key", "https://comet.com/clientlib/", Fake("session_pool")
+    )
+
+    with Scenario() as s:
+        s.datetimes.local_timestamp() >> "the-timestamp"
+        s.session_pool.get() >> session
+        s.session.request(
+            method="POST",
+            url="https://comet.com/clientlib/batch/logger/experiment/parameter",
+            headers={"Authorization": "api-key"},
+            json={
+                "experimentKey": "experiment-key",
+                "values": [
+                    {"parameterName": "name-1", "parameterValue": "value-1", "timestamp": "the-timestamp"},
+                    {"parameterName": "name-2", "parameterValue": "value-2", "timestamp": "the-timestamp"},
+                ],
+            },
+        ) >> Fake("response", content=b"")
+        s.response.raise_for_status()
+
+        assert tested.log_experiment_parameters(
+            "experiment-key", {"name-1": "value-1", "name-2": "value-2"}
+        ) is None
+
+
+class _AssetUploadHandler(http.server.BaseHTTPRequestHandler):
+    received = []
+
+    def do_POST(self):
+        if self.headers.get("Transfer-Encoding") == "chunked":
+            body = self._read_chunked()
+        else:
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+
+        message = email.parser.BytesParser().parsebytes(
+            b"Content-Type: " + self.headers["Content-Type"].encode() + b"\r\n\r\n" + body
+        )
+        self.received.append(
+            (self.headers.get("Content-Encoding"), message.get_payload()[0].get_payload(decode=True))
+        )
+
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _read_chunked(self):
+        body = b""
+        while True:
+            size = int(self.rfile.readline().strip(), 16)
+            chunk = self.rfile.read(size)
+            self.rfile.readline()
+            if size == 0:
+                return body
+            body += chunk
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in_server():
+    _AssetUploadHandler.received = []
+    server = http.server.HTTPServer(("127.0.0.1", 0), _AssetUploadHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize(
+    "algorithm,threshold,expected_encoding",
+    [("gzip", 0, "gzip"), ("gzip", 10 ** 9, None), ("none", 0, None)],
+)
+def test_log_experiment_asset_with_io__stand_in_server__content_round_trips(
+    stand_in_server, algorithm, threshold, expected_encoding
+):
+    ASSET_CONTENT = json.dumps({"chain_nodes": ["the-prompt " * 1000]})
+    tested = comet_api_client.CometAPIClient(
+        "api-key",
+        "http://127.0.0.1:%d/clientlib/" % stand_in_server.server_port,
+        session_pool.SessionPool(session_factory=real_requests.Session, per_thread=False),
+    )
+
+    with Scenario() as s:
+        s.config.asset_compression() >> algorithm
+        s.config.asset_compression_threshold() >> threshold
+
+        tested.log_experiment_asset_with_io(
+            "experiment-key",
+            name="comet_llm_data.json",
+            file=io.StringIO(ASSET_CONTENT),
+            asset_type="llm_data",
+        )
+
+    assert _AssetUploadHandler.received == [
+        (expected_encoding, ASSET_CONTENT.encode("utf-8"))
+    ]
+
+
+def test_log_experiment_asset_with_stream__stand_in_server__chunks_uploaded_as_one_file(
+    stand_in_server,
+):
+    CHUNKS = [b'{"chain_nodes": [', b'"the-prompt"' * 1000, b"]}"]
+    tested = comet_api_client.CometAPIClient(
+        "api-key",
+        "http://127.0.0.1:%d/clientlib/" % stand_in_server.server_port,
+        session_pool.SessionPool(session_factory=real_requests.Session, per_thread=False),
+    )
+
+    with Scenario() as s:
+        s.config.asset_compression() >> "gzip"
+        s.config.asset_compression_threshold() >> 100
+
+        tested.log_experiment_asset_with_stream(
+            "experiment-key",
+            name="comet_llm_data.json",
+            chunks=CHUNKS,
+            asset_type="llm_data",
+        )
+
+    assert _AssetUploadHandler.received == [("gzip", b"".join(CHUNKS))]
@@ -0,0 +1,57 @@
+import gzip
+
+import pytest
+
+from comet_llm.experiment_api import compression
+
+
+def test_encode__data_smaller_than_threshold__bytes_returned_not_compressed():
+    assert compression.encode([b"some-", b"data"], algorithm="gzip", threshold=100) == (
+        b"some-data",
+        None,
+    )
+
+
+def test_encode__compression_disabled__chunks_streamed_not_compressed():
+    body, content_encoding = compression.encode(
+        [b"some-", b"data"], algorithm="none", threshold=0
+    )
+
+    assert content_encoding is None
+    assert b"".join(body) == b"some-data"
+
+
+def test_encode__gzip__chunks_compressed_on_the_fly():
+    body, content_encoding = compression.encode(
+        [b"some-data"] * 100, algorithm="gzip", threshold=0
+    )
+
+    assert content_encoding == "gzip"
+    assert gzip.decompress(b"".join(body)) == b"some-data" * 100
+
+
+def test_encode__zstd__chunks_compressed_on_the_fly():
+    zstandard = pytest.importorskip("zstandard")
+
+    body, content_encoding = compression.encode(
+        [b"some-data"] * 100, algorithm="zstd", threshold=0
+    )
+
+    assert content_encoding == "zstd"
+    assert zstandard.ZstdDecompressor().decompressobj().decompress(b"".join(body)) == (
+        b"some-data" * 100
+    )
+
+
+def test_encode__threshold_reached__chunks_after_threshold_are_not_consumed_in_advance():
+    consumed = []
+
+    def chunks():
+        for i in range(10):
+            consumed.append(i)
+            yield b"0123456789"
+
+    body, _ = compression.encode(chunks(), algorithm="none", threshold=25)
+
+    assert consumed == [0, 1, 2]
+    assert b"".join(body) == b"0123456789" * 10
@@ -1,7 +1,11 @@
+import io
+
+import box
 import pytest
+import requests
 from testix import *
 
-from comet_llm.experiment_api import experiment_api
+from comet_llm.experiment_api import experiment_api, request_exception_wrapper
 
 
 @pytest.fixture(autouse=True)
@@ -34,15 +38,52 @@ def test_log_asset():
     tested = _construct("experiment-key")
 
     with Scenario() as s:
-        s.client_instance.log_experiment_asset_with_io(
+        s.client_instance.log_experiment_asset_with_stream(
             "experiment-key",
             name="the-name",
-            file="the-io",
+            chunks=[b"the-content"],
             asset_type="asset-type",
         )
         tested.log_asset_with_io(
             name="the-name",
-            file="the-io",
+            file=io.StringIO("the-content"),
+            asset_type="asset-type",
+        )
+
+
+def test_log_asset__upload_retried__same_content_sent_again(monkeypatch):
+    monkeypatch.setattr(request_exception_wrapper.retries, "delay", lambda *args: 0)
+    tested = _construct("experiment-key")
+    uploaded = []
+
+    def upload(experiment_key, name, chunks, asset_type):
+        uploaded.append(b"".join(chunks))
+        if len(uploaded) == 1:
+            raise requests.ConnectionError("connection reset")
+
+    tested._client = box.Box(log_experiment_asset_with_stream=upload)
+    tested.log_asset_with_io(
+        name="the-name",
+        file=io.BytesIO(b"the-content"),
+        asset_type="asset-type",
+    )
+
+    assert uploaded == [b"the-content", b"the-content"]
+
+
+def test_log_asset_with_stream():
+    tested = _construct("experiment-key")
+
+    with Scenario() as s:
+        s.client_instance.log_experiment_asset_with_stream(
+            "experiment-key",
+            name="the-name",
+            chunks="the-chunks",
+            asset_type="asset-type",
+        )
+        tested.log_asset_with_stream(
+            name="the-name",
+            chunks="the-chunks",
             asset_type="asset-type",
         )
 
@@ -62,6 +103,24 @@ def test_log_parameter():
         )
 
 
+def test_log_parameters__more_parameters_than_batch_size__sent_in_chunks():
+    tested = _construct("experiment-key")
+
+    with Scenario() as s:
+        s.config.parameters_batch_size() >> 2
+        s.client_instance.log_experiment_parameters(
+            "experiment-key",
+            parameters={"name-1": "value-1", "name-2": "value-2"},
+        )
+        s.client_instance.log_experiment_parameters(
+            "experiment-key",
+            parameters={"name-3": "value-3"},
+        )
+        tested.log_parameters(
+            {"name-1": "value-1", "name-2": "value-2", "name-3": "value-3"}
+        )
+
+
 def test_log_metric():
     tested = _construct("experiment-key")
 
@@ -1,3 +1,4 @@
+import asyncio
 import json
 
 import box
@@ -6,7 +7,7 @@ import requests
 from testix import *
 
 from comet_llm.exceptions import exceptions
-from comet_llm.experiment_api import request_exception_wrapper
+from comet_llm.experiment_api import circuit_breaker, request_exception_wrapper
 
 
 @pytest.fixture(autouse=True)
@@ -15,6 +16,12 @@ def mock_imports(patch_module):
     patch_module(request_exception_wrapper, "failed_response_handler")
 
 
+@pytest.fixture(autouse=True)
+def disabled_circuit_breaker(monkeypatch):
+    breaker = circuit_breaker.CircuitBreaker(failure_threshold=0, reset_timeout=0)
+    monkeypatch.setattr(request_exception_wrapper.circuit_breaker, "for_api_key", lambda api_key: breaker)
+
+
 def test_wrap_no_exceptions():
     @request_exception_wrapper.wrap()
     def f():
@@ -66,3 +73,100 @@ def test_wrap__request_exception_with_not_None_response__exception_handled_by_fa
     with Scenario() as s:
         s.failed_response_handler.handle(exception)
         f()
+
+
+def test_wrap__transient_failure_then_success__request_retried_after_delay(patch_module):
+    patch_module(request_exception_wrapper, "retries")
+    patch_module(request_exception_wrapper, "time")
+    exception = requests.ConnectionError()
+    results = [exception, "return-value"]
+
+    @request_exception_wrapper.wrap()
+    def f():
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    with Scenario() as s:
+        s.retries.delay(exception, 1, True) >> 0.25
+        s.time.sleep(0.25)
+
+        assert f() == "return-value"
+
+
+def test_wrap__retries_exhausted__failure_recorded_in_circuit_breaker_and_comet_exception_raised(
+    patch_module, monkeypatch
+):
+    patch_module(request_exception_wrapper, "retries")
+    breaker = circuit_breaker.CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    monkeypatch.setattr(request_exception_wrapper.circuit_breaker, "for_api_key", lambda api_key: breaker)
+    exception = requests.ConnectionError()
+
+    @request_exception_wrapper.wrap(idempotent=False)
+    def f():
+        raise exception
+
+    with Scenario() as s:
+        s.retries.delay(exception, 1, False) >> None
+        s.retries.is_transient(exception) >> True
+
+        with pytest.raises(exceptions.CometLLMException):
+            f()
+
+    assert breaker.is_open
+
+
+def test_wrap__circuit_breaker_open__function_not_called(monkeypatch):
+    breaker = circuit_breaker.CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    monkeypatch.setattr(request_exception_wrapper.circuit_breaker, "for_api_key", lambda api_key: breaker)
+
+    @request_exception_wrapper.wrap()
+    def f():
+        raise AssertionError("must not be called")
+
+    with pytest.raises(exceptions.CometLLMException):
+        f()
+
+
+def test_wrap__async_function__transient_failure_then_success__request_retried(patch_module):
+    patch_module(request_exception_wrapper, "retries")
+    patch_module(request_exception_wrapper, "asyncio")
+    exception = requests.ConnectionError()
+    results = [exception, "return-value"]
+
+    async def no_sleep():
+        pass
+
+    @request_exception_wrapper.wrap()
+    async def f():
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    with Scenario() as s:
+        s.retries.delay(exception, 1, True) >> 0.25
+        s.asyncio.sleep(0.25) >> no_sleep()
+
+        loop = asyncio.new_event_loop()
+        try:
+            assert loop.run_until_complete(f()) == "return-value"
+        finally:
+            loop.close()
+
+
+def test_wrap__method_of_object_with_circuit_breaker__its_breaker_used():
+    breaker = circuit_breaker.CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+
+    class Client:
+        circuit_breaker = breaker
+
+        @request_exception_wrapper.wrap()
+        def f(self):
+            raise AssertionError("must not be called")
+
+    with pytest.raises(exceptions.CometLLMException):
+        Client().f()
@@ -0,0 +1,124 @@
+import box
+import pytest
+import requests
+import urllib3.exceptions
+from testix import *
+
+from comet_llm.experiment_api import retries
+
+
+@pytest.fixture(autouse=True)
+def mock_imports(patch_module):
+    patch_module(retries, "config")
+    patch_module(retries, "random")
+
+
+def _http_error(status_code, headers=None):
+    return requests.HTTPError(
+        response=box.Box(status_code=status_code, headers=headers or {})
+    )
+
+
+def _connection_refused():
+    return requests.ConnectionError(
+        urllib3.exceptions.MaxRetryError(
+            pool=None,
+            url="/",
+            reason=urllib3.exceptions.NewConnectionError(None, "refused"),
+        )
+    )
+
+
+def test_delay__client_error__not_retried():
+    assert retries.delay(_http_error(400), attempt=1, idempotent=True) is None
+
+
+def test_delay__server_error__exponential_backoff_with_jitter():
+    with Scenario() as s:
+        s.config.retry_max_attempts() >> 5
+        s.config.retry_backoff_max() >> 10.0
+        s.config.retry_backoff_factor() >> 0.5
+        s.config.retry_jitter_enabled() >> True
+        s.random.uniform(0, 2.0) >> 1.3
+
+        assert retries.delay(_http_error(502), attempt=3, idempotent=True) == 1.3
+
+
+def test_delay__backoff_exceeds_maximum__maximum_used():
+    with Scenario() as s:
+        s.config.retry_max_attempts() >> 10
+        s.config.retry_backoff_max() >> 3.0
+        s.config.retry_backoff_factor() >> 0.5
+        s.config.retry_jitter_enabled() >> False
+
+        assert retries.delay(requests.ConnectionError(), attempt=7, idempotent=True) == 3.0
+
+
+def test_delay__attempts_exhausted__not_retried():
+    with Scenario() as s:
+        s.config.retry_max_attempts() >> 3
+
+        assert retries.delay(_http_error(503), attempt=3, idempotent=True) is None
+
+
+def test_delay__retry_after_header__server_delay_honored():
+    with Scenario() as s:
+        s.config.retry_max_attempts() >> 3
+        s.config.retry_backoff_max() >> 10.0
+
+        assert retries.delay(
+            _http_error(429, {"Retry-After": "7"}), attempt=1, idempotent=False
+        ) == 7.0
+
+
+def test_delay__retry_after_longer_than_backoff_max__not_retried():
+    with Scenario() as s:
+        s.config.retry_max_attempts() >> 3
+        s.config.retry_backoff_max() >> 10.0
+
+        assert retries.delay(
+            _http_error(429, {"Retry-After": "120"}), attempt=1, idempotent=True
+        ) is None
+
+
+def test_delay__retry_after_http_date_in_the_past__retried_immediately():
+    with Scenario() as s:
+        s.config.retry_max_attempts() >> 3
+        s.config.retry_backoff_max() >> 10.0
+
+        assert retries.delay(
+            _http_error(503, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}),
+            attempt=1,
+            idempotent=True,
+        ) == 0.0
+
+
+@pytest.mark.parametrize(
+    "exception",
+    [_http_error(500), _http_error(502), requests.Timeout(), requests.ConnectionError()],
+)
+def test_delay__not_idempotent__request_possibly_processed__not_retried(exception):
+    assert retries.delay(exception, attempt=1, idempotent=False) is None
+
+
+def test_delay__not_idempotent__connection_not_established__retried():
+    with Scenario() as s:
+        s.config.retry_max_attempts() >> 3
+        s.config.retry_backoff_max() >> 10.0
+        s.config.retry_backoff_factor() >> 0.5
+        s.config.retry_jitter_enabled() >> False
+
+        assert retries.delay(_connection_refused(), attempt=1, idempotent=False) == 0.5
+
+
+@pytest.mark.parametrize(
+    "exception,expected",
+    [
+        (_http_error(503), True),
+        (_http_error(404), False),
+        (requests.ConnectionError(), True),
+        (requests.RequestException(), False),
+    ],
+)
+def test_is_transient(exception, expected):
+    assert retries.is_transient(exception) is expected
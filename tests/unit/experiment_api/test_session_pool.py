@@ -0,0 +1,48 @@
+import threading
+
+from comet_llm.experiment_api import session_pool
+
+
+class FakeSession:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def _session_from_other_thread(tested):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(tested.get()))
+    thread.start()
+    thread.join()
+
+    return result[0]
+
+
+def test_get__shared_scope__same_session_for_all_threads():
+    tested = session_pool.SessionPool(session_factory=FakeSession, per_thread=False)
+
+    session = tested.get()
+
+    assert tested.get() is session
+    assert _session_from_other_thread(tested) is session
+
+
+def test_get__thread_scope__every_thread_has_own_session():
+    tested = session_pool.SessionPool(session_factory=FakeSession, per_thread=True)
+
+    session = tested.get()
+
+    assert tested.get() is session
+    assert _session_from_other_thread(tested) is not session
+
+
+def test_close__sessions_closed__new_session_created_on_next_get():
+    tested = session_pool.SessionPool(session_factory=FakeSession, per_thread=True)
+    session = tested.get()
+
+    tested.close()
+
+    assert session.closed is True
+    assert tested.get() is not session
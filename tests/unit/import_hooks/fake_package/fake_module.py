@@ -1,5 +1,6 @@
 # Fake module
 
+import functools
 from unittest.mock import Mock
 
 FUNCTION_1_MOCK = Mock()
@@ -47,3 +48,40 @@ class Klass:
 class Child(Klass):
     def method(self, *args, **kwargs):
         return super(Child, self).method(*args, **kwargs)
+
+
+async def async_function1(*args, **kwargs):
+    return FUNCTION_1_MOCK(*args, **kwargs)
+
+
+async def async_function3(*args, **kwargs):
+    FUNCTION_3_MOCK(*args, **kwargs)
+    raise Exception()
+
+
+def _regular_decorator(function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        return function(*args, **kwargs)
+
+    return wrapper
+
+
+def _undetectable_decorator(function):
+    def wrapper(*args, **kwargs):
+        return function(*args, **kwargs)
+
+    return wrapper
+
+
+class AsyncKlass:
+    def __init__(self):
+        self.mock = Mock()
+
+    @_regular_decorator
+    async def decorated_method(self, *args, **kwargs):
+        return self.mock(*args, **kwargs)
+
+    @_undetectable_decorator
+    async def undetectable_method(self, *args, **kwargs):
+        return self.mock(*args, **kwargs)
@@ -1,3 +1,5 @@
+import asyncio
+import contextvars
 from unittest import mock
 
 import pytest
@@ -15,6 +17,14 @@ ORIGINAL = mock.ANY
 EXCEPTION = mock.ANY
 
 
+def _run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
 @pytest.mark.forked
 def test_patch_function_in_module__name_to_patch_not_found__no_failure(fake_module_path):
     # Prepare hooks
@@ -481,4 +491,164 @@ def test_patch_subclass_method_in_module__happyflow(fake_module_path):
     assert original.__name__ == "method"
     assert original is not fake_module.Klass.method
 
-    instance.mock.assert_called_once_with("arg-1", "arg-2", kwarg1="kwarg-1")
\ No newline at end of file
+    instance.mock.assert_called_once_with("arg-1", "arg-2", kwarg1="kwarg-1")
+
+
+@pytest.mark.forked
+def test_patch_coroutine_function_in_module__register_before_and_after__callbacks_called_when_awaited(fake_module_path):
+    # Prepare hooks
+    extensions_registry = registry.Registry()
+    calls = []
+    extensions_registry.register_before(
+        fake_module_path, "async_function1", lambda original, *args, **kwargs: calls.append("before")
+    )
+    extensions_registry.register_after(
+        fake_module_path, "async_function1", lambda original, return_value, *args, **kwargs: calls.append(return_value)
+    )
+
+    comet_finder = finder.CometFinder(extensions_registry)
+    comet_finder.hook_into_import_system()
+
+    # Import
+    from .fake_package import fake_module
+
+    fake_module.FUNCTION_1_MOCK.side_effect = lambda *args, **kwargs: calls.append("original") or "return-value"
+
+    # Call
+    coroutine = fake_module.async_function1("arg-1", kwarg1="kwarg-1")
+    assert calls == []
+
+    assert _run(coroutine) == "return-value"
+
+    # Check
+    assert calls == ["before", "original", "return-value"]
+    fake_module.FUNCTION_1_MOCK.assert_called_once_with("arg-1", kwarg1="kwarg-1")
+
+
+@pytest.mark.forked
+def test_patch_coroutine_function_in_module__register_after__callback_changes_return_value(fake_module_path):
+    # Prepare hooks
+    extensions_registry = registry.Registry()
+    extensions_registry.register_after(
+        fake_module_path, "async_function1", lambda original, return_value: "new-return-value"
+    )
+
+    comet_finder = finder.CometFinder(extensions_registry)
+    comet_finder.hook_into_import_system()
+
+    # Import
+    from .fake_package import fake_module
+
+    # Call
+    assert _run(fake_module.async_function1()) == "new-return-value"
+
+
+@pytest.mark.forked
+def test_patch_raising_coroutine_function_in_module__register_after_exception__happyflow(fake_module_path):
+    # Prepare hooks
+    extensions_registry = registry.Registry()
+    mock_callback = mock.Mock()
+    extensions_registry.register_after_exception(fake_module_path, "async_function3", mock_callback)
+
+    comet_finder = finder.CometFinder(extensions_registry)
+    comet_finder.hook_into_import_system()
+
+    # Import
+    from .fake_package import fake_module
+
+    # Call
+    with pytest.raises(Exception):
+        _run(fake_module.async_function3("arg-1"))
+
+    # Check
+    mock_callback.assert_called_once_with(ORIGINAL, EXCEPTION, "arg-1")
+
+
+@pytest.mark.forked
+def test_patch_decorated_async_method_in_module__callbacks_called_when_awaited(fake_module_path):
+    # Prepare hooks
+    extensions_registry = registry.Registry()
+    calls = []
+    extensions_registry.register_before(
+        fake_module_path, "AsyncKlass.decorated_method", lambda original, *args, **kwargs: calls.append("before")
+    )
+    extensions_registry.register_after(
+        fake_module_path, "AsyncKlass.decorated_method", lambda original, return_value, *args, **kwargs: calls.append(return_value)
+    )
+
+    comet_finder = finder.CometFinder(extensions_registry)
+    comet_finder.hook_into_import_system()
+
+    # Import
+    from .fake_package import fake_module
+
+    instance = fake_module.AsyncKlass()
+    instance.mock.return_value = "method-return-value"
+
+    # Call
+    coroutine = instance.decorated_method("arg-1")
+    assert calls == []
+
+    assert _run(coroutine) == "method-return-value"
+
+    # Check
+    assert calls == ["before", "method-return-value"]
+
+
+@pytest.mark.forked
+def test_patch_undetectable_async_method_in_module__after_callback_called_with_awaited_result(fake_module_path):
+    # Prepare hooks
+    extensions_registry = registry.Registry()
+    mock_callback = mock.Mock(return_value=None)
+    extensions_registry.register_after(fake_module_path, "AsyncKlass.undetectable_method", mock_callback)
+
+    comet_finder = finder.CometFinder(extensions_registry)
+    comet_finder.hook_into_import_system()
+
+    # Import
+    from .fake_package import fake_module
+
+    instance = fake_module.AsyncKlass()
+    instance.mock.return_value = "method-return-value"
+
+    # Call
+    assert _run(instance.undetectable_method("arg-1")) == "method-return-value"
+
+    # Check
+    mock_callback.assert_called_once_with(ORIGINAL, "method-return-value", instance, "arg-1")
+
+
+@pytest.mark.forked
+def test_patch_undetectable_async_method_in_module__after_callback_sees_context_of_before_callback__caller_context_unchanged(fake_module_path):
+    # Prepare hooks
+    span = contextvars.ContextVar("span", default=None)
+    extensions_registry = registry.Registry()
+    extensions_registry.register_before(
+        fake_module_path, "AsyncKlass.undetectable_method", lambda original, *args, **kwargs: span.set("the-span")
+    )
+    after_spans = []
+    extensions_registry.register_after(
+        fake_module_path, "AsyncKlass.undetectable_method", lambda original, return_value, *args, **kwargs: after_spans.append(span.get())
+    )
+
+    comet_finder = finder.CometFinder(extensions_registry)
+    comet_finder.hook_into_import_system()
+
+    # Import
+    from .fake_package import fake_module
+
+    instance = fake_module.AsyncKlass()
+    instance.mock.return_value = "method-return-value"
+
+    # Call
+    coroutine = instance.undetectable_method("arg-1")
+    assert span.get() is None
+
+    async def await_in_another_task():
+        return await asyncio.ensure_future(coroutine)
+
+    assert _run(await_in_another_task()) == "method-return-value"
+
+    # Check
+    assert after_spans == ["the-span"]
+    assert span.get() is None
@@ -0,0 +1,183 @@
+import asyncio
+
+import pytest
+from testix import *
+
+from comet_llm.exceptions import exceptions
+from comet_llm.message_processing import api
+
+
+@pytest.fixture(autouse=True)
+def mock_imports(patch_module, monkeypatch):
+    patch_module(api, "config")
+    patch_module(api, "sender")
+    patch_module(api, "exceptions")
+    patch_module(api, "app")
+    patch_module(api, "background_uploader")
+    patch_module(api, "atexit")
+    patch_module(api, "messages")
+    monkeypatch.setattr(api, "_UPLOADER", None)
+    monkeypatch.setattr(api, "_REPLAYER", None)
+    monkeypatch.setattr(api, "_SHUT_DOWN", False)
+
+
+@pytest.fixture
+def real_exceptions(monkeypatch):
+    monkeypatch.setattr(api, "exceptions", exceptions)
+
+
+def test_process__async_logging_disabled__message_sent_synchronously():
+    with Scenario() as s:
+        s.config.async_logging_enabled() >> False
+        s.config.spool_enabled() >> False
+        s.sender.send("the-message") >> "llm-result"
+
+        assert api.process("the-message") == "llm-result"
+
+
+def test_process__async_logging_enabled__message_put_to_uploader__None_returned():
+    with Scenario() as s:
+        s.config.async_logging_enabled() >> True
+        s.exceptions.filter(allow_raising=False, summary=api.app.SUMMARY) >> Fake(
+            "filter_decorator"
+        )
+        s.filter_decorator(api._send) >> "filtered-send"
+        s.config.async_logging_workers() >> "workers"
+        s.config.async_logging_queue_size() >> "queue-size"
+        s.background_uploader.BackgroundUploader(
+            send="filtered-send",
+            workers="workers",
+            queue_size="queue-size",
+        ) >> Fake("uploader")
+        s.uploader.start()
+        s.config.async_logging_shutdown_timeout() >> "shutdown-timeout"
+        s.atexit.register(IgnoreArgument(), "shutdown-timeout")
+        s.messages.snapshot("the-message") >> "the-snapshot"
+        s.uploader.put("the-snapshot")
+
+        assert api.process("the-message") is None
+
+    with Scenario() as s:
+        s.config.async_logging_enabled() >> True
+        s.messages.snapshot("another-message") >> "another-snapshot"
+        s.uploader.put("another-snapshot")
+
+        assert api.process("another-message") is None
+
+
+def test_process_deferred__message_builder_put_to_uploader(monkeypatch):
+    monkeypatch.setattr(api, "_UPLOADER", Fake("uploader"))
+
+    with Scenario() as s:
+        s.uploader.put("the-message-builder")
+
+        api.process_deferred("the-message-builder")
+
+
+def test_on_shutdown__callbacks_called_before_uploader_closed(monkeypatch):
+    monkeypatch.setattr(api, "_UPLOADER", Fake("uploader"))
+    monkeypatch.setattr(api, "_SHUTDOWN_CALLBACKS", [])
+
+    with Scenario() as s:
+        api.on_shutdown(Fake("callback"))
+
+        s.callback()
+        s.uploader.close("shutdown-timeout")
+
+        api._shutdown("shutdown-timeout")
+
+
+def test_shutdown__spool_enabled__replayer_stopped_and_spool_sealed_after_uploader_closed(monkeypatch):
+    monkeypatch.setattr(api, "_UPLOADER", Fake("uploader"))
+    monkeypatch.setattr(api, "_REPLAYER", Fake("replayer"))
+    monkeypatch.setattr(api, "_SHUTDOWN_CALLBACKS", [])
+
+    with Scenario() as s:
+        s.uploader.close("shutdown-timeout")
+        s.replayer.stop()
+        s.replayer.spool.seal()
+
+        api._shutdown("shutdown-timeout")
+        # Registered by both the uploader and the replayer, done once
+        api._shutdown("shutdown-timeout")
+
+
+def test_process_async__async_logging_enabled__queue_full__put_without_blocking_the_loop(monkeypatch):
+    monkeypatch.setattr(api, "_UPLOADER", Fake("uploader"))
+
+    with Scenario() as s:
+        s.config.async_logging_enabled() >> True
+        s.messages.snapshot("the-message") >> "the-snapshot"
+        s.uploader.put_nowait("the-snapshot") >> False
+        s.uploader.put("the-snapshot")
+
+        loop = asyncio.new_event_loop()
+        try:
+            assert loop.run_until_complete(api.process_async("the-message")) is None
+        finally:
+            loop.close()
+
+
+def test_flush__uploader_not_started__True_returned():
+    assert api.flush() is True
+
+
+def test_process__backend_unavailable__spool_disabled__exception_raised(
+    real_exceptions,
+):
+    with Scenario() as s:
+        s.config.async_logging_enabled() >> False
+        s.config.spool_enabled() >> False
+        s.sender.send("the-message") >> Throwing(exceptions.BackendUnavailableException)
+        s.config.spool_enabled() >> False
+
+        with pytest.raises(exceptions.BackendUnavailableException):
+            api.process("the-message")
+
+
+def test_process__backend_unavailable__spool_enabled__message_spooled__None_returned(
+    real_exceptions, monkeypatch
+):
+    monkeypatch.setattr(api, "_REPLAYER", Fake("replayer"))
+    monkeypatch.setattr(api.comet_logging, "log_once_at_level", lambda *args: None)
+
+    with Scenario() as s:
+        s.config.async_logging_enabled() >> False
+        s.config.spool_enabled() >> True
+        s.messages.with_experiment_ref("the-message") >> "the-message-with-ref"
+        s.sender.send("the-message-with-ref") >> Throwing(exceptions.BackendUnavailableException)
+        s.config.spool_enabled() >> True
+        s.replayer.spool.write("the-message-with-ref") >> True
+        s.replayer.notify_spooled()
+        s.app.SUMMARY.increment_spooled()
+
+        assert api.process("the-message") is None
+
+
+def test_process__backend_unavailable__spool_full__exception_raised(
+    real_exceptions, monkeypatch
+):
+    monkeypatch.setattr(api, "_REPLAYER", Fake("replayer"))
+
+    with Scenario() as s:
+        s.config.async_logging_enabled() >> False
+        s.config.spool_enabled() >> True
+        s.messages.with_experiment_ref("the-message") >> "the-message-with-ref"
+        s.sender.send("the-message-with-ref") >> Throwing(exceptions.BackendUnavailableException)
+        s.config.spool_enabled() >> True
+        s.replayer.spool.write("the-message-with-ref") >> False
+
+        with pytest.raises(exceptions.BackendUnavailableException):
+            api.process("the-message")
+
+
+def test_process__message_sent__replayer_woken_up(monkeypatch):
+    monkeypatch.setattr(api, "_REPLAYER", Fake("replayer"))
+
+    with Scenario() as s:
+        s.config.async_logging_enabled() >> False
+        s.config.spool_enabled() >> False
+        s.sender.send("the-message") >> "llm-result"
+        s.replayer.wake_up()
+
+        assert api.process("the-message") == "llm-result"
@@ -0,0 +1,183 @@
+import asyncio
+import threading
+
+import box
+import pytest
+from testix import *
+
+from comet_llm import llm_result
+from comet_llm.exceptions import exceptions
+from comet_llm.message_processing import async_sender, messages
+
+
+@pytest.fixture(autouse=True)
+def mock_imports(patch_module):
+    patch_module(async_sender, "experiment_api")
+    patch_module(async_sender, "app")
+    patch_module(async_sender, "config")
+
+
+def _run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class _SlowAsyncExperimentAPI:
+    project_url = "project-url"
+    id = "experiment-id"
+
+    def __init__(self, failing_write=None):
+        self.running = 0
+        self.max_running = 0
+        self.calls = []
+        self._failing_write = failing_write
+
+    def __getattr__(self, name):
+        async def write(*args, **kwargs):
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            await asyncio.sleep(0.01)
+            self.running -= 1
+            self.calls.append(name)
+            if name == self._failing_write:
+                raise exceptions.CometLLMException("failed")
+
+        return write
+
+
+def _message():
+    return messages.TraceMessage(
+        experiment_info=box.Box(
+            api_key="api-key", workspace="the-workspace", project_name="project-name"
+        ),
+        trace_data={},
+        category="chain",
+        tags=["tag"],
+        metrics={"chain_duration": 1},
+        others={"other-name-1": "other-value-1", "other-name-2": "other-value-2"},
+    )
+
+
+async def _create_new(experiment_api_):
+    return experiment_api_
+
+
+def test_send__concurrent_writes__writes_run_concurrently_within_limit():
+    experiment_api_ = _SlowAsyncExperimentAPI()
+
+    with Scenario() as s:
+        s.experiment_api.AsyncExperimentAPI.create_new(
+            api_key="api-key", workspace="the-workspace", project_name="project-name"
+        ) >> _create_new(experiment_api_)
+        s.config.experiment_writes_max_workers() >> 3
+        s.app.SUMMARY.add_log("project-url", "chain")
+
+        result = _run(async_sender.send(_message()))
+
+    assert result == llm_result.LLMResult(id="experiment-id", project_url="project-url")
+    assert len(experiment_api_.calls) == 5
+    assert experiment_api_.max_running == 3
+
+
+def test_send__sequential_writes__one_write_at_a_time():
+    experiment_api_ = _SlowAsyncExperimentAPI()
+
+    with Scenario() as s:
+        s.experiment_api.AsyncExperimentAPI.create_new(
+            api_key="api-key", workspace="the-workspace", project_name="project-name"
+        ) >> _create_new(experiment_api_)
+        s.config.experiment_writes_max_workers() >> 1
+        s.app.SUMMARY.add_log("project-url", "chain")
+
+        _run(async_sender.send(_message()))
+
+    assert experiment_api_.calls == [
+        "log_tags",
+        "log_asset_with_stream",
+        "log_metric",
+        "log_other",
+        "log_other",
+    ]
+    assert experiment_api_.max_running == 1
+
+
+def test_send__concurrent_writes__one_write_failed__exception_raised():
+    experiment_api_ = _SlowAsyncExperimentAPI(failing_write="log_tags")
+
+    with Scenario() as s:
+        s.experiment_api.AsyncExperimentAPI.create_new(
+            api_key="api-key", workspace="the-workspace", project_name="project-name"
+        ) >> _create_new(experiment_api_)
+        s.config.experiment_writes_max_workers() >> 5
+
+        with pytest.raises(exceptions.CometLLMException):
+            _run(async_sender.send(_message()))
+
+    assert len(experiment_api_.calls) == 5
+
+
+def test_send__experiment_of_ref_already_created__logged_to_existing_experiment():
+    experiment_api_ = _SlowAsyncExperimentAPI()
+    message = _message()
+    message.experiment_ref = messages.ExperimentRef("ref-id")
+    message.experiment_ref.experiment_key = "experiment-id"
+    message.experiment_ref.workspace = "created-workspace"
+    message.experiment_ref.project_name = "created-project"
+
+    with Scenario() as s:
+        (
+            s.experiment_api.AsyncExperimentAPI.from_existing_id(
+                "experiment-id",
+                api_key="api-key",
+                workspace="created-workspace",
+                project_name="created-project",
+            )
+            >> experiment_api_
+        )
+        s.config.experiment_writes_max_workers() >> 1
+        s.app.SUMMARY.add_log("project-url", "chain")
+
+        _run(async_sender.send(message))
+
+    assert len(experiment_api_.calls) == 5
+
+
+def test_acquire__lock_held_by_another_thread__event_loop_not_blocked():
+    lock = threading.Lock()
+    lock.acquire()
+    threading.Timer(0.05, lock.release).start()
+    ticks = []
+
+    async def main():
+        acquiring = asyncio.ensure_future(async_sender._acquire(lock))
+        while not acquiring.done():
+            ticks.append(1)
+            await asyncio.sleep(0.001)
+        await acquiring
+
+    _run(main())
+
+    assert len(ticks) > 1
+    assert lock.locked()
+    lock.release()
+
+
+def test_acquire__cancelled_while_waiting__lock_released_once_acquired():
+    lock = threading.Lock()
+    lock.acquire()
+
+    async def main():
+        task = asyncio.ensure_future(async_sender._acquire(lock))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        lock.release()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0.05)
+
+    _run(main())
+
+    assert lock.acquire(blocking=False)
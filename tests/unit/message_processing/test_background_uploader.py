@@ -0,0 +1,99 @@
+import threading
+
+from comet_llm.message_processing import background_uploader
+
+
+def test_put_and_flush__all_messages_sent_before_flush_returns():
+    sent = []
+    tested = background_uploader.BackgroundUploader(
+        send=sent.append, workers=4, queue_size=10
+    )
+    tested.start()
+
+    for i in range(100):
+        tested.put(i)
+
+    assert tested.flush(timeout=10) is True
+    assert sorted(sent) == list(range(100))
+
+    tested.close()
+
+
+def test_flush__sending_is_blocked__timeout_expired__False_returned():
+    release = threading.Event()
+    tested = background_uploader.BackgroundUploader(
+        send=lambda message: release.wait(), workers=1, queue_size=10
+    )
+    tested.start()
+    tested.put("message")
+
+    assert tested.flush(timeout=0.1) is False
+
+    release.set()
+    assert tested.flush(timeout=10) is True
+
+    tested.close()
+
+
+def test_flush__nothing_put__True_returned_immediately():
+    tested = background_uploader.BackgroundUploader(
+        send=lambda message: None, workers=1, queue_size=10
+    )
+    tested.start()
+
+    assert tested.flush(timeout=0) is True
+
+    tested.close()
+
+
+def test_put__send_raises_exception__worker_keeps_processing_messages():
+    sent = []
+
+    def send(message):
+        if message == "bad-message":
+            raise Exception("send failed")
+        sent.append(message)
+
+    tested = background_uploader.BackgroundUploader(send=send, workers=1, queue_size=10)
+    tested.start()
+    tested.put("bad-message")
+    tested.put("good-message")
+
+    assert tested.flush(timeout=10) is True
+    assert sent == ["good-message"]
+
+    tested.close()
+
+
+def test_put__message_builder_put__called_by_worker__None_result_not_sent():
+    sent = []
+    tested = background_uploader.BackgroundUploader(
+        send=sent.append, workers=1, queue_size=10
+    )
+    tested.start()
+    tested.put(lambda: "built-message")
+    tested.put(lambda: None)
+
+    assert tested.flush(timeout=10) is True
+    assert sent == ["built-message"]
+
+    tested.close()
+
+
+def test_put_nowait__queue_full__False_returned__flush_not_blocked():
+    release = threading.Event()
+    tested = background_uploader.BackgroundUploader(
+        send=lambda message: release.wait(), workers=1, queue_size=1
+    )
+    tested.start()
+    tested.put("processed-message")
+    while tested._queue.qsize() > 0:
+        pass
+
+    assert tested.put_nowait("queued-message") is True
+    assert tested.put_nowait("dropped-message") is False
+
+    release.set()
+    assert tested.flush(timeout=10) is True
+
+    tested.close()
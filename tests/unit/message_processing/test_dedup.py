@@ -0,0 +1,112 @@
+import hashlib
+
+from comet_llm.message_processing import dedup
+
+SYSTEM_PROMPT = "You are a helpful assistant. " * 10
+DIGEST = hashlib.sha256(SYSTEM_PROMPT.encode("utf-8")).hexdigest()
+
+
+def test_replace_field__short_values__same_object_returned():
+    tested = dedup.Deduplicator(dedup.DedupOptions(min_size=100))
+    value = {"messages": [{"role": "user", "content": "hi"}], "temperature": 0.5}
+
+    assert tested.replace_field(value) is value
+    assert tested.blobs == {}
+
+
+def test_replace_field__repeated_long_string__stored_once_and_referenced():
+    tested = dedup.Deduplicator(dedup.DedupOptions(min_size=100))
+    value = {
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": "hi"},
+        ],
+        "prompt_template": SYSTEM_PROMPT,
+    }
+
+    result = tested.replace_field(value)
+
+    assert result == {
+        "messages": [
+            {"role": "system", "content": {"$blob": DIGEST}},
+            {"role": "user", "content": "hi"},
+        ],
+        "prompt_template": {"$blob": DIGEST},
+    }
+    assert result["messages"][1] is value["messages"][1]
+    assert tested.blobs == {DIGEST: SYSTEM_PROMPT}
+
+
+def test_replace_field__known_blob__referenced_with_location_and_not_stored():
+    known_blobs = dedup.KnownBlobs(max_count=10)
+    known_blobs.add(
+        [DIGEST],
+        dedup.BlobLocation(experiment_key="experiment-key", asset_name="asset-name"),
+    )
+    tested = dedup.Deduplicator(
+        dedup.DedupOptions(
+            min_size=100, known_blobs=known_blobs, experiment_key="experiment-key"
+        )
+    )
+
+    result = tested.replace_field([SYSTEM_PROMPT])
+
+    assert result == [
+        {
+            "$blob": DIGEST,
+            "experiment_key": "experiment-key",
+            "asset_name": "asset-name",
+        }
+    ]
+    assert tested.blobs == {}
+
+
+def test_replace_field__blob_known_in_another_experiment__stored_again():
+    known_blobs = dedup.KnownBlobs(max_count=10)
+    known_blobs.add(
+        [DIGEST],
+        dedup.BlobLocation(experiment_key="experiment-key", asset_name="asset-name"),
+    )
+    tested = dedup.Deduplicator(
+        dedup.DedupOptions(
+            min_size=100, known_blobs=known_blobs, experiment_key="another-key"
+        )
+    )
+
+    result = tested.replace_field([SYSTEM_PROMPT])
+
+    assert result == [{"$blob": DIGEST}]
+    assert tested.blobs == {DIGEST: SYSTEM_PROMPT}
+
+
+def test_replace_node__only_changed_fields_replaced():
+    tested = dedup.Deduplicator(dedup.DedupOptions(min_size=100))
+    node = {
+        "id": SYSTEM_PROMPT,
+        "inputs": {"prompt": SYSTEM_PROMPT},
+        "outputs": {"output": "short"},
+    }
+
+    result = tested.replace_node(node)
+
+    assert result == {
+        "id": SYSTEM_PROMPT,
+        "inputs": {"prompt": {"$blob": DIGEST}},
+        "outputs": {"output": "short"},
+    }
+    assert node["inputs"] == {"prompt": SYSTEM_PROMPT}
+    assert result["outputs"] is node["outputs"]
+
+
+def test_known_blobs__more_than_max_count__least_recently_used_evicted():
+    location = dedup.BlobLocation(experiment_key="key", asset_name="name")
+    tested = dedup.KnownBlobs(max_count=2)
+
+    tested.add(["digest-1", "digest-2"], location)
+    tested.get("key", "digest-1")
+    tested.add(["digest-3"], location)
+
+    assert len(tested) == 2
+    assert tested.get("key", "digest-1") == location
+    assert tested.get("key", "digest-2") is None
+    assert tested.get("key", "digest-3") == location
@@ -0,0 +1,84 @@
+import box
+
+from comet_llm.chains import span
+from comet_llm.message_processing import messages
+
+
+def _message(trace_data, parameters=None):
+    return messages.TraceMessage(
+        experiment_info=box.Box(api_key="api-key"),
+        trace_data=trace_data,
+        category="chain",
+        tags=["the-tag"],
+        parameters=parameters if parameters is not None else {},
+    )
+
+
+def test_snapshot__inputs_changed_after_the_call__snapshot_unchanged():
+    user_messages = [{"role": "user", "content": "hi"}]
+    metadata = {"m": user_messages}
+    message = _message(
+        {"prompt": user_messages, "metadata": metadata},
+        parameters={"m": user_messages},
+    )
+
+    tested = messages.snapshot(message)
+    user_messages.append({"role": "user", "content": "appended"})
+    user_messages[0]["content"] = "changed"
+    metadata["new-key"] = "new-value"
+
+    assert tested.trace_data == {
+        "prompt": [{"role": "user", "content": "hi"}],
+        "metadata": {"m": [{"role": "user", "content": "hi"}]},
+    }
+    assert tested.parameters == {"m": [{"role": "user", "content": "hi"}]}
+    assert tested.tags == ["the-tag"]
+    assert tested.experiment_info is message.experiment_info
+
+
+def test_snapshot__chain_nodes__spans_replaced_with_snapshots():
+    span_ = span.Span(inputs={"input-key": "input-value"}, category="llm")
+    span_.set_outputs({"output-key": "output-value"})
+    message = _message({"chain_nodes": [span_, {"id": 42}]})
+
+    tested = messages.snapshot(message)
+    span_.set_outputs({"output-key": "changed"})
+
+    snapshot, node = tested.trace_data["chain_nodes"]
+    assert isinstance(snapshot, span.SpanSnapshot)
+    assert snapshot.as_dict()["outputs"] == {"output-key": "output-value"}
+    assert node == {"id": 42}
+
+
+def test_snapshot__deferred_span_outputs__resolved_by_as_dict():
+    resolved = []
+    span_ = span.Span(inputs={"input-key": "input-value"}, category="llm")
+    span_.__api__defer_outputs__(
+        lambda: resolved.append(True) or ({"output-key": "output-value"}, None)
+    )
+    message = _message({"chain_nodes": [span_]})
+
+    tested = messages.snapshot(message)
+
+    assert resolved == []
+    snapshot = tested.trace_data["chain_nodes"][0]
+    assert snapshot.as_dict()["outputs"] == {"output-key": "output-value"}
+    assert resolved == [True]
+
+
+def test_with_experiment_ref__no_ref__new_ref_given():
+    message = _message({"prompt": "hi"})
+
+    result = messages.with_experiment_ref(message)
+
+    assert message.experiment_ref is None
+    assert result.experiment_ref is not None
+    assert result.experiment_ref.experiment_key is None
+    assert result.trace_data == message.trace_data
+
+
+def test_with_experiment_ref__ref_given__message_unchanged():
+    message = _message({"prompt": "hi"})
+    message.experiment_ref = messages.experiment_ref()
+
+    assert messages.with_experiment_ref(message) is message
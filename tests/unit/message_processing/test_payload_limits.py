@@ -0,0 +1,133 @@
+import hashlib
+import json
+
+import pytest
+
+from comet_llm.message_processing import payload_limits
+
+
+def _truncator(**kwargs):
+    return payload_limits.Truncator(payload_limits.PayloadLimits(**kwargs))
+
+
+def test_limit_field__value_within_limits__same_object_returned():
+    tested = _truncator(field_max_size=1000)
+    value = {"documents": ["a" * 10, {"text": "b" * 10}], "score": 0.5}
+
+    assert tested.limit_field("inputs", value) is value
+    assert tested.truncated_count == 0
+
+
+def test_limit_field__long_string_truncate_policy__beginning_kept():
+    tested = _truncator(field_max_size=50)
+
+    result = tested.limit_field("inputs", {"prompt": "a" * 1000})
+
+    assert result["prompt"].startswith("a" * 10)
+    assert result["prompt"].endswith(payload_limits.TRUNCATION_MARKER)
+    assert len(json.dumps(result)) <= 50
+    assert tested.report() == [
+        {"path": "inputs.prompt", "policy": "truncate", "original_size": 1000}
+    ]
+
+
+def test_limit_field__long_string_head_tail_policy__beginning_and_end_kept():
+    tested = _truncator(field_max_size=40, string_policy="head_tail")
+
+    result = tested.limit_field("outputs", "a" * 500 + "b" * 500)
+
+    assert result == "a" * 12 + payload_limits.TRUNCATION_MARKER + "b" * 12
+    assert tested.report()[0]["policy"] == "head_tail"
+
+
+def test_limit_field__long_string_hash_policy__replaced_with_hash_and_length():
+    tested = _truncator(field_max_size=100, string_policy="hash")
+    value = "a" * 1000
+
+    result = tested.limit_field("outputs", value)
+
+    assert result == {
+        "sha256": hashlib.sha256(value.encode("utf-8")).hexdigest(),
+        "length": 1000,
+    }
+
+
+def test_limit_field__long_list__items_over_the_limit_dropped():
+    tested = _truncator(field_max_size=30)
+
+    result = tested.limit_field("inputs", ["aaaa"] * 100)
+
+    assert result[:3] == ["aaaa"] * 3
+    assert result[-1] == "[96 more items truncated]"
+    assert tested.report()[-1] == {
+        "path": "inputs",
+        "policy": "drop_items",
+        "original_size": 100,
+    }
+
+
+def test_limit_field__big_dict__keys_over_the_limit_dropped():
+    tested = _truncator(field_max_size=40)
+
+    result = tested.limit_field("metadata", {f"key-{i}": i for i in range(100)})
+
+    assert list(result)[:3] == ["key-0", "key-1", "key-2"]
+    assert result["..."] == "[97 more keys truncated]"
+
+
+def test_limit_field__vector_and_drop_vectors_enabled__vector_replaced_with_length():
+    tested = _truncator(drop_vectors=True)
+    vector = [0.1] * 1536
+
+    result = tested.limit_field("outputs", {"embedding": vector, "ids": [1, 2, 3]})
+
+    assert result == {"embedding": {"dropped_vector_length": 1536}, "ids": [1, 2, 3]}
+    assert tested.report() == [
+        {"path": "outputs.embedding", "policy": "drop_vector", "original_size": 1536}
+    ]
+
+
+def test_limit_field__trace_limit__shared_by_all_the_fields():
+    tested = _truncator(trace_max_size=100)
+
+    first = tested.limit_field("chain_nodes[0].inputs", "a" * 80)
+    second = tested.limit_field("chain_nodes[1].inputs", "b" * 80)
+
+    assert first == "a" * 80
+    assert len(second) < 30
+    assert tested.report()[0]["path"] == "chain_nodes[1].inputs"
+
+
+def test_limit_node__field_cut__other_fields_and_node_left_untouched():
+    tested = _truncator(field_max_size=30)
+    node = {"id": 1, "inputs": {"prompt": "a" * 100}, "outputs": {"output": "ok"}}
+
+    result = tested.limit_node(3, node)
+
+    assert result is not node
+    assert node["inputs"] == {"prompt": "a" * 100}
+    assert result["outputs"] is node["outputs"]
+    assert tested.report()[0]["path"] == "chain_nodes[3].inputs.prompt"
+
+
+def test_report__more_cuts_than_reported__all_counted():
+    tested = _truncator(field_max_size=10)
+
+    for i in range(payload_limits.MAX_REPORTED_FIELDS + 5):
+        tested.limit_field(f"field-{i}", "a" * 100)
+
+    assert len(tested.report()) == payload_limits.MAX_REPORTED_FIELDS
+    assert tested.truncated_count == payload_limits.MAX_REPORTED_FIELDS + 5
+
+
+@pytest.mark.parametrize(
+    "limits,enabled",
+    [
+        (payload_limits.PayloadLimits(), False),
+        (payload_limits.PayloadLimits(field_max_size=1), True),
+        (payload_limits.PayloadLimits(trace_max_size=1), True),
+        (payload_limits.PayloadLimits(drop_vectors=True), True),
+    ],
+)
+def test_payload_limits_enabled(limits, enabled):
+    assert limits.enabled is enabled
@@ -0,0 +1,83 @@
+import os
+
+import pytest
+
+from comet_llm import experiment_info
+from comet_llm.exceptions import exceptions
+from comet_llm.message_processing import messages, replayer, spool
+
+
+@pytest.fixture(autouse=True)
+def configured_api_key(monkeypatch):
+    monkeypatch.setattr(spool.config, "api_key", lambda: "api-key")
+
+
+def _message(text):
+    return messages.TraceMessage(
+        experiment_info=experiment_info.ExperimentInfo(
+            api_key="api-key", workspace="the-workspace", project_name="project-name"
+        ),
+        trace_data={"text": text},
+        category="prompt",
+    )
+
+
+@pytest.fixture
+def spool_(tmp_path):
+    result = spool.Spool(
+        directory=str(tmp_path),
+        segment_size=10**6,
+        max_size=10**6,
+        fsync="never",
+        eviction="oldest",
+        abandoned_after=60,
+    )
+    for text in ["first", "second", "third"]:
+        result.write(_message(text))
+
+    return result
+
+
+def test_replay__all_messages_sent__segment_removed(spool_, tmp_path):
+    sent = []
+    tested = replayer.Replayer(spool_, send=sent.append, interval=60)
+
+    tested.replay()
+
+    assert sent == [_message("first"), _message("second"), _message("third")]
+    assert os.listdir(tmp_path) == []
+
+
+def test_replay__backend_becomes_unavailable__unsent_messages_kept(spool_):
+    sent = []
+
+    def send(message):
+        if message == _message("second"):
+            raise exceptions.BackendUnavailableException()
+        sent.append(message)
+
+    tested = replayer.Replayer(spool_, send=send, interval=60)
+    tested.replay()
+
+    sent_again = []
+    replayer.Replayer(spool_, send=sent_again.append, interval=60).replay()
+
+    assert sent == [_message("first")]
+    assert sent_again == [_message("second"), _message("third")]
+
+
+def test_replay__message_rejected_by_backend__message_dropped(
+    spool_, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(replayer.app.SUMMARY, "increment_failed", lambda: None)
+    sent = []
+
+    def send(message):
+        if message == _message("second"):
+            raise exceptions.CometLLMException()
+        sent.append(message)
+
+    replayer.Replayer(spool_, send=send, interval=60).replay()
+
+    assert sent == [_message("first"), _message("third")]
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,330 @@
+import threading
+
+import box
+import pytest
+from testix import *
+
+from comet_llm import llm_result
+from comet_llm.exceptions import exceptions
+from comet_llm.message_processing import messages, sender
+
+
+@pytest.fixture(autouse=True)
+def mock_imports(patch_module):
+    patch_module(sender, "serialization")
+    patch_module(sender, "payload_limits")
+    patch_module(sender, "dedup")
+    patch_module(sender, "experiment_api")
+    patch_module(sender, "app")
+    patch_module(sender, "config")
+
+
+def test_send__happyflow():
+    TRACE_DATA = {"some-key": "some-value"}
+    message = messages.TraceMessage(
+        experiment_info=box.Box(
+            api_key="api-key", workspace="the-workspace", project_name="project-name"
+        ),
+        trace_data=TRACE_DATA,
+        category="chain",
+        tags="the-tags",
+        metrics={"chain_duration": "chain-duration"},
+        parameters={"parameter-key-1": "value-1", "parameter-key-2": "value-2"},
+        others={"other-name-1": "other-value-1"},
+    )
+
+    with Scenario() as s:
+        s.experiment_api.ExperimentAPI.create_new(
+            api_key="api-key", workspace="the-workspace", project_name="project-name"
+        ) >> Fake(
+            "experiment_api_instance", project_url="project-url", id="experiment-id"
+        )
+
+        s.dedup.from_config(IgnoreArgument()) >> None
+        s.payload_limits.from_config() >> "the-limits"
+        (
+            s.serialization.TraceChunks(TRACE_DATA, limits="the-limits", dedup=None)
+            >> "asset-chunks"
+        )
+        s.config.experiment_writes_max_workers() >> 1
+
+        s.experiment_api_instance.log_tags("the-tags")
+        s.experiment_api_instance.log_asset_with_stream(
+            name="comet_llm_data.json",
+            chunks="asset-chunks",
+            asset_type="llm_data",
+        )
+        s.experiment_api_instance.log_metric(
+            name="chain_duration", value="chain-duration"
+        )
+        s.experiment_api_instance.log_parameters(
+            {"parameter-key-1": "value-1", "parameter-key-2": "value-2"}
+        )
+        s.experiment_api_instance.log_other("other-name-1", "other-value-1")
+
+        s.app.SUMMARY.add_log("project-url", "chain")
+
+        result = sender.send(message)
+
+        assert result == llm_result.LLMResult(
+            id="experiment-id", project_url="project-url"
+        )
+
+
+def test_send__no_tags_no_metrics__only_asset_logged():
+    message = messages.TraceMessage(
+        experiment_info=box.Box(
+            api_key="api-key", workspace="the-workspace", project_name="project-name"
+        ),
+        trace_data={},
+        category="prompt",
+    )
+
+    with Scenario() as s:
+        s.experiment_api.ExperimentAPI.create_new(
+            api_key="api-key", workspace="the-workspace", project_name="project-name"
+        ) >> Fake(
+            "experiment_api_instance", project_url="project-url", id="experiment-id"
+        )
+
+        s.dedup.from_config(IgnoreArgument()) >> None
+        s.payload_limits.from_config() >> "the-limits"
+        (
+            s.serialization.TraceChunks({}, limits="the-limits", dedup=None)
+            >> "asset-chunks"
+        )
+        s.config.experiment_writes_max_workers() >> 1
+        s.experiment_api_instance.log_asset_with_stream(
+            name="comet_llm_data.json",
+            chunks="asset-chunks",
+            asset_type="llm_data",
+        )
+        s.app.SUMMARY.add_log("project-url", "prompt")
+
+        sender.send(message)
+
+
+def test_send__segment_of_new_experiment__experiment_created_and_remembered():
+    ref = messages.ExperimentRef("ref-id")
+    message = messages.TraceMessage(
+        experiment_info=box.Box(
+            api_key="api-key", workspace="the-workspace", project_name="project-name"
+        ),
+        trace_data={},
+        category="chain",
+        experiment_ref=ref,
+        segment_index=2,
+    )
+
+    with Scenario() as s:
+        s.experiment_api.ExperimentAPI.create_new(
+            api_key="api-key", workspace="the-workspace", project_name="project-name"
+        ) >> Fake(
+            "experiment_api_instance",
+            project_url="project-url",
+            id="experiment-id",
+            workspace="created-workspace",
+            project_name="created-project",
+        )
+
+        s.dedup.from_config(IgnoreArgument()) >> None
+        s.payload_limits.from_config() >> "the-limits"
+        (
+            s.serialization.TraceChunks({}, limits="the-limits", dedup=None)
+            >> "asset-chunks"
+        )
+        s.config.experiment_writes_max_workers() >> 1
+        s.experiment_api_instance.log_asset_with_stream(
+            name="comet_llm_data_segment_00002.json",
+            chunks="asset-chunks",
+            asset_type="llm_data_segment",
+        )
+
+        sender.send(message)
+
+    assert (ref.experiment_key, ref.workspace, ref.project_name) == (
+        "experiment-id",
+        "created-workspace",
+        "created-project",
+    )
+
+
+def test_send__experiment_of_ref_already_created__logged_to_existing_experiment():
+    ref = messages.ExperimentRef("ref-id")
+    ref.experiment_key = "experiment-id"
+    ref.workspace = "created-workspace"
+    ref.project_name = "created-project"
+    message = messages.TraceMessage(
+        experiment_info=box.Box(
+            api_key="api-key", workspace="the-workspace", project_name="project-name"
+        ),
+        trace_data={},
+        category="chain",
+        experiment_ref=ref,
+    )
+
+    with Scenario() as s:
+        s.experiment_api.ExperimentAPI.from_existing_id(
+            "experiment-id",
+            api_key="api-key",
+            load_metadata=False,
+            workspace="created-workspace",
+            project_name="created-project",
+        ) >> Fake(
+            "experiment_api_instance", project_url="project-url", id="experiment-id"
+        )
+
+        s.dedup.from_config(IgnoreArgument()) >> None
+        s.payload_limits.from_config() >> "the-limits"
+        (
+            s.serialization.TraceChunks({}, limits="the-limits", dedup=None)
+            >> "asset-chunks"
+        )
+        s.config.experiment_writes_max_workers() >> 1
+        s.experiment_api_instance.log_asset_with_stream(
+            name="comet_llm_data.json",
+            chunks="asset-chunks",
+            asset_type="llm_data",
+        )
+        s.app.SUMMARY.add_log("project-url", "chain")
+
+        sender.send(message)
+
+
+class _SlowExperimentAPI:
+    project_url = "project-url"
+    id = "experiment-id"
+
+    def __init__(self, writes_count, failing_write=None):
+        self.calls = []
+        self._barrier = threading.Barrier(writes_count, timeout=5)
+        self._failing_write = failing_write
+
+    def __getattr__(self, name):
+        def write(*args, **kwargs):
+            # Every write waits for all the others, so it only
+            # passes if they run concurrently
+            self._barrier.wait()
+            self.calls.append(name)
+            if name == self._failing_write:
+                raise exceptions.CometLLMException("failed")
+
+        return write
+
+
+def _message_with_four_writes():
+    return messages.TraceMessage(
+        experiment_info=box.Box(
+            api_key="api-key", workspace="the-workspace", project_name="project-name"
+        ),
+        trace_data={},
+        category="chain",
+        metrics={"chain_duration": "chain-duration"},
+        others={"other-name-1": "other-value-1", "other-name-2": "other-value-2"},
+    )
+
+
+def test_send__concurrent_writes__all_writes_sent_in_parallel(monkeypatch):
+    experiment_api_ = _SlowExperimentAPI(writes_count=4)
+    monkeypatch.setattr(sender, "_EXECUTOR", None)
+
+    with Scenario() as s:
+        (
+            s.experiment_api.ExperimentAPI.create_new(
+                api_key="api-key",
+                workspace="the-workspace",
+                project_name="project-name",
+            )
+            >> experiment_api_
+        )
+        s.dedup.from_config(IgnoreArgument()) >> None
+        s.payload_limits.from_config() >> "the-limits"
+        (
+            s.serialization.TraceChunks({}, limits="the-limits", dedup=None)
+            >> "asset-chunks"
+        )
+        s.config.experiment_writes_max_workers() >> 4
+        s.config.experiment_writes_max_workers() >> 4
+        s.app.SUMMARY.add_log("project-url", "chain")
+
+        result = sender.send(_message_with_four_writes())
+
+    assert result == llm_result.LLMResult(id="experiment-id", project_url="project-url")
+    assert sorted(experiment_api_.calls) == [
+        "log_asset_with_stream",
+        "log_metric",
+        "log_other",
+        "log_other",
+    ]
+
+
+def test_send__concurrent_writes__one_write_failed__exception_raised_after_all_writes(
+    monkeypatch,
+):
+    experiment_api_ = _SlowExperimentAPI(writes_count=4, failing_write="log_metric")
+    monkeypatch.setattr(sender, "_EXECUTOR", None)
+
+    with Scenario() as s:
+        (
+            s.experiment_api.ExperimentAPI.create_new(
+                api_key="api-key",
+                workspace="the-workspace",
+                project_name="project-name",
+            )
+            >> experiment_api_
+        )
+        s.dedup.from_config(IgnoreArgument()) >> None
+        s.payload_limits.from_config() >> "the-limits"
+        (
+            s.serialization.TraceChunks({}, limits="the-limits", dedup=None)
+            >> "asset-chunks"
+        )
+        s.config.experiment_writes_max_workers() >> 4
+        s.config.experiment_writes_max_workers() >> 4
+
+        with pytest.raises(exceptions.CometLLMException):
+            sender.send(_message_with_four_writes())
+
+    assert len(experiment_api_.calls) == 4
+
+
+def test_send__known_blobs_enabled__stored_blobs_remembered_after_writes():
+    message = messages.TraceMessage(
+        experiment_info=box.Box(
+            api_key="api-key", workspace="the-workspace", project_name="project-name"
+        ),
+        trace_data={},
+        category="chain",
+    )
+
+    with Scenario() as s:
+        s.experiment_api.ExperimentAPI.create_new(
+            api_key="api-key", workspace="the-workspace", project_name="project-name"
+        ) >> Fake(
+            "experiment_api_instance", project_url="project-url", id="experiment-id"
+        )
+
+        dedup_options = Fake("dedup_options", known_blobs=Fake("known_blobs"))
+        chunks = Fake("chunks", stored_blobs=["digest"])
+        s.dedup.from_config("experiment-id") >> dedup_options
+        s.payload_limits.from_config() >> "the-limits"
+        (
+            s.serialization.TraceChunks({}, limits="the-limits", dedup=dedup_options)
+            >> chunks
+        )
+        s.config.experiment_writes_max_workers() >> 1
+        s.experiment_api_instance.log_asset_with_stream(
+            name="comet_llm_data.json",
+            chunks=chunks,
+            asset_type="llm_data",
+        )
+        (
+            s.dedup.BlobLocation(
+                experiment_key="experiment-id", asset_name="comet_llm_data.json"
+            )
+            >> "the-location"
+        )
+        s.known_blobs.add(["digest"], "the-location")
+        s.app.SUMMARY.add_log("project-url", "chain")
+
+        sender.send(message)
@@ -0,0 +1,185 @@
+import json
+
+from comet_llm import experiment_info
+from comet_llm.message_processing import dedup, messages, payload_limits, serialization
+
+
+class _Node:
+    def __init__(self, data):
+        self._data = data
+
+    def as_dict(self):
+        return self._data
+
+
+def _decode(chunks):
+    return b"".join(chunks).decode("utf-8")
+
+
+def test_trace_chunks__same_json_as_json_dumps():
+    TRACE_DATA = {
+        "version": 3,
+        "chain_nodes": [{"id": 1, "text": "привет"}, {"id": 2}],
+        "chain_inputs": {"input": "the-input"},
+        "chain_duration": 1.5,
+    }
+
+    assert _decode(serialization.TraceChunks(TRACE_DATA)) == json.dumps(TRACE_DATA)
+
+
+def test_trace_chunks__node_objects__converted_with_as_dict():
+    tested = serialization.TraceChunks(
+        {"chain_nodes": [_Node({"id": 1}), _Node({"id": 2})], "category": "chain"}
+    )
+
+    assert json.loads(_decode(tested)) == {
+        "chain_nodes": [{"id": 1}, {"id": 2}],
+        "category": "chain",
+    }
+
+
+def test_trace_chunks__iterated_twice__same_content_returned():
+    tested = serialization.TraceChunks({"chain_nodes": [_Node({"id": 1})]})
+
+    assert _decode(tested) == _decode(tested)
+
+
+def test_trace_chunks__big_trace__split_into_chunks_of_limited_size():
+    nodes = [{"text": "x" * 1000} for _ in range(1000)]
+
+    chunks = list(serialization.TraceChunks({"chain_nodes": nodes}))
+
+    assert len(chunks) > 1
+    assert max(len(chunk) for chunk in chunks) < serialization.CHUNK_SIZE + 2000
+    assert json.loads(_decode(chunks)) == {"chain_nodes": nodes}
+
+
+def test_message_record__loaded_back__same_message():
+    message = messages.TraceMessage(
+        experiment_info=experiment_info.ExperimentInfo(
+            api_key="api-key", workspace="the-workspace", project_name="project-name"
+        ),
+        trace_data={"chain_nodes": [_Node({"text": "line-1\nline-2"})]},
+        category="chain",
+        tags=["tag"],
+        metrics={"chain_duration": 1.5},
+        parameters={"parameter": "value"},
+        others={"other": "value"},
+    )
+
+    record = b"".join(serialization.iter_message_record(message))
+
+    assert record.count(b"\n") == 1 and record.endswith(b"\n")
+    loaded = serialization.load_message_record(record)
+    assert loaded.trace_data == {"chain_nodes": [{"text": "line-1\nline-2"}]}
+    assert loaded.experiment_info == message.experiment_info
+    assert (loaded.tags, loaded.metrics, loaded.parameters, loaded.others) == (
+        ["tag"],
+        {"chain_duration": 1.5},
+        {"parameter": "value"},
+        {"other": "value"},
+    )
+
+
+def test_message_record__experiment_ref__loaded_as_the_same_ref_object():
+    ref = messages.experiment_ref()
+    message = messages.TraceMessage(
+        experiment_info=experiment_info.ExperimentInfo(
+            api_key="api-key", workspace="the-workspace", project_name="project-name"
+        ),
+        trace_data={},
+        category="chain",
+        experiment_ref=ref,
+        segment_index=4,
+    )
+
+    record = b"".join(serialization.iter_message_record(message))
+    ref.experiment_key = "experiment-key"
+
+    loaded = serialization.load_message_record(record)
+    assert loaded.experiment_ref is ref
+    assert loaded.segment_index == 4
+    assert loaded.asset_name == "comet_llm_data_segment_00004.json"
+
+
+def test_message_record__experiment_ref_unknown_in_this_process__ref_restored():
+    record = b"".join(
+        serialization.iter_message_record(
+            messages.TraceMessage(
+                experiment_info=experiment_info.ExperimentInfo(
+                    api_key="api-key", workspace=None, project_name=None
+                ),
+                trace_data={},
+                category="chain",
+            )
+        )
+    )
+    record = record.replace(
+        b'"experiment_ref": null',
+        b'"experiment_ref": {"id": "ref-from-previous-run", "experiment_key": "experiment-key",'
+        b' "workspace": "the-workspace", "project_name": "project-name"}',
+    )
+
+    loaded = serialization.load_message_record(record)
+
+    assert loaded.experiment_ref is messages.experiment_ref("ref-from-previous-run")
+    assert loaded.experiment_ref.experiment_key == "experiment-key"
+    assert loaded.experiment_ref.project_name == "project-name"
+
+
+def test_trace_chunks__limits_not_exceeded__same_json_as_json_dumps():
+    TRACE_DATA = {"chain_nodes": [{"inputs": {"a": "b"}}], "chain_inputs": {"c": "d"}}
+    limits = payload_limits.PayloadLimits(field_max_size=1000, trace_max_size=10000)
+
+    assert _decode(serialization.TraceChunks(TRACE_DATA, limits)) == json.dumps(
+        TRACE_DATA
+    )
+
+
+def test_trace_chunks__limits_exceeded__fields_cut_and_listed():
+    trace_data = {
+        "chain_nodes": [
+            _Node({"id": 1, "inputs": {"documents": ["a" * 1000] * 200}}),
+            _Node({"id": 2, "inputs": {"query": "q"}}),
+        ],
+        "chain_inputs": {"query": "q" * 500},
+        "chain_outputs": {"answer": "the-answer"},
+    }
+    limits = payload_limits.PayloadLimits(field_max_size=200, trace_max_size=5000)
+
+    result = json.loads(_decode(serialization.TraceChunks(trace_data, limits)))
+
+    assert len(json.dumps(result["chain_inputs"])) <= 200
+    assert result["chain_outputs"] == {"answer": "the-answer"}
+    assert result["chain_nodes"][1] == {"id": 2, "inputs": {"query": "q"}}
+    assert result["truncated_fields_count"] == 3
+    assert [field["path"] for field in result["truncated_fields"]] == [
+        "chain_inputs.query",
+        "chain_nodes[0].inputs.documents[0]",
+        "chain_nodes[0].inputs.documents",
+    ]
+
+
+def test_trace_chunks__dedup__repeated_strings_written_once_in_blobs():
+    prompt = "You are a helpful assistant. " * 10
+    trace_data = {
+        "chain_nodes": [
+            _Node({"id": 1, "inputs": {"system": prompt, "query": "q1"}}),
+            _Node({"id": 2, "inputs": {"system": prompt, "query": "q2"}}),
+        ],
+        "chain_inputs": {"system": prompt},
+    }
+    tested = serialization.TraceChunks(
+        trace_data, dedup=dedup.DedupOptions(min_size=100)
+    )
+
+    result = json.loads(_decode(tested))
+
+    digest = tested.stored_blobs[0]
+    assert tested.stored_blobs == [digest]
+    assert result["blobs"] == {digest: prompt}
+    assert result["chain_inputs"] == {"system": {"$blob": digest}}
+    assert [node["inputs"] for node in result["chain_nodes"]] == [
+        {"system": {"$blob": digest}, "query": "q1"},
+        {"system": {"$blob": digest}, "query": "q2"},
+    ]
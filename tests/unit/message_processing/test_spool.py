@@ -0,0 +1,167 @@
+import os
+
+import pytest
+
+from comet_llm import experiment_info
+from comet_llm.message_processing import messages, spool
+
+
+@pytest.fixture(autouse=True)
+def configured_api_key(monkeypatch):
+    monkeypatch.setattr(spool.config, "api_key", lambda: "configured-api-key")
+
+
+def _message(text="the-text", api_key="configured-api-key"):
+    return messages.TraceMessage(
+        experiment_info=experiment_info.ExperimentInfo(
+            api_key=api_key, workspace="the-workspace", project_name="project-name"
+        ),
+        trace_data={"text": text},
+        category="prompt",
+    )
+
+
+def _construct(directory, segment_size=10**6, max_size=10**6, eviction="oldest"):
+    return spool.Spool(
+        directory=str(directory),
+        segment_size=segment_size,
+        max_size=max_size,
+        fsync="always",
+        eviction=eviction,
+        abandoned_after=60,
+    )
+
+
+def _replay_all(tested):
+    result = []
+    for path in tested.claim_segments():
+        result.extend(message for _, message in spool.read_segment(path))
+        os.remove(path)
+
+    return result
+
+
+def test_write__segment_sealed__messages_replayed_in_order(tmp_path):
+    tested = _construct(tmp_path)
+
+    assert tested.write(_message("first"))
+    assert tested.write(_message("second"))
+    tested.seal()
+
+    assert _replay_all(tested) == [_message("first"), _message("second")]
+    assert os.listdir(tmp_path) == []
+
+
+def test_write__segment_not_sealed__not_replayed(tmp_path):
+    tested = _construct(tmp_path)
+
+    tested.write(_message())
+
+    assert _replay_all(tested) == []
+
+
+def test_write__segment_size_reached__new_segment_started(tmp_path):
+    tested = _construct(tmp_path, segment_size=1)
+
+    tested.write(_message("first"))
+    tested.write(_message("second"))
+
+    assert len(list(tested.claim_segments())) == 2
+
+
+def test_write__configured_api_key__not_written_to_disk(tmp_path):
+    tested = _construct(tmp_path)
+
+    tested.write(_message(api_key="configured-api-key"))
+    tested.write(_message(api_key="explicit-api-key"))
+    tested.seal()
+
+    content = b"".join(
+        open(os.path.join(tmp_path, name), "rb").read() for name in os.listdir(tmp_path)
+    )
+    assert b"configured-api-key" not in content
+    assert [message.experiment_info.api_key for message in _replay_all(tested)] == [
+        "configured-api-key",
+        "explicit-api-key",
+    ]
+
+
+def test_write__max_size_exceeded__oldest_eviction__oldest_segments_dropped(tmp_path):
+    tested = _construct(tmp_path, segment_size=1, max_size=500)
+
+    for i in range(10):
+        assert tested.write(_message("message-%d" % i))
+
+    replayed = _replay_all(tested)
+    assert 0 < len(replayed) < 10
+    assert replayed[-1] == _message("message-9")
+
+
+def test_write__max_size_exceeded__newest_eviction__new_message_dropped(tmp_path):
+    tested = _construct(tmp_path, max_size=300, eviction="newest")
+
+    assert tested.write(_message("first"))
+    assert not tested.write(_message("second"))
+    tested.seal()
+
+    assert _replay_all(tested) == [_message("first")]
+
+
+def test_write__within_quota__directory_scanned_once_per_segment(
+    tmp_path, monkeypatch
+):
+    tested = _construct(tmp_path)
+    scans = []
+    segment_sizes = tested._segment_sizes
+    monkeypatch.setattr(
+        tested, "_segment_sizes", lambda: scans.append(1) or segment_sizes()
+    )
+
+    for i in range(10):
+        assert tested.write(_message("message-%d" % i))
+
+    assert len(scans) == 1
+
+
+def test_write__newest_eviction__dropped_message_not_counted(tmp_path):
+    tested = _construct(tmp_path, max_size=600, eviction="newest")
+
+    assert tested.write(_message("first"))
+    assert not tested.write(_message("second" * 100))
+    assert tested.write(_message("third"))
+    tested.seal()
+
+    assert _replay_all(tested) == [_message("first"), _message("third")]
+
+
+def test_release__offset_given__rest_of_segment_returned_to_spool(tmp_path):
+    tested = _construct(tmp_path)
+    tested.write(_message("first"))
+    tested.write(_message("second"))
+    tested.seal()
+
+    [path] = tested.claim_segments()
+    [_, (second_offset, _)] = spool.read_segment(path)
+    tested.release(path, second_offset)
+
+    assert _replay_all(tested) == [_message("second")]
+
+
+def test_read_segment__damaged_record__skipped(tmp_path):
+    tested = _construct(tmp_path)
+    tested.write(_message("first"))
+    tested.seal()
+    [name] = os.listdir(tmp_path)
+    with open(os.path.join(tmp_path, name), "ab") as file:
+        file.write(b'{"experiment_info": {"api_ke')
+
+    assert _replay_all(tested) == [_message("first")]
+
+
+def test_claim_segments__open_segment_of_dead_process__claimed(tmp_path):
+    abandoned = tmp_path / ("%020d-1-0%s" % (0, spool.OPEN_SUFFIX))
+    abandoned.write_bytes(b"")
+    os.utime(abandoned, (0, 0))
+    tested = _construct(tmp_path)
+
+    assert len(list(tested.claim_segments())) == 1
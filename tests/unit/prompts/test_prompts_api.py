@@ -1,5 +1,3 @@
-import json
-
 import box
 import pytest
 from testix import *
@@ -13,13 +11,13 @@ from comet_llm.prompts import api
 def mock_imports(patch_module):
     patch_module(api, "comet_ml")
     patch_module(api, "convert")
-    patch_module(api, "experiment_api")
+    patch_module(api, "message_processing")
     patch_module(api, "experiment_info")
     patch_module(api, "flatten_dict")
     patch_module(api, "datetimes")
-    patch_module(api, "io")
     patch_module(api, "preprocess")
     patch_module(api, "app")
+    patch_module(api, "sampling")
     patch_module(api.comet_llm, "convert", Fake("comet_llm_convert"))
 
 def test_log_prompt__happyflow():
@@ -48,22 +46,19 @@ def test_log_prompt__happyflow():
     variable named COMET_API_KEY
     """
 
+    experiment_info = box.Box(
+        api_key="api-key", workspace="the-workspace", project_name="project-name",
+    )
+
     with Scenario() as s:
+        s.sampling.head_sampled(None) >> True
         s.preprocess.timestamp("the-timestamp") >> "preprocessed-timestamp"
         s.experiment_info.get(
             "passed-api-key",
             "passed-workspace",
             "passed-project-name",
             api_key_not_found_message=MESSAGE,
-        )>> box.Box(
-            api_key="api-key", workspace="the-workspace", project_name="project-name",
-        )
-        s.experiment_api.ExperimentAPI.create_new(
-            api_key="api-key",
-            workspace="the-workspace",
-            project_name="project-name"
-        ) >> Fake("experiment_api_instance", project_url="project-url", id="experiment-id")
-
+        )>> experiment_info
         s.convert.call_data_to_dict(
             prompt="the-prompt",
             outputs="the-outputs",
@@ -75,23 +70,22 @@ def test_log_prompt__happyflow():
             duration="the-duration"
         ) >> "CALL-DATA-DICT"
 
-        s.io.StringIO(json.dumps(ASSET_DICT_TO_LOG)) >> "asset-data"
-        s.experiment_api_instance.log_asset_with_io(
-            name="comet_llm_data.json",
-            file="asset-data",
-            asset_type="llm_data",
-        )
-        s.experiment_api_instance.log_tags("the-tags")
-        s.experiment_api_instance.log_metric("chain_duration", "the-duration")
         s.comet_llm_convert.chain_metadata_to_flat_parameters("the-metadata") >> {
             "parameter-key-1": "value-1",
             "parameter-key-2": "value-2"
         }
-
-        s.experiment_api_instance.log_parameter("parameter-key-1", "value-1")
-        s.experiment_api_instance.log_parameter("parameter-key-2", "value-2")
-
-        s.app.SUMMARY.add_log("project-url", "prompt")
+        s.message_processing.TraceMessage(
+            experiment_info=experiment_info,
+            trace_data=ASSET_DICT_TO_LOG,
+            category="prompt",
+            tags="the-tags",
+            metrics={"chain_duration": "the-duration"},
+            parameters={"parameter-key-1": "value-1", "parameter-key-2": "value-2"},
+        ) >> Fake("the_message", trace_data=ASSET_DICT_TO_LOG)
+        s.sampling.tail_sampled(ASSET_DICT_TO_LOG, None) >> True
+        s.message_processing.process(Fake("the_message")) >> llm_result.LLMResult(
+            id="experiment-id", project_url="project-url"
+        )
 
         result = api.log_prompt(
             prompt="the-prompt",
@@ -31,4 +31,11 @@ def test_init__not_set_arguments_not_passed_to_comet_ml_init():
         # Config object is recreated to re-read the config files
         s.comet_ml.get_config()
 
-        config.init(api_key="api-key")
\ No newline at end of file
+        config.init(api_key="api-key")
+
+
+def test_autologging_background__disabled_by_default():
+    assert (
+        config.comet_ml_config.CONFIG_MAP["comet.autologging.background"]["default"]
+        is False
+    )
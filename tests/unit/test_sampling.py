@@ -0,0 +1,116 @@
+import pytest
+from testix import *
+
+from comet_llm import sampling
+from comet_llm.chains import span
+
+
+@pytest.fixture(autouse=True)
+def mock_imports(patch_module):
+    patch_module(sampling, "config")
+    patch_module(sampling, "random")
+    patch_module(sampling, "app")
+
+
+def test_head_sampled__override_passed__override_returned():
+    assert sampling.head_sampled(True) is True
+    assert sampling.head_sampled(False) is False
+
+
+def test_head_sampled__rate_is_1__sampled_without_random_draw():
+    with Scenario() as s:
+        s.config.sampling_head_rate() >> 1.0
+
+        assert sampling.head_sampled() is True
+
+
+@pytest.mark.parametrize("draw,expected", [(0.009, True), (0.01, False), (0.5, False)])
+def test_head_sampled__rate_below_1__sampled_if_random_draw_below_rate(draw, expected):
+    with Scenario() as s:
+        s.config.sampling_head_rate() >> 0.01
+        s.random.random() >> draw
+
+        assert sampling.head_sampled() is expected
+
+
+def test_tail_sampled__override_passed__override_returned():
+    assert sampling.tail_sampled({}, override=False) is False
+    assert sampling.tail_sampled({}, override=True) is True
+
+
+def test_tail_sampled__rate_is_1__sampled():
+    with Scenario() as s:
+        s.config.sampling_tail_rate() >> 1.0
+
+        assert sampling.tail_sampled({}) is True
+
+
+@pytest.mark.parametrize(
+    "trace_data",
+    [
+        {"chain_outputs": {"error": "the-error"}},
+        {"metadata": {"exception": "the-exception"}},
+        {"chain_nodes": [{"outputs": {"output": 1}}, {"outputs": {"error": "e"}}]},
+        {"chain_nodes": [{"outputs": {}, "metadata": {"exception": "e"}}]},
+    ],
+)
+def test_tail_sampled__error_in_outputs_or_metadata__sampled(trace_data):
+    with Scenario() as s:
+        s.config.sampling_tail_rate() >> 0.0
+        s.config.sampling_keep_errors() >> True
+
+        assert sampling.tail_sampled(trace_data) is True
+
+
+def test_tail_sampled__error_in_span_object__sampled():
+    span_ = span.Span(inputs={"input": "value"}, category="llm")
+    span_.set_outputs({"output": None}, metadata={"error": "the-error"})
+
+    with Scenario() as s:
+        s.config.sampling_tail_rate() >> 0.0
+        s.config.sampling_keep_errors() >> True
+
+        assert sampling.tail_sampled({"chain_nodes": [span_]}) is True
+
+
+def test_tail_sampled__slow_trace__sampled():
+    with Scenario() as s:
+        s.config.sampling_tail_rate() >> 0.0
+        s.config.sampling_keep_errors() >> True
+        s.config.sampling_slow_threshold() >> 1000.0
+
+        assert sampling.tail_sampled({"chain_duration": 1000, "metadata": None}) is True
+
+
+def test_tail_sampled__normal_trace__sampled_by_rate():
+    trace_data = {
+        "chain_outputs": {"error": None},
+        "metadata": {"error": ""},
+        "chain_nodes": [{"outputs": {"output": 1}, "metadata": {}}],
+        "chain_duration": 999,
+    }
+
+    with Scenario() as s:
+        s.config.sampling_tail_rate() >> 0.01
+        s.config.sampling_keep_errors() >> True
+        s.config.sampling_slow_threshold() >> 1000.0
+        s.random.random() >> 0.5
+
+        assert sampling.tail_sampled(trace_data) is False
+
+
+def test_tail_sampled__errors_not_kept_slow_threshold_disabled__sampled_by_rate():
+    with Scenario() as s:
+        s.config.sampling_tail_rate() >> 0.01
+        s.config.sampling_keep_errors() >> False
+        s.config.sampling_slow_threshold() >> 0.0
+        s.random.random() >> 0.001
+
+        assert sampling.tail_sampled({"chain_outputs": {"error": "the-error"}}) is True
+
+
+def test_sampled_out__counted_in_summary():
+    with Scenario() as s:
+        s.app.SUMMARY.increment_sampled_out()
+
+        sampling.sampled_out("chain")
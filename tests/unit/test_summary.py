@@ -31,3 +31,14 @@ def test_print__happyflow():
         s.LOGGER.info("%d prompts and chains logged to %s", 1, "project-url-2")
         s.LOGGER.info("%d prompts and chains were not logged because of errors", 2)
         tested.print()
+
+
+def test_print__traces_sampled_out__number_reported():
+    tested = summary.Summary()
+
+    with Scenario() as s:
+        tested.increment_sampled_out()
+        tested.increment_sampled_out()
+
+        s.LOGGER.info("%d prompts and chains were not logged because of sampling", 2)
+        tested.print()
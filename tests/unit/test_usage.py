@@ -0,0 +1,107 @@
+import json
+
+import pytest
+from testix import *
+
+from comet_llm import usage
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(monkeypatch):
+    monkeypatch.setattr(usage, "_COUNTERS", usage._ProcessCounters())
+    monkeypatch.setattr(usage, "_PRICE_TABLE", None)
+
+
+def test_parse__nested_usage__tokens_returned():
+    metadata = {
+        "usage": {"prompt_tokens": 5, "completion_tokens": 7, "total_tokens": 12}
+    }
+
+    assert usage.parse(metadata) == usage.TokenUsage(5, 7, 12)
+
+
+def test_parse__flat_usage_without_total__total_computed():
+    metadata = {"usage.prompt_tokens": 5, "usage.completion_tokens": "7"}
+
+    assert usage.parse(metadata) == usage.TokenUsage(5, 7, 12)
+
+
+def test_parse__no_usage__None_returned():
+    assert usage.parse({"model": "gpt-4o"}) is None
+    assert usage.parse({"usage": None}) is None
+
+
+def test_model_name__output_model_preferred_to_requested_model():
+    assert (
+        usage.model_name({"model": "gpt-4o", "output_model": "gpt-4o-2024-05-13"})
+        == "gpt-4o-2024-05-13"
+    )
+    assert usage.model_name({"model": "gpt-4o"}) == "gpt-4o"
+    assert usage.model_name(None) is None
+
+
+def test_price_table__longest_prefix_used_for_unknown_model_versions():
+    tested = usage.PriceTable.from_dict(
+        {
+            "gpt-4o": {"prompt": 2.5, "completion": 10},
+            "gpt-4o-mini": {"prompt": 0.15, "completion": 0.6},
+        }
+    )
+
+    assert tested.price("gpt-4o-mini-2024-07-18") == usage.ModelPrice(0.15, 0.6)
+    assert tested.price("gpt-4o-2024-05-13") == usage.ModelPrice(2.5, 10)
+    assert tested.price("claude") is None
+    assert tested.cost("gpt-4o", usage.TokenUsage(1000, 100, 1100)) == pytest.approx(
+        0.0035
+    )
+    assert tested.cost("claude", usage.TokenUsage(1000, 100, 1100)) is None
+
+
+def test_record__usage_added_to_totals_and_process_counters():
+    usage.set_model_prices({"gpt-4o": {"prompt": 2.5, "completion": 10}})
+    totals = usage.Usage()
+
+    usage.record(
+        totals,
+        {
+            "usage": {
+                "prompt_tokens": 1000,
+                "completion_tokens": 100,
+                "total_tokens": 1100,
+            }
+        },
+        "gpt-4o",
+    )
+    usage.record(
+        totals,
+        {"usage": {"prompt_tokens": 10, "completion_tokens": 1, "total_tokens": 11}},
+        "unpriced-model",
+    )
+    usage.record(totals, {"no-usage": True}, "gpt-4o")
+
+    assert totals.as_metrics() == {
+        "usage.prompt_tokens": 1010,
+        "usage.completion_tokens": 101,
+        "usage.total_tokens": 1111,
+        "usage.cost": pytest.approx(0.0035),
+    }
+    counters = usage.usage_counters()
+    assert counters["calls"] == 2
+    assert counters["total_tokens"] == 1111
+    assert counters["models"]["gpt-4o"]["cost"] == pytest.approx(0.0035)
+    assert "cost" not in counters["models"]["unpriced-model"]
+
+
+def test_as_metrics__no_call_with_usage__empty():
+    assert usage.Usage().as_metrics() == {}
+
+
+def test_price_table__loaded_from_configured_file(tmp_path, patch_module):
+    patch_module(usage, "config")
+    prices_file = tmp_path / "prices.json"
+    prices_file.write_text(json.dumps({"gpt-4o": {"prompt": 2.5, "completion": 10}}))
+
+    with Scenario() as s:
+        s.config.usage_prices_file() >> str(prices_file)
+
+        assert usage._get_price_table().price("gpt-4o") == usage.ModelPrice(2.5, 10)